@@ -5,8 +5,9 @@ from typing import List, Optional
 
 from typer import Argument, Option, Typer
 
-from scargo.commands.build import scargo_build
+from scargo.commands.build import BuildOptions, scargo_build
 from scargo.commands.check import scargo_check
+from scargo.commands.check_report import CheckOutputFormat
 from scargo.commands.clean import scargo_clean
 from scargo.commands.debug import scargo_debug
 from scargo.commands.doc import scargo_doc
@@ -48,13 +49,33 @@ BASE_DIR_OPTION = Option(
     help="Base directory of the project",
 )
 
+FORCE_INSTALL_OPTION = Option(
+    False,
+    "--force-install",
+    help="Set up conan remotes and run conan source and conan install even if their inputs did not change.",
+)
+
+JOBS_OPTION = Option(
+    None,
+    "--jobs",
+    "-j",
+    min=1,
+    help="Number of files processed in parallel. Defaults to the number of CPU cores.",
+)
+
 
 ###############################################################################
 
 
 @cli.command()
 def build(
-    profile: str = Option("Debug", "-p", "--profile", metavar="PROFILE"),
+    profiles: List[str] = Option(
+        ["Debug"],
+        "-p",
+        "--profile",
+        metavar="PROFILE",
+        help="Profile to build, can be repeated or comma separated: -p Debug,Release.",
+    ),
     target: Optional[ScargoTarget] = Option(
         None,
         "-t",
@@ -62,19 +83,50 @@ def build(
         help="Target device. Defaults to first one from toml if not specified.",
     ),
     all_targets: bool = Option(False, "-a", "--all", help="Build all targets."),
+    all_profiles: bool = Option(False, "--all-profiles", help="Build all profiles from toml."),
+    parallel: bool = Option(
+        False,
+        "--parallel",
+        help="Build all selected targets and profiles at the same time, sharing max-build-jobs between them.",
+    ),
+    force_install: bool = FORCE_INSTALL_OPTION,
+    fast: bool = Option(
+        False,
+        "--fast",
+        help="Run cmake --build directly if the build directory is configured and conan inputs did not change.",
+    ),
+    cmake_target: Optional[str] = Option(
+        None, "--cmake-target", metavar="CMAKE_TARGET", help="With --fast, build only this CMake target."
+    ),
+    copy_objects: bool = Option(
+        False, "--copy-objects", help="Copy also object files from the CMake build directory with the artifacts."
+    ),
+    time_trace: bool = Option(
+        False,
+        "--time-trace",
+        help="Measure compilation of every translation unit and report the slowest units, headers and templates.",
+    ),
+    analyze: bool = Option(
+        False,
+        "--analyze",
+        help="Report critical path, parallelism and bottlenecks of the build from .ninja_log"
+        " and write a Chrome trace timeline.",
+    ),
     base_dir: Optional[Path] = BASE_DIR_OPTION,
 ) -> None:
     """Compile sources."""
     if base_dir:
         os.chdir(base_dir)
-    scargo_build(profile, target, all_targets)
+    options = BuildOptions(force_install, fast, cmake_target, copy_objects, time_trace, analyze)
+    profiles = [profile for value in profiles for profile in value.split(",") if profile]
+    scargo_build(profiles, target, all_targets, all_profiles, parallel, options)
 
 
 ###############################################################################
 
 
 @cli.command()
-def check(
+def check(  # pylint: disable=too-many-locals
     clang_format: bool = Option(False, "--clang-format", help="Run clang-format."),
     clang_tidy: bool = Option(False, "--clang-tidy", help="Run clang-tidy."),
     copy_right: bool = Option(False, "--copyright", help="Run copyright check."),
@@ -83,6 +135,38 @@ def check(
     pragma: bool = Option(False, "--pragma", help="Run pragma check."),
     todo: bool = Option(False, "--todo", help="Run TODO check."),
     silent: bool = Option(False, "--silent", "-s", help="Show less output."),
+    jobs: Optional[int] = JOBS_OPTION,
+    no_cache: bool = Option(False, "--no-cache", help="Check all files, ignoring results cached by previous runs."),
+    changed_since: Optional[str] = Option(
+        None,
+        "--changed-since",
+        metavar="GIT_REF",
+        help="Check only files changed since GIT_REF and translation units including them.",
+    ),
+    watch: bool = Option(False, "--watch", "-w", help="Keep running and check files again whenever they change."),
+    output_format: Optional[CheckOutputFormat] = Option(
+        None,
+        "--output-format",
+        help="Write all findings with per-checker and per-file wall time in this format.",
+    ),
+    output_path: Optional[Path] = Option(
+        None,
+        "--output",
+        "-o",
+        metavar="PATH",
+        resolve_path=True,
+        help="Path of the results file, defaults to build/scargo_check.<format>.",
+    ),
+    serve: bool = Option(
+        False, "--serve", help="Keep running and check files sent to a Unix socket, e.g. by an editor or a git hook."
+    ),
+    socket_path: Optional[Path] = Option(
+        None,
+        "--socket",
+        metavar="PATH",
+        resolve_path=True,
+        help="Socket of --serve, defaults to build/.scargo_check.sock.",
+    ),
     base_dir: Optional[Path] = BASE_DIR_OPTION,
 ) -> None:
     """Check source code in directory `src`."""
@@ -97,6 +181,14 @@ def check(
         pragma,
         todo,
         verbose=not silent,
+        jobs=jobs,
+        use_cache=not no_cache,
+        changed_since=changed_since,
+        watch=watch,
+        output_format=output_format,
+        output_path=output_path,
+        serve=serve,
+        socket_path=socket_path,
     )
 
 
@@ -204,12 +296,19 @@ def fix(
     clang_format: bool = Option(False, "--clang-format", help="Fix clang-format violations"),
     copy_right: bool = Option(False, "--copyright", help="Fix copyrights violations"),
     pragma: bool = Option(False, "--pragma", help="Fix pragma violations"),
+    jobs: Optional[int] = JOBS_OPTION,
+    lines_changed_since: Optional[str] = Option(
+        None,
+        "--lines-changed-since",
+        metavar="GIT_REF",
+        help="Fix only files changed since GIT_REF and let clang-format touch only their changed lines.",
+    ),
     base_dir: Optional[Path] = BASE_DIR_OPTION,
 ) -> None:
     """Fix violations reported by command `check`."""
     if base_dir:
         os.chdir(base_dir)
-    scargo_fix(pragma, copy_right, clang_format)
+    scargo_fix(pragma, copy_right, clang_format, jobs, lines_changed_since)
 
 
 ###############################################################################
@@ -450,12 +549,13 @@ def test(
     verbose: bool = Option(False, "--verbose", "-v", help="Verbose mode."),
     profile: str = Option("Debug", "-p", "--profile", metavar="PROFILE", help="CMake profile to use"),
     detailed_coverage: bool = Option(False, help="Generate detailed coverage HTML files"),
+    force_install: bool = FORCE_INSTALL_OPTION,
     base_dir: Optional[Path] = BASE_DIR_OPTION,
 ) -> None:
     """Compile and run all tests in directory `test`."""
     if base_dir:
         os.chdir(base_dir)
-    scargo_test(verbose, profile, detailed_coverage)
+    scargo_test(verbose, profile, detailed_coverage, force_install)
 
 
 ###############################################################################
@@ -2,25 +2,81 @@
 
 import subprocess
 import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
 from pathlib import Path
-from typing import List, Optional
+from typing import ContextManager, List, NamedTuple, Optional, Sequence
 
 from scargo.config import Config, ScargoTarget, Target
 from scargo.config_utils import get_target_or_default, prepare_config
-from scargo.file_generators.conan_gen import conan_add_default_profile_if_missing
 from scargo.logger import get_logger
-from scargo.utils.conan_utils import conan_add_remote, conan_source
+from scargo.utils.compiler_cache import (
+    get_compiler_cache_stats,
+    log_compiler_cache_stats,
+)
+from scargo.utils.conan_utils import (
+    conan_bootstrap,
+    get_conan_install_fingerprint,
+    is_conan_install_current,
+    save_conan_install_fingerprint,
+)
+from scargo.utils.file_utils import OBJECT_FILE_SUFFIXES, sync_tree
+from scargo.utils.ninja_log import (
+    NINJA_LOG_NAME,
+    analyze_steps,
+    format_build_analysis,
+    read_ninja_log,
+    write_chrome_trace,
+)
+from scargo.utils.parallel_utils import get_default_jobs
+from scargo.utils.time_trace import (
+    collect_time_trace,
+    format_time_trace_report,
+    get_time_trace_conf,
+    is_clang,
+    write_time_trace_report,
+)
 
 logger = get_logger()
 
+# Set for `conan build` by parallel builds, which run the CMake build themselves
+CONFIGURE_ONLY_CONF = "user.scargo:configure_only"
 
-def scargo_build(profile: str, target: Optional[ScargoTarget], all_targets: bool = False) -> None:
+
+class BuildOptions(NamedTuple):
+    # Run `conan install` even if its inputs did not change
+    force_install: bool = False
+    # Run `cmake --build` directly if the build directory is configured and conan inputs did not change
+    fast: bool = False
+    # CMake target built by the fast path, all targets if None
+    cmake_target: Optional[str] = None
+    # Copy object files next to the artifacts as well
+    copy_objects: bool = False
+    # Measure compilation of every translation unit and report hotspots
+    time_trace: bool = False
+    # Report critical path and parallelism of the build from `.ninja_log`
+    analyze: bool = False
+
+
+def scargo_build(
+    profiles: Sequence[str],
+    target: Optional[ScargoTarget],
+    all_targets: bool = False,
+    all_profiles: bool = False,
+    parallel: bool = False,
+    options: BuildOptions = BuildOptions(),
+) -> None:
     """
     Build project exec file.
 
-    :param str profile: Profile
+    :param profiles: Profiles to build
     :param target: Target to build
     :param bool all_targets: Build all targets
+    :param bool all_profiles: Build all profiles from toml
+    :param bool parallel: Build all targets and profiles at the same time
+    :param options: How the targets are built
     :return: None
     """
     config = prepare_config()
@@ -31,73 +87,266 @@ def scargo_build(profile: str, target: Optional[ScargoTarget], all_targets: bool
         logger.info("Did you run `scargo update`?")
         sys.exit(1)
 
-    conan_add_default_profile_if_missing()
-    conan_add_remote(project_dir, config)
-    conan_source(project_dir)
+    # Deduplicated, in the given order
+    profiles = list(config.profiles) if all_profiles else list(dict.fromkeys(profiles))
+    unknown_profiles = [profile for profile in profiles if profile not in config.profiles]
+    if unknown_profiles:
+        logger.error("Profiles not defined in scargo.toml: %s", ", ".join(unknown_profiles))
+        sys.exit(1)
 
-    if not all_targets:
-        _scargo_build_targets(config, profile, [get_target_or_default(config, target)])
-    else:
-        _scargo_build_targets(config, profile, config.project.target)
+    if options.cmake_target and not options.fast:
+        logger.warning("CMake target is built separately only with --fast, building all targets")
+
+    targets = config.project.target if all_targets else [get_target_or_default(config, target)]
+    if options.time_trace and any(build_target.id == "esp32" for build_target in targets):
+        # The IDF toolchain replaces the conan one, compiler flags set by conan do not reach it
+        logger.error("Time trace is not supported for the esp32 target")
+        sys.exit(1)
+    configurations = [
+        _BuildConfiguration(build_target, profile, len(profiles) > 1)
+        for build_target in targets
+        for profile in profiles
+    ]
 
+    conan_bootstrap(project_dir, config, force=options.force_install)
 
-def _scargo_build_targets(config: Config, profile: str, targets: List[Target]) -> None:
+    cache_stats = get_compiler_cache_stats(config)
+    try:
+        if parallel and len(configurations) > 1:
+            _scargo_build_parallel(config, configurations, options)
+        else:
+            _scargo_build(config, configurations, options)
+    finally:
+        log_compiler_cache_stats(config, cache_stats, get_compiler_cache_stats(config))
+
+
+class _BuildConfiguration(NamedTuple):
+    target: Target
+    profile: str
+    # Profile is a part of the name only if several profiles are built
+    with_profile: bool = False
+
+    @property
+    def name(self) -> str:
+        return f"{self.target.id}/{self.profile}" if self.with_profile else self.target.id
+
+
+def _scargo_build(config: Config, configurations: List[_BuildConfiguration], options: BuildOptions) -> None:
     """
-    Build project exec file.
+    Build configurations one by one, stop at the first failure.
 
-    :param str profile: Profile for which to build
-    :param list targets: Targets to build
+    :param list configurations: Targets and profiles to build
+    :param options: How the targets are built
     :return: None
     """
-    project_dir = config.project_root
-    for build_target in targets:
-        logger.info("Building %s target", build_target.id)
+    for configuration in configurations:
+        try:
+            _build_target(config, configuration, options)
+        except subprocess.CalledProcessError:
+            logger.error("Scargo build target %s failed", configuration.name)
+            sys.exit(1)
+        except OSError as e:
+            # E.g. artifacts not copied
+            logger.error("Scargo build target %s failed: %s", configuration.name, e)
+            sys.exit(1)
 
-        build_dir = Path(project_dir, build_target.get_profile_build_dir(profile))
-        build_dir.mkdir(parents=True, exist_ok=True)
-        profile_name = build_target.get_conan_profile_name(profile)
 
-        try:
-            subprocess.run(
-                [
-                    "conan",
-                    "install",
-                    ".",
-                    "-pr",
-                    f"./config/conan/profiles/{profile_name}",
-                    "-of",
-                    build_dir,
-                    "-b",
-                    "missing",
-                ],
-                cwd=project_dir,
-                check=True,
-            )
-            subprocess.run(
-                [
-                    "conan",
-                    "build",
-                    ".",
-                    "-pr",
-                    f"./config/conan/profiles/{profile_name}",
-                    "-of",
-                    build_dir,
-                ],
-                cwd=project_dir,
-                check=True,
-            )
-
-            logger.info("Copying artifacts...")
-            # This is a workaround so that different profiles can work together with conan
-            # Conan always calls CMake with '
-            subprocess.run(
-                f"cp -r -f {build_dir}/build/{config.profiles[profile].cmake_build_type}/* .",
-                cwd=build_dir,
-                shell=True,
-                check=True,
-            )
-            logger.info("Artifacts copied")
+def _scargo_build_parallel(config: Config, configurations: List[_BuildConfiguration], options: BuildOptions) -> None:
+    """
+    Build configurations at the same time, sharing `max-build-jobs` between them.
+
+    At most one configuration per build job runs at once. Output of every configuration is prefixed
+    with its name. All configurations are built even if some fail.
 
+    :param list configurations: Targets and profiles to build
+    :param options: How the targets are built
+    :return: None
+    """
+    total_jobs = config.project.max_build_jobs or get_default_jobs()
+    workers = min(len(configurations), total_jobs)
+    jobs = max(1, total_jobs // workers)
+    logger.info(
+        "Building %d configurations, %d in parallel with %d build jobs each", len(configurations), workers, jobs
+    )
+
+    output = _PrefixedOutput()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            configuration.name: executor.submit(_build_target, config, configuration, options, jobs, output)
+            for configuration in configurations
+        }
+
+    failed = []
+    for name, future in futures.items():
+        try:
+            future.result()
         except subprocess.CalledProcessError:
-            logger.error("Scargo build target %s failed", build_target.id)
-            sys.exit(1)
+            logger.error("Scargo build target %s failed", name)
+            failed.append(name)
+        except Exception as e:  # pylint: disable=broad-except
+            # E.g. conan missing or artifacts not copied, the other configurations are still summarized
+            logger.error("Scargo build target %s failed: %s", name, e)
+            failed.append(name)
+    if failed:
+        logger.error(
+            "Built %d of %d configurations, failed: %s",
+            len(configurations) - len(failed),
+            len(configurations),
+            ", ".join(failed),
+        )
+        sys.exit(1)
+    logger.info("All %d configurations built", len(configurations))
+
+
+class _PrefixedOutput:
+    """Output of commands running in parallel, printed line by line with a prefix"""
+
+    def __init__(self) -> None:
+        self._output_lock = threading.Lock()
+        # Conan cache can't be modified by several processes at once and generate() writes CMakeUserPresets.json
+        # in the project root, so conan runs for one configuration at a time and only CMake builds in parallel
+        self.conan_lock = threading.Lock()
+
+    def run(self, cmd: List[str], cwd: Path, prefix: str) -> None:
+        with subprocess.Popen(
+            cmd, cwd=cwd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, errors="replace"
+        ) as process:
+            assert process.stdout
+            for line in process.stdout:
+                with self._output_lock:
+                    sys.stdout.write(f"{prefix}{line}")
+                    sys.stdout.flush()
+            process.wait()
+        if process.returncode:
+            raise subprocess.CalledProcessError(process.returncode, cmd)
+
+
+def _build_target(  # pylint: disable=too-many-locals
+    config: Config,
+    configuration: _BuildConfiguration,
+    options: BuildOptions,
+    jobs: Optional[int] = None,
+    output: Optional[_PrefixedOutput] = None,
+) -> None:
+    """
+    Install dependencies of the target, build it and copy artifacts to its build directory.
+
+    :param configuration: Target and profile to build
+    :param options: How the target is built
+    :param jobs: number of build jobs, overrides `max-build-jobs` from the conan profile
+    :param output: runs commands with prefixed output if given, otherwise they write directly to the terminal
+    :raises subprocess.CalledProcessError: if any step fails
+    :raises OSError: if artifacts can't be copied, e.g. the build did not create the CMake build directory
+    """
+    project_dir = config.project_root
+    build_target, profile = configuration.target, configuration.profile
+    logger.info("Building %s target", configuration.name)
+
+    def run(cmd: List[str]) -> None:
+        if output:
+            output.run(cmd, project_dir, f"[{configuration.name}] ")
+        else:
+            subprocess.run(cmd, cwd=project_dir, check=True)
+
+    build_dir = Path(project_dir, build_target.get_profile_build_dir(profile))
+    build_dir.mkdir(parents=True, exist_ok=True)
+    cmake_build_type = str(config.profiles[profile].cmake_build_type)
+    # Directory configured by CMake, as set by cmake_layout in conanfile.py
+    cmake_build_dir = build_dir / "build" / cmake_build_type
+    profile_name = build_target.get_conan_profile_name(profile)
+    conan_args = ["-pr", f"./config/conan/profiles/{profile_name}", "-of", str(build_dir)]
+    if options.time_trace:
+        compiler = (config.profiles[profile].cc if build_target.id == "x86" else None) or "gcc"
+        conan_args.extend(get_time_trace_conf(is_clang(compiler)))
+
+    install_cmd = ["conan", "install", ".", *conan_args, "-b", "missing"]
+    build_cmd = ["conan", "build", ".", *conan_args]
+    fingerprint = get_conan_install_fingerprint(
+        config, project_dir, install_cmd, Path(project_dir, "config", "conan", "profiles", profile_name)
+    )
+    install_current = not options.force_install and is_conan_install_current(build_dir, fingerprint)
+    # Units which are up to date keep time measurements from earlier builds
+    build_start = time.time()
+
+    cmake_jobs = jobs or config.project.max_build_jobs or get_default_jobs()
+    if options.fast and install_current and (cmake_build_dir / "CMakeCache.txt").is_file():
+        logger.info("Building %s target directly with CMake", configuration.name)
+        run(get_cmake_build_cmd(cmake_build_dir, cmake_build_type, cmake_jobs, options.cmake_target))
+    else:
+        if options.fast:
+            logger.info("Configuration of %s target changed, building with conan", configuration.name)
+        conan_lock: ContextManager[object] = output.conan_lock if output else nullcontext()
+        with conan_lock:
+            if install_current:
+                logger.info(
+                    "Conan dependencies of %s target are up to date, skipping conan install", configuration.name
+                )
+            else:
+                run(install_cmd)
+            if output:
+                # Resolve, generate and configure only, conanfile.py skips the build with this option
+                run([*build_cmd, "-c", f"{CONFIGURE_ONLY_CONF}=True"])
+        if output:
+            run(get_cmake_build_cmd(cmake_build_dir, cmake_build_type, cmake_jobs))
+        else:
+            run(build_cmd)
+        if not install_current:
+            # Saved only after the build, which fails as well when files generated by the install are broken
+            save_conan_install_fingerprint(build_dir, fingerprint)
+
+    if options.time_trace:
+        _report_time_trace(configuration.name, cmake_build_dir, build_dir, build_start)
+    if options.analyze:
+        _report_build_analysis(configuration.name, cmake_build_dir, build_dir)
+
+    logger.info("Copying %s artifacts...", configuration.name)
+    # This is a workaround so that different profiles can work together with conan
+    # Conan always calls CMake with '
+    stats = sync_tree(cmake_build_dir, build_dir, () if options.copy_objects else OBJECT_FILE_SUFFIXES)
+    logger.info(
+        "Artifacts copied: %d files, %d bytes, %d files unchanged",
+        stats.copied_files,
+        stats.copied_bytes,
+        stats.unchanged_files,
+    )
+
+
+def _report_time_trace(name: str, cmake_build_dir: Path, build_dir: Path, build_start: float) -> None:
+    report = collect_time_trace(cmake_build_dir, build_start)
+    report_path = write_time_trace_report(report, build_dir)
+    logger.info("Compile time of %s target:\n%s", name, format_time_trace_report(report))
+    logger.info("Time trace report written to %s", report_path)
+
+
+def _report_build_analysis(name: str, cmake_build_dir: Path, build_dir: Path) -> None:
+    log_path = cmake_build_dir / NINJA_LOG_NAME
+    if not log_path.is_file():
+        logger.warning(
+            "No %s in %s, build analysis needs the Ninja generator (tools.cmake.cmaketoolchain:generator=Ninja)",
+            NINJA_LOG_NAME,
+            cmake_build_dir,
+        )
+        return
+    steps = read_ninja_log(log_path)
+    logger.info("Build analysis of %s target:\n%s", name, format_build_analysis(analyze_steps(steps)))
+    trace_path = build_dir / "build_trace.json"
+    write_chrome_trace(steps, trace_path)
+    logger.info("Build timeline written to %s, open it in chrome://tracing or https://ui.perfetto.dev", trace_path)
+
+
+def get_cmake_build_cmd(
+    cmake_build_dir: Path, cmake_build_type: str, jobs: int, cmake_target: Optional[str] = None
+) -> List[str]:
+    """
+    Command building an already configured directory, without conan.
+
+    :param cmake_build_dir: directory with `CMakeCache.txt`
+    :param cmake_build_type: configuration, needed by multi-config generators
+    :param jobs: number of parallel build jobs
+    :param cmake_target: CMake target to build, all targets if None
+    :return: `cmake --build` command
+    """
+    cmd = ["cmake", "--build", str(cmake_build_dir), "--config", cmake_build_type, "--parallel", str(jobs)]
+    if cmake_target:
+        cmd.extend(["--target", cmake_target])
+    return cmd
@@ -1,25 +1,62 @@
 """Check written code with formatters"""
 
-import abc
-import glob
+import hashlib
+import logging
+import math
 import os
 import re
 import subprocess
 import sys
-from itertools import chain
+import time
 from pathlib import Path
-from typing import Iterable, List, NamedTuple, Optional, Sequence, Type
-
-from scargo.config import CheckConfig, Config, TodoCheckConfig
+from typing import Any, Dict, List, Optional, Set, Tuple, Type
+from xml.etree import ElementTree
+
+from scargo import __version__
+from scargo.commands.check_base import CheckerFixer, CheckResult, find_profile_build_dir
+from scargo.commands.check_report import (
+    CheckOutputFormat,
+    Finding,
+    get_default_output_path,
+    write_check_report,
+)
+from scargo.commands.check_server import DEFAULT_SOCKET_PATH, serve_checks
+from scargo.commands.check_watch import watch_and_check
+from scargo.config import TodoCheckConfig
 from scargo.config_utils import prepare_config
-from scargo.logger import get_logger
-from scargo.utils.clang_utils import get_comment_lines
-from scargo.utils.file_utils import extract_comment_sections
+from scargo.logger import buffered_log_records, get_logger, replay_log_records
+from scargo.utils.check_cache import context_digest, file_digest
+from scargo.utils.clang_tools import (
+    has_error_diagnostic,
+    prepare_esp32_compile_db,
+    split_clang_diagnostics,
+    split_run_clang_tidy_output,
+)
+from scargo.utils.compile_db import (
+    COMPILE_DB_FILE_NAME,
+    CompileDatabase,
+    DependencyDigests,
+    get_compile_database,
+)
+from scargo.utils.complexity import (
+    CYCLOMATIC_REPORT_PATH,
+    LIZARD_SOURCE_PATTERNS,
+    LIZARD_VERSION,
+    FunctionMetrics,
+    analyze_sources,
+    write_complexity_report,
+)
+from scargo.utils.cppcheck_utils import iter_cppcheck_xml_issues
+from scargo.utils.file_utils import write_atomically
+from scargo.utils.git_utils import get_changed_files
+from scargo.utils.parallel_utils import JobBudget, run_grouped
+from scargo.utils.path_utils import normalize_path
+from scargo.utils.source_scanner import scan_source
 
 logger = get_logger()
 
 
-def scargo_check(  # pylint: disable=too-many-branches
+def scargo_check(  # pylint: disable=too-many-branches,too-many-locals
     clang_format: bool,
     clang_tidy: bool,
     copy_right: bool,
@@ -28,6 +65,14 @@ def scargo_check(  # pylint: disable=too-many-branches
     pragma: bool,
     todo: bool,
     verbose: bool,
+    jobs: Optional[int] = None,
+    use_cache: bool = True,
+    changed_since: Optional[str] = None,
+    watch: bool = False,
+    output_format: Optional[CheckOutputFormat] = None,
+    output_path: Optional[Path] = None,
+    serve: bool = False,
+    socket_path: Optional[Path] = None,
 ) -> None:
     """
     Check written code using different formatters
@@ -40,6 +85,14 @@ def scargo_check(  # pylint: disable=too-many-branches
     :param bool pragma: check pragma
     :param bool todo: check todo left in code
     :param bool verbose: set verbose
+    :param jobs: number of jobs run in parallel by all checkers together, defaults to the number of CPU cores
+    :param bool use_cache: reuse results of file-level checks for files which did not change
+    :param changed_since: check only files changed since this git ref (and translation units including them)
+    :param bool watch: after the first check, keep re-checking files as they change
+    :param output_format: also write findings and timings of all checkers in this format
+    :param output_path: path of the results file, `build/scargo_check.<format>` by default
+    :param bool serve: instead of checking, answer requests to check files on a Unix socket
+    :param socket_path: socket of the server, `build/.scargo_check.sock` by default
     :return: None
     """
     config = prepare_config()
@@ -47,6 +100,11 @@ def scargo_check(  # pylint: disable=too-many-branches
     # Todo, remove chdir and change cwd for checks
     os.chdir(config.project_root)
 
+    changed_files = None
+    if changed_since:
+        changed_files = get_changed_files(config.project_root, changed_since)
+        logger.info("Checking %d files changed since %s", len(changed_files), changed_since)
+
     checkers: List[Type[CheckerFixer]] = []
     if clang_format:
         checkers.append(ClangFormatChecker)
@@ -75,113 +133,82 @@ def scargo_check(  # pylint: disable=too-many-branches
             TodoChecker,
         ]
 
-    problem_counts = []
-    for checker_class in checkers:
-        problem_count = checker_class(config, verbose=verbose).check()
-        problem_counts.append((checker_class, problem_count))
+    # Checkers run concurrently and share one job budget, so whole-tree tools like
+    # cppcheck and lizard overlap with per-file checks without oversubscribing the CPU
+    budget = JobBudget(jobs)
+
+    def run_checkers(
+        checker_classes: List[Type[CheckerFixer]], files: Optional[Set[Path]]
+    ) -> List[Tuple[CheckerFixer, int]]:
+        def run_checker(checker_class: Type[CheckerFixer]) -> Tuple[CheckerFixer, int]:
+            checker = checker_class(
+                config,
+                verbose=verbose,
+                budget=budget,
+                use_cache=use_cache,
+                changed_files=files,
+            )
+            return checker, checker.check()
+
+        return run_grouped(run_checker, checker_classes, len(checker_classes))
+
+    if serve:
+        serve_checks(
+            socket_path or DEFAULT_SOCKET_PATH, config.project_root, config.source_dir_path, checkers, run_checkers
+        )
+        return
+
+    problem_counts = run_checkers(checkers, changed_files)
+    if output_format:
+        write_check_report(
+            output_path or config.project_root / get_default_output_path(output_format),
+            output_format,
+            config.project_root,
+            [checker.get_run(count) for checker, count in problem_counts],
+        )
+    if watch:
+        watch_and_check(config.source_dir_path, problem_counts, run_checkers)
+        return
+
     if len(checkers) > 0:
         logger.info("Summary:")
         if any(count > 0 for _, count in problem_counts):
-            for checker_class, problem_count in problem_counts:
+            for checker_class, (_, problem_count) in zip(checkers, problem_counts):
                 logger.info(f"{checker_class.check_name}: {problem_count} problems found")
             sys.exit(1)
         else:
             logger.info("No problems found!")
 
 
-class CheckResult(NamedTuple):
-    problems_found: int
-    fix: bool = True
-
-
-class CheckerFixer(abc.ABC):
-    check_name: str
-    headers_only = False
-    can_fix = False
-
-    def __init__(self, config: Config, fix_errors: bool = False, verbose: bool = False) -> None:
-        self._config = config
-        self._fix_errors = fix_errors
-        self._verbose = verbose
-
-    def check(self) -> int:
-        logger.info(f"Starting {self.check_name} check...")
-        error_count = self.check_files()
-        self.report(error_count)
-        return error_count
-
-    def check_files(self) -> int:
-        error_counter = 0
-        for file_path in find_files(
-            self._config.source_dir_path,
-            ("*.h", "*.hpp") if self.headers_only else ("*.h", "*.hpp", "*.c", "*.cpp"),
-            self.get_exclude_patterns(),
-        ):
-            result = self.check_file(file_path)
-            error_counter += result.problems_found
-            if result.problems_found > 0 and self._fix_errors and self.can_fix and result.fix:
-                logger.info("Fixing...")
-                self.fix_file(file_path)
-        return error_counter
-
-    def report(self, count: int) -> None:
-        problem_count = self.format_problem_count(count)
-        if self._fix_errors and self.can_fix:
-            logger.info(f"Finished {self.check_name} check. Fixed {problem_count}.")
-        else:
-            logger.info(f"Finished {self.check_name} check. Found {problem_count}.")
-            if count > 0:
-                logger.error(f"{self.check_name} check fail!")
-
-    @staticmethod
-    def format_problem_count(count: int) -> str:
-        return f"problems in {count} files"
-
-    def get_exclude_patterns(self) -> List[str]:
-        return [*self._config.check.exclude, *self.get_check_config().exclude]
-
-    def get_check_config(self) -> CheckConfig:
-        return getattr(self._config.check, self.check_name.replace("-", "_"))  # type: ignore[no-any-return]
-
-    @abc.abstractmethod
-    def check_file(self, file_path: Path) -> CheckResult:
-        pass
-
-    def fix_file(self, file_path: Path) -> None:
-        pass
-
-
 class PragmaChecker(CheckerFixer):
     check_name = "pragma"
     headers_only = True
     can_fix = True
+    cacheable = True
 
     def check_file(self, file_path: Path) -> CheckResult:
-        with open(file_path, encoding="utf-8") as file:
-            for line in file.readlines():
-                if "#pragma once" in line:
-                    return CheckResult(0)
+        if scan_source(file_path).has_pragma_once:
+            return CheckResult(0)
         logger.warning("Missing '#pragma once' in %s", file_path)
+        self._add_finding(file_path, Finding(1, "Missing '#pragma once'"))
         return CheckResult(1)
 
     def fix_file(self, file_path: Path) -> None:
-        with open(file_path, encoding="utf-8") as file:
-            old = file.read()
-
-        with open(file_path, "w", encoding="utf-8") as file:
-            file.write("#pragma once\n")
-            file.write("\n")
-            file.write(old)
+        write_atomically(file_path, b"#pragma once\n\n" + file_path.read_bytes())
 
 
 class CopyrightChecker(CheckerFixer):
     check_name = "copyright"
     can_fix = True
+    cacheable = True
 
-    def __init__(self, config: Config, fix_errors: bool = False, verbose: bool = False):
-        super().__init__(config, fix_errors, verbose)
-        self.copyright_desc = self.get_check_config().description or ""
-        self.copyright_fix_desc = self._config.fix.copyright.description
+    @property
+    def copyright_desc(self) -> str:
+        return self.get_check_config().description or ""
+
+    @property
+    def copyright_fix_desc(self) -> Optional[str]:
+        return self._config.fix.copyright.description
 
     def check(self) -> int:
         if not self.copyright_desc:
@@ -197,7 +224,8 @@ class CopyrightChecker(CheckerFixer):
         return ""
 
     def check_file(self, file_path: Path) -> CheckResult:
-        comment_sections = extract_comment_sections(file_path)
+        # Copyright is expected above the code, comments further down are not searched
+        comment_sections = scan_source(file_path).get_comment_sections(header_only=True)
         for comment_section in comment_sections:
             if self.copyright_desc in comment_section:
                 return CheckResult(problems_found=0)
@@ -210,19 +238,16 @@ class CopyrightChecker(CheckerFixer):
                 logger.debug("Invalid regex in config file: %s", e.msg)
 
         logger.warning("Missing copyright line in %s.", file_path)
+        self._add_finding(file_path, Finding(1, "Missing copyright line"))
         return CheckResult(problems_found=1)
 
     def fix_file(self, file_path: Path) -> None:
-        with open(file_path, encoding="utf-8") as file:
-            old = file.read()
-
-        with open(file_path, "w", encoding="utf-8") as file:
-            file.write(self._get_fix_copyright_description())
-            file.write(old)
+        write_atomically(file_path, self._get_fix_copyright_description().encode() + file_path.read_bytes())
 
 
 class TodoChecker(CheckerFixer):
     check_name = "todo"
+    cacheable = True
 
     @staticmethod
     def format_problem_count(count: int) -> str:
@@ -232,11 +257,12 @@ class TodoChecker(CheckerFixer):
         keywords = self.get_check_config().keywords
         keyword_patterns = [re.compile(rf"\b{re.escape(keyword)}\b") for keyword in keywords]
         error_counter = 0
-        for line_number, line in get_comment_lines(file_path):
+        for line_number, line in scan_source(file_path).get_comment_lines():
             for keyword, keyword_pattern in zip(keywords, keyword_patterns):
                 if keyword_pattern.search(line):
                     error_counter += 1
                     logger.warning(f"Found {keyword} in {file_path} at line {line_number}")
+                    self._add_finding(file_path, Finding(line_number, f"Found {keyword}"))
         return CheckResult(error_counter)
 
     def get_check_config(self) -> TodoCheckConfig:
@@ -246,6 +272,132 @@ class TodoChecker(CheckerFixer):
 class ClangFormatChecker(CheckerFixer):
     check_name = "clang-format"
     can_fix = True
+    cacheable = True
+    # Upper limit of files passed to one clang-format process, keeps command lines short
+    max_batch_size = 100
+
+    def check_files(self) -> int:
+        """Check files in batches, one clang-format process per batch instead of per file"""
+        file_paths = self.get_files_to_check()
+        self._load_cache()
+        batches = self._split_into_batches(file_paths)
+        results = run_grouped(self._check_and_fix_batch, batches, self._budget.jobs)
+        self._save_cache()
+        return self._record_results(
+            {
+                file_path: result
+                for batch, batch_results in zip(batches, results)
+                for file_path, result in zip(batch, batch_results)
+            }
+        )
+
+    def _split_into_batches(self, file_paths: List[Path]) -> List[List[Path]]:
+        if self._changed_lines is not None:
+            # Line ranges can be given only for a single file
+            return [[file_path] for file_path in file_paths]
+        # One batch per job, so all of them are busy, but never larger than max_batch_size
+        batch_size = min(self.max_batch_size, max(1, math.ceil(len(file_paths) / self._budget.jobs)))
+        return [file_paths[start : start + batch_size] for start in range(0, len(file_paths), batch_size)]
+
+    def _check_and_fix_batch(self, file_paths: List[Path]) -> List[CheckResult]:
+        start = time.perf_counter()
+        results: Dict[Path, CheckResult] = {}
+        digests: Dict[Path, str] = {}
+        if self._cache:
+            for file_path in file_paths:
+                digests[file_path] = self.get_file_digest(file_path)
+                cached = self._get_cached_result(file_path, digests[file_path])
+                if cached:
+                    results[file_path] = cached
+
+        to_check = [file_path for file_path in file_paths if file_path not in results]
+        with self._budget.reserve():
+            for file_path, (result, records) in self._check_batch(to_check).items():
+                replay_log_records(records)
+                if self._cache:
+                    self._put_cached_result(file_path, digests[file_path], result, records)
+                results[file_path] = result
+
+            if self._fix_errors:
+                to_fix = [
+                    file_path
+                    for file_path in file_paths
+                    if results[file_path].problems_found > 0 and results[file_path].fix
+                ]
+                if to_fix:
+                    logger.info("Fixing...")
+                    self.fix_files(to_fix)
+
+        # Time of a batch can not be split between its files
+        if len(file_paths) == 1:
+            self._record_duration(file_paths[0], time.perf_counter() - start)
+        return [results[file_path] for file_path in file_paths]
+
+    def _check_batch(self, file_paths: List[Path]) -> Dict[Path, Tuple[CheckResult, List[logging.LogRecord]]]:
+        """
+        Check all files with one clang-format process.
+
+        :param file_paths: files to check
+        :return: result of every file with log records which belong to it
+        """
+        results: Dict[Path, Tuple[CheckResult, List[logging.LogRecord]]] = {}
+        if len(file_paths) == 1:
+            with buffered_log_records() as records:
+                result = self.check_file(file_paths[0])
+            results[file_paths[0]] = (result, records)
+            return results
+        if not file_paths:
+            return results
+
+        cmd = ["/usr/bin/clang-format", "--style=file", "--dry-run", "-Werror", *map(str, file_paths)]
+        logger.info(" ".join(cmd))
+        process = subprocess.run(cmd, capture_output=True, check=False)
+        diagnostics = split_clang_diagnostics(process.stderr.decode(errors="replace"), file_paths)
+        if process.returncode != 0 and not diagnostics:
+            # Failure which can not be attributed to any file (e.g. invalid style), let every file report it
+            logger.debug("clang-format failed on a batch of files, checking them one by one")
+            for file_path in file_paths:
+                with buffered_log_records() as records:
+                    result = self.check_file(file_path)
+                results[file_path] = (result, records)
+            return results
+
+        for file_path in file_paths:
+            with buffered_log_records() as records:
+                if file_path not in diagnostics:
+                    result = CheckResult(0)
+                else:
+                    self._add_diagnostic_findings(file_path, diagnostics[file_path], "Code should be clang-formatted")
+                    if self._verbose:
+                        logger.info(diagnostics[file_path])
+                    else:
+                        logger.warning("clang-format found error in file %s", file_path)
+                    result = CheckResult(1)
+            results[file_path] = (result, records)
+        return results
+
+    def get_cache_context(self) -> Dict[str, Any]:
+        context = super().get_cache_context()
+        try:
+            context["version"] = subprocess.check_output(["/usr/bin/clang-format", "--version"]).decode()
+        except (OSError, subprocess.CalledProcessError):
+            context["version"] = None
+        style_file = self._config.project_root / ".clang-format"
+        context["style"] = file_digest(style_file) if style_file.is_file() else None
+        return context
+
+    def get_file_digest(self, file_path: Path) -> str:
+        """Digest of the file content and of the checked line ranges"""
+        digest = super().get_file_digest(file_path)
+        if self._changed_lines is None:
+            return digest
+        return context_digest({"digest": digest, "lines": self._changed_lines.get(normalize_path(file_path))})
+
+    def _get_lines_args(self, file_path: Path) -> List[str]:
+        if self._changed_lines is None:
+            return []
+        ranges = self._changed_lines.get(normalize_path(file_path))
+        return [f"--lines={first}:{last}" for first, last in ranges or []]
 
     def check_file(self, file_path: Path) -> CheckResult:
         cmd = [
@@ -253,6 +405,7 @@ class ClangFormatChecker(CheckerFixer):
             "--style=file",
             "--dry-run",
             "-Werror",
+            *self._get_lines_args(file_path),
             str(file_path),
         ]
         try:
@@ -260,6 +413,7 @@ class ClangFormatChecker(CheckerFixer):
             logger.info(f"{log_cmd}")
             subprocess.check_output(cmd)
         except subprocess.CalledProcessError as e:
+            self._add_diagnostic_findings(file_path, e.output.decode(), "Code should be clang-formatted")
             if self._verbose:
                 logger.info(e.output.decode())
             else:
@@ -268,33 +422,176 @@ class ClangFormatChecker(CheckerFixer):
         return CheckResult(0)
 
     def fix_file(self, file_path: Path) -> None:
-        subprocess.check_call(["/usr/bin/clang-format", "-style=file", "-i", str(file_path)])
+        """Format to stdout and replace the file atomically, only if anything changed"""
+        cmd = ["/usr/bin/clang-format", "--style=file", *self._get_lines_args(file_path), str(file_path)]
+        formatted = subprocess.check_output(cmd)
+        if formatted != file_path.read_bytes():
+            write_atomically(file_path, formatted)
+
+    def fix_files(self, file_paths: List[Path]) -> None:
+        if self._changed_lines is not None or len(file_paths) == 1:
+            # Line ranges can be given only for a single file
+            for file_path in file_paths:
+                self.fix_file(file_path)
+        else:
+            # clang-format writes only changed files, through a temporary file
+            subprocess.check_call(["/usr/bin/clang-format", "--style=file", "-i", *map(str, file_paths)])
 
 
 class ClangTidyChecker(CheckerFixer):
     check_name = "clang-tidy"
+    cacheable = True
     build_path: Optional[Path] = None
+    # Directory of the compilation database clang-tidy is run with
+    tidy_db_dir: Optional[Path] = None
+    _compile_db: Optional[CompileDatabase] = None
+    _dependency_digests: Optional[DependencyDigests] = None
 
-    def check_file(self, file_path: Path) -> CheckResult:
-        target = self._config.project.default_target
-        for profile in self._config.profiles:
-            profile_build_dir = self._config.project_root / target.get_profile_build_dir(profile)
-            if profile_build_dir.is_dir():
-                self.build_path = profile_build_dir
-                break
-
+    def check_files(self) -> int:
+        """
+        Check translation units from the compilation database with one parallel
+        run-clang-tidy pass, other files (e.g. headers) with a clang-tidy call each.
+        """
+        self.build_path = self._get_build_path()
         if not self.build_path:
+            # Other checkers keep running, the failure is reported with their results
+            self.execution_successful = False
+            return 1
+        self._compile_db = get_compile_database(self.build_path / COMPILE_DB_FILE_NAME)
+        self._dependency_digests = DependencyDigests(self._config.project_root, self._compile_db)
+        self.tidy_db_dir = (
+            prepare_esp32_compile_db(self.build_path) if self._config.project.is_esp32() else self.build_path
+        )
+
+        file_paths = self.get_files_to_check()
+        self._load_cache()
+        compile_db = self._compile_db
+        units = [file_path for file_path in file_paths if compile_db.get_entry(file_path)]
+        other_files = [file_path for file_path in file_paths if not compile_db.get_entry(file_path)]
+        results = self._check_translation_units(units)
+        results.update(
+            zip(other_files, run_grouped(self._check_and_fix_file, other_files, self._budget.jobs, self._budget))
+        )
+        self._save_cache()
+        return self._record_results(results)
+
+    def _check_translation_units(self, file_paths: List[Path]) -> Dict[Path, CheckResult]:
+        results: Dict[Path, CheckResult] = {}
+        digests: Dict[Path, str] = {}
+        to_check: List[Path] = []
+        for file_path in file_paths:
+            digests[file_path] = self.get_file_digest(file_path) if self._cache else ""
+            cached = self._get_cached_result(file_path, digests[file_path])
+            if cached:
+                results[file_path] = cached
+            else:
+                to_check.append(file_path)
+
+        for file_path, (result, records) in self._run_clang_tidy(to_check).items():
+            replay_log_records(records)
+            self._put_cached_result(file_path, digests[file_path], result, records)
+            results[file_path] = result
+        return results
+
+    def get_files_to_check(self) -> List[Path]:
+        """Changed files and translation units which include any of the changed headers"""
+        changed_files = self._changed_files
+        if changed_files is None or not self._dependency_digests:
+            return super().get_files_to_check()
+
+        dependency_digests = self._dependency_digests
+        return [
+            file_path
+            for file_path in self.find_source_files()
+            if dependency_digests.is_affected(file_path, changed_files)
+        ]
+
+    def _run_clang_tidy(self, file_paths: List[Path]) -> Dict[Path, Tuple[CheckResult, List[logging.LogRecord]]]:
+        """
+        Check translation units with one run-clang-tidy process using the whole job budget.
+
+        :param file_paths: files with an entry in the compilation database
+        :return: result of every file with log records which belong to it
+        """
+        results: Dict[Path, Tuple[CheckResult, List[logging.LogRecord]]] = {}
+        if not file_paths:
+            return results
+
+        # One process checks all files, there is no time of a single file
+        with self._budget.reserve(self._budget.jobs, minimum=self._budget.jobs) as jobs:
+            cmd = self._get_run_clang_tidy_cmd(file_paths, jobs)
+            logger.info(" ".join(cmd))
+            process = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, check=False)
+        outputs = split_run_clang_tidy_output(process.stdout.decode(errors="replace"), file_paths)
+        failed = {file_path for file_path, output in outputs.items() if has_error_diagnostic(output)}
+        if process.returncode != 0 and not failed:
+            # Failure which can not be attributed to any file, let every file report it
+            logger.debug("run-clang-tidy failed, checking files one by one")
+            for file_path in file_paths:
+                with buffered_log_records() as records:
+                    result = self.check_file(file_path)
+                results[file_path] = (result, records)
+            return results
+
+        for file_path in file_paths:
+            with buffered_log_records() as records:
+                if file_path in failed:
+                    self._add_diagnostic_findings(file_path, outputs[file_path], "clang-tidy found error")
+                    if self._verbose:
+                        logger.info(outputs[file_path])
+                    else:
+                        logger.warning("clang-tidy found error in file %s", file_path)
+                    result = CheckResult(1)
+                else:
+                    result = CheckResult(0)
+            results[file_path] = (result, records)
+        return results
+
+    def _get_run_clang_tidy_cmd(self, file_paths: List[Path], jobs: int) -> List[str]:
+        # esp-idf images ship the script under its original name
+        executable = "run-clang-tidy.py" if self._config.project.is_esp32() else "run-clang-tidy"
+        cmd = [executable, "-p", str(self.tidy_db_dir), "-j", str(jobs)]
+        if self._config.project.is_stm32() or self._config.project.is_atsam():
+            cmd.extend(f"-extra-arg=-I{include_dir}" for include_dir in self._get_arm_include_dirs())
+        # Files are regular expressions matched against absolute paths from the database
+        cmd.extend(f"^{re.escape(str(normalize_path(file_path)))}$" for file_path in file_paths)
+        return cmd
+
+    def _get_build_path(self) -> Optional[Path]:
+        """Build directory with the compilation database, None (after logging why) if there is none"""
+        build_path = find_profile_build_dir(self._config)
+        if not build_path:
             logger.error("Build folder does not exist.")
             logger.info("Did you run `scargo build`?")
-            sys.exit(1)
+            return None
 
-        cmd: List[str]
         # Check if compilation database exists:
-        if not Path(self.build_path, "compile_commands.json").exists():
+        if not Path(build_path, COMPILE_DB_FILE_NAME).exists():
             logger.error("Compilation database does not exist.")
             logger.info("Did you run `scargo build`?")
-            sys.exit(1)
+            return None
+        return build_path
+
+    def get_cache_context(self) -> Dict[str, Any]:
+        context = super().get_cache_context()
+        try:
+            context["version"] = subprocess.check_output(["clang-tidy", "--version"]).decode()
+        except (OSError, subprocess.CalledProcessError):
+            context["version"] = None
+        config_file = self._config.project_root / ".clang-tidy"
+        context["tidy_config"] = file_digest(config_file) if config_file.is_file() else None
+        context["target"] = self._config.project.target_id
+        context["build_path"] = str(self.build_path)
+        return context
+
+    def get_file_digest(self, file_path: Path) -> str:
+        """Digest of the compile command, the translation unit and all headers it includes"""
+        if not self._use_cache or not self._dependency_digests:
+            return super().get_file_digest(file_path)
+        return self._dependency_digests.get_digest(file_path)
 
+    def check_file(self, file_path: Path) -> CheckResult:
+        cmd: List[str]
         if self._config.project.is_esp32():
             cmd = self.__get_cmd_esp32(file_path)
         elif self._config.project.is_stm32() or self._config.project.is_atsam():
@@ -307,6 +604,7 @@ class ClangTidyChecker(CheckerFixer):
             logger.info(f"{log_cmd}")
             subprocess.check_output(cmd)
         except subprocess.CalledProcessError as e:
+            self._add_diagnostic_findings(file_path, e.output.decode(), "clang-tidy found error")
             if self._verbose:
                 logger.info(e.output.decode())
             else:
@@ -315,30 +613,10 @@ class ClangTidyChecker(CheckerFixer):
         return CheckResult(0)
 
     def __get_cmd_esp32(self, file_path: Path) -> List[str]:
-        # These flags are added by esp-idf, however they are not recognized by clang-tidy:
-        strings_to_substitute = [
-            "-mlongcalls",
-            "-fno-tree-switch-conversion",
-            "-fstrict-volatile-bitfields",
-            "-fno-shrink-wrap",
-        ]
-
-        with open(str(self.build_path) + "/compile_commands.json", encoding="utf-8") as fin:
-            file_contents = fin.read()
-
-        for string in strings_to_substitute:
-            file_contents = file_contents.replace(string, "")
-
-        db_path_for_check = str(self.build_path) + "/compilation_db_for_check" + "/compile_commands.json"
-
-        os.makedirs(os.path.dirname(db_path_for_check), exist_ok=True)
-        with open(db_path_for_check, "w", encoding="utf-8") as fout:
-            fout.write(file_contents)
-
         return [
             "run-clang-tidy.py",
             "-p",
-            str(os.path.dirname(db_path_for_check)),
+            str(self.tidy_db_dir),
             str(file_path),
         ]
 
@@ -347,53 +625,53 @@ class ClangTidyChecker(CheckerFixer):
 
     def __get_cmd_arm(self, file_path: Path) -> List[str]:
         cmd = self.__get_cmd_x86(file_path)
-        arm_none_eabi_includes = "/opt/gcc-arm-none-eabi/arm-none-eabi/include"
-
-        # Add includes to standard library from toolchain:
-        path = Path(arm_none_eabi_includes)
-        cmd.extend(["--extra-arg", f"-I{path}"])
-        cpp_ver = os.listdir(Path(path, "c++"))[-1]
-        path = Path(path, "c++", cpp_ver)
-        cmd.extend(["--extra-arg", f"-I{path}"])
-        path = Path(path, "arm-none-eabi")
-        cmd.extend(["--extra-arg", f"-I{path}"])
+        for include_dir in self._get_arm_include_dirs():
+            cmd.extend(["--extra-arg", f"-I{include_dir}"])
         return cmd
 
-
-def find_files(dir_path: Path, glob_patterns: Sequence[str], exclude_patterns: Sequence[str]) -> Iterable[Path]:
-    exclude_list = [path for pattern in exclude_patterns for path in glob.glob(pattern)]
-
-    for file_path in chain.from_iterable(dir_path.rglob(pattern) for pattern in glob_patterns):
-        if file_path.is_file():
-            if any(exclude in str(file_path) for exclude in exclude_list):
-                logger.info("Skipping %s", file_path)
-                continue
-
-            yield file_path
+    @staticmethod
+    def _get_arm_include_dirs() -> List[Path]:
+        """Includes to standard library from toolchain"""
+        path = Path("/opt/gcc-arm-none-eabi/arm-none-eabi/include")
+        cpp_ver = os.listdir(Path(path, "c++"))[-1]
+        cpp_path = Path(path, "c++", cpp_ver)
+        return [path, cpp_path, Path(cpp_path, "arm-none-eabi")]
 
 
 class CyclomaticChecker(CheckerFixer):
     check_name = "cyclomatic"
+    # Function metrics depend only on the file content, the threshold is applied afterwards
+    cacheable = True
+
+    @classmethod
+    def get_source_patterns(cls) -> Tuple[str, ...]:
+        return LIZARD_SOURCE_PATTERNS
 
     def check_files(self) -> int:
         """
-        Run lizard with the configured parameters and collect all cyclomatic complexity issues.
+        Measure functions with lizard and collect those exceeding the configured complexity threshold.
         """
-        cmd = ["lizard", str(self._config.source_dir_path), "-C", "25", "-w"]
-
-        for exclude_pattern in self.get_exclude_patterns():
-            cmd.extend(["-x", exclude_pattern])
-
-        all_issues = []
+        file_paths = self.get_files_to_check()
+        if self._changed_files is not None and not file_paths:
+            logger.info("No changed files to check.")
+            return 0
 
-        try:
-            log_cmd = " ".join(cmd)
-            logger.info(f"{log_cmd}")
-            result = subprocess.run(cmd, capture_output=True, text=True, check=False)
-            all_issues = self._collect_lizard_issues(result.stdout)
+        self._load_cache()
+        metrics = self._analyze_files(file_paths)
+        self._save_cache()
 
-        except subprocess.CalledProcessError:
-            logger.error(f"{self.check_name} check failed!")
+        threshold = self._config.check.cyclomatic.threshold
+        all_issues = [
+            function.format_warning(file_path)
+            for file_path in file_paths
+            for function in metrics[file_path]
+            if function.exceeds_limits(threshold)
+        ]
+        self._record_issues(all_issues, file_paths)
+        if self._changed_files is None:
+            write_complexity_report(
+                self._config.project_root / CYCLOMATIC_REPORT_PATH, self._config.project_root, threshold, metrics
+            )
 
         issue_len = len(all_issues)
         if issue_len:
@@ -404,15 +682,30 @@ class CyclomaticChecker(CheckerFixer):
             logger.info("No issues found in lizard output.")
         return issue_len
 
-    def _collect_lizard_issues(self, output: str) -> List[str]:
-        """
-        Parse lizard output and collect lines with warnings or errors.
-        """
-        issues = []
-        for line in output.splitlines():
-            if "warning:" in line or "error:" in line:
-                issues.append(line)
-        return issues
+    def _analyze_files(self, file_paths: List[Path]) -> Dict[Path, List[FunctionMetrics]]:
+        """Metrics of functions in every file, taken from the cache or computed in a process pool"""
+        results: Dict[Path, List[FunctionMetrics]] = {}
+        to_analyze: List[Tuple[Path, str, str]] = []
+        for file_path in file_paths:
+            content = file_path.read_bytes()
+            digest = hashlib.sha256(content).hexdigest()
+            cached = self._cache.get_data(file_path, digest) if self._cache else None
+            if cached is not None:
+                results[file_path] = [FunctionMetrics(*function) for function in cached]
+            else:
+                to_analyze.append((file_path, digest, content.decode(errors="replace")))
+
+        if to_analyze:
+            with self._budget.reserve(self._budget.jobs, minimum=self._budget.jobs) as jobs:
+                analyzed = analyze_sources([(str(file_path), code) for file_path, _, code in to_analyze], jobs)
+            for (file_path, digest, _), functions in zip(to_analyze, analyzed):
+                results[file_path] = functions
+                if self._cache:
+                    self._cache.put_data(file_path, digest, [list(function) for function in functions])
+        return results
+
+    def get_cache_context(self) -> Dict[str, Any]:
+        return {"check": self.check_name, "scargo": __version__, "lizard": LIZARD_VERSION}
 
     def report(self, count: int) -> None:
         logger.info(f"Finished {self.check_name} check with {count} issues.")
@@ -424,9 +717,13 @@ class CyclomaticChecker(CheckerFixer):
 class CppcheckChecker(CheckerFixer):
     check_name = "cppcheck"
 
-    def check_files(self) -> int:
+    def check_files(self) -> int:  # pylint: disable=too-many-branches
         """
         Run cppcheck with the configured suppressions and directories and collect all issues.
+
+        Translation units and their flags come from the compilation database of the
+        target when it was built, analysis results are kept in the build directory so that
+        only changed files are analysed again.
         """
         cmd = [
             "cppcheck",
@@ -434,26 +731,53 @@ class CppcheckChecker(CheckerFixer):
             "--inline-suppr",
             "--language=c++",
             "--std=c++17",
+            "--xml",
         ]
 
         # Add suppression rules
         for suppress in self.get_suppression_rules():
             cmd.append(f"--suppress={suppress}")
 
-        # Add directories to check
+        # Add directories to check, or only changed files in them
         directories = self.get_directories_to_check()
-        cmd.extend(directories)
+        file_paths: List[Path] = []
+        build_path = find_profile_build_dir(self._config)
+        compile_db = None
+        if build_path and Path(build_path, COMPILE_DB_FILE_NAME).is_file():
+            compile_db = get_compile_database(build_path / COMPILE_DB_FILE_NAME)
+        if build_path and compile_db and compile_db.entries:
+            cmd.append(f"--project={compile_db.path}")
+            cppcheck_build_dir = build_path / "cppcheck"
+            if self._changed_files is None:
+                filter_paths = self.get_directories_with_units(compile_db, directories)
+                if directories and not filter_paths:
+                    logger.info("No translation units to check.")
+                    return 0
+                cmd.extend(f"--file-filter={directory_path}/*" for directory_path in filter_paths)
+            else:
+                file_paths = self.get_changed_units_to_check(compile_db, directories)
+                cmd.extend(f"--file-filter={normalize_path(file_path)}" for file_path in file_paths)
+        else:
+            cppcheck_build_dir = self._config.project_root / "build" / "cppcheck"
+            if self._changed_files is None:
+                cmd.extend(directories)
+            else:
+                file_paths = self.get_changed_files_to_check(directories)
+                cmd.extend(map(str, file_paths))
+        if self._changed_files is not None and not file_paths:
+            logger.info("No changed files to check.")
+            return 0
 
-        all_issues = []
+        cppcheck_build_dir.mkdir(parents=True, exist_ok=True)
+        cmd.append(f"--cppcheck-build-dir={cppcheck_build_dir}")
 
-        try:
-            log_cmd = " ".join(cmd)
-            logger.info(f"{log_cmd}")
-            result = subprocess.run(cmd, capture_output=True, text=True, check=True)
-            if result.returncode != 0 or result.stderr:
-                all_issues = self._collect_cppcheck_issues(result.stderr)
-        except subprocess.CalledProcessError:
-            logger.error(f"{self.check_name} check failed!")
+        with self._budget.reserve(self._budget.jobs, minimum=self._budget.jobs) as jobs:
+            cmd.extend(["-j", str(jobs)])
+            all_issues = self._run_cppcheck(cmd)
+        if all_issues is None:
+            # Nothing is known about the checked files, count the broken run as a problem
+            return 1
+        self._record_issues(all_issues, file_paths)
 
         # Return the total number of issues found
         issue_len = len(all_issues)
@@ -463,23 +787,25 @@ class CppcheckChecker(CheckerFixer):
                 logger.warning(issue)
         return issue_len
 
-    def _collect_cppcheck_issues(self, output: str) -> List[str]:
-        """
-        Collect cppcheck issues and return a list of all problems found.
-        """
-        issues = []
-        issue_pattern = re.compile(r"(.+):(\d+):\d+: (.+) \[(.+)\]")
-
-        for line in output.splitlines():
-            match = issue_pattern.match(line)
-            if match:
-                file_path = match.group(1)
-                line_number = match.group(2)
-                message = match.group(3)
-                category = match.group(4)
-                formatted_issue = f"{file_path}:{line_number}: {message} [{category}]"
-                issues.append(formatted_issue)
-
+    def _run_cppcheck(self, cmd: List[str]) -> Optional[List[str]]:
+        log_cmd = " ".join(cmd)
+        logger.info(f"{log_cmd}")
+        # Progress is printed to stdout, results to stderr
+        with subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE) as process:
+            assert process.stderr
+            issues: Optional[List[str]]
+            try:
+                issues = list(iter_cppcheck_xml_issues(process.stderr))
+            except ElementTree.ParseError as e:
+                logger.error(f"Unable to parse {self.check_name} output: {e}")
+                self.execution_successful = False
+                issues = None
+            process.stderr.read()
+            returncode = process.wait()
+        if returncode != 0:
+            logger.error(f"{self.check_name} check failed!")
+            self.execution_successful = False
+            return None
         return issues
 
     def report(self, count: int) -> None:
@@ -505,5 +831,45 @@ class CppcheckChecker(CheckerFixer):
         cppcheck_config = self._config.check.cppcheck
         return cppcheck_config.directories  # Ensure this attribute exists and is a List[str]
 
+    def get_directories_with_units(self, compile_db: CompileDatabase, directories: List[str]) -> List[Path]:
+        """
+        Configured directories which contain translation units of the compilation database,
+        cppcheck fails on a file filter which matches no files.
+        """
+        directory_paths = []
+        for directory in directories:
+            directory_path = normalize_path(self._config.project_root / directory)
+            if any(directory_path in file_path.parents for file_path in compile_db.entries):
+                directory_paths.append(directory_path)
+            else:
+                logger.info(f"No translation units in {directory}, skipping it")
+        return directory_paths
+
+    def get_changed_units_to_check(self, compile_db: CompileDatabase, directories: List[str]) -> List[Path]:
+        """
+        Translation units inside the configured directories (all if there are none)
+        which changed or include a changed file.
+        """
+        changed_files = self._changed_files or set()
+        directory_paths = [normalize_path(self._config.project_root / directory) for directory in directories]
+        dependency_digests = DependencyDigests(self._config.project_root, compile_db)
+        return [
+            file_path
+            for file_path in sorted(compile_db.entries)
+            if (not directory_paths or any(path in file_path.parents for path in directory_paths))
+            and dependency_digests.is_affected(file_path, changed_files)
+        ]
+
+    def get_changed_files_to_check(self, directories: List[str]) -> List[Path]:
+        """
+        Changed source files inside the configured directories (all changed source files if there are none).
+        """
+        directory_paths = [normalize_path(self._config.project_root / directory) for directory in directories]
+        return [
+            file_path
+            for file_path in self.get_files_to_check()
+            if not directory_paths or any(path in normalize_path(file_path).parents for path in directory_paths)
+        ]
+
     def check_file(self, file_path: Path) -> CheckResult:
         raise NotImplementedError
@@ -0,0 +1,290 @@
+"""Base of all checkers run by `scargo check`"""
+
+import abc
+import logging
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Sequence, Set, Tuple
+
+from scargo import __version__
+from scargo.commands.check_report import (
+    CheckerRun,
+    Finding,
+    parse_clang_diagnostics,
+    parse_issue,
+)
+from scargo.config import CheckConfig, Config
+from scargo.logger import buffered_log_records, get_logger, replay_log_records
+from scargo.utils.check_cache import (
+    CHECK_CACHE_DIR,
+    CachedCheckResult,
+    CheckCache,
+    file_digest,
+)
+from scargo.utils.file_index import get_file_index
+from scargo.utils.parallel_utils import JobBudget, run_grouped
+from scargo.utils.path_utils import normalize_path
+
+logger = get_logger()
+
+
+class CheckResult(NamedTuple):
+    problems_found: int
+    fix: bool = True
+
+
+class CheckerFixer(abc.ABC):
+    check_name: str
+    headers_only = False
+    can_fix = False
+    # Result of `check_file` depends only on the file content and `get_cache_context`
+    cacheable = False
+
+    def __init__(
+        self,
+        config: Config,
+        fix_errors: bool = False,
+        verbose: bool = False,
+        jobs: Optional[int] = None,
+        budget: Optional[JobBudget] = None,
+        use_cache: bool = False,
+        changed_files: Optional[Set[Path]] = None,
+        changed_lines: Optional[Dict[Path, Optional[List[Tuple[int, int]]]]] = None,
+    ) -> None:
+        """
+        :param config: project configuration
+        :param bool fix_errors: fix problems which can be fixed
+        :param bool verbose: log output of the tools
+        :param jobs: number of jobs run in parallel, ignored when `budget` is given
+        :param budget: job budget shared with other checkers
+        :param bool use_cache: reuse results of files which did not change since the previous run
+        :param changed_files: check only these files, all files if None
+        :param changed_lines: check only these files, and only given line ranges (first and last line)
+            where the checker supports it, None as ranges means the whole file
+        """
+        if changed_lines is not None and changed_files is None:
+            changed_files = set(changed_lines)
+        self._config = config
+        self._fix_errors = fix_errors
+        self._verbose = verbose
+        self._budget = budget or JobBudget(jobs)
+        self._use_cache = use_cache and self.cacheable
+        self._cache: Optional[CheckCache] = None
+        # None means that all files are checked
+        self._changed_files = {normalize_path(path) for path in changed_files} if changed_files is not None else None
+        self._changed_lines = (
+            {normalize_path(path): ranges for path, ranges in changed_lines.items()}
+            if changed_lines is not None
+            else None
+        )
+        # Number of problems in every checked file, filled by `check_files`
+        self.problems_by_file: Dict[Path, int] = {}
+        # Problems with their location and wall time of every checked file, for machine-readable output
+        self.findings: Dict[Path, List[Finding]] = {}
+        self.file_durations: Dict[Path, float] = {}
+        self.duration = 0.0
+        # Cleared when the tool fails, e.g. its output can not be read
+        self.execution_successful = True
+        # Findings with their file, by the checked file which reported them (e.g. a translation unit for its headers)
+        self._findings_by_source: Dict[Path, List[Tuple[Path, Finding]]] = {}
+        self._findings_lock = threading.Lock()
+
+    def check(self) -> int:
+        logger.info(f"Starting {self.check_name} check...")
+        start = time.perf_counter()
+        error_count = self.check_files()
+        self.duration = time.perf_counter() - start
+        self.report(error_count)
+        return error_count
+
+    def get_run(self, problems: int) -> CheckerRun:
+        return CheckerRun(
+            self.check_name, problems, self.duration, self.findings, self.file_durations, self.execution_successful
+        )
+
+    def _add_finding(self, file_path: Path, finding: Finding, source_path: Optional[Path] = None) -> None:
+        """
+        :param file_path: file the finding is in
+        :param finding: the finding
+        :param source_path: checked file which reported the finding, `file_path` by default
+        """
+        file_path = normalize_path(file_path)
+        source_path = normalize_path(source_path) if source_path else file_path
+        with self._findings_lock:
+            self._findings_by_source.setdefault(source_path, []).append((file_path, finding))
+            findings = self.findings.setdefault(file_path, [])
+            # Headers are reported again by every translation unit which includes them
+            if finding not in findings:
+                findings.append(finding)
+
+    def _add_diagnostic_findings(self, file_path: Path, output: str, message: str) -> None:
+        """Findings from clang diagnostics of the file, or one with `message` if there are none"""
+        diagnostics = parse_clang_diagnostics(output) or [(file_path, Finding(None, message))]
+        for diagnostic_path, finding in diagnostics:
+            self._add_finding(diagnostic_path, finding, file_path)
+
+    def _record_duration(self, file_path: Path, duration: float) -> None:
+        self.file_durations[normalize_path(file_path)] = duration
+
+    @classmethod
+    def get_source_patterns(cls) -> Tuple[str, ...]:
+        return ("*.h", "*.hpp") if cls.headers_only else ("*.h", "*.hpp", "*.c", "*.cpp")
+
+    def find_source_files(self) -> List[Path]:
+        return list(
+            find_files(
+                self._config.source_dir_path,
+                self.get_source_patterns(),
+                self.get_exclude_patterns(),
+            )
+        )
+
+    def get_files_to_check(self) -> List[Path]:
+        file_paths = self.find_source_files()
+        if self._changed_files is None:
+            return file_paths
+        return [file_path for file_path in file_paths if normalize_path(file_path) in self._changed_files]
+
+    def check_files(self) -> int:
+        file_paths = self.get_files_to_check()
+        self._load_cache()
+        results = run_grouped(self._check_and_fix_file, file_paths, self._budget.jobs, self._budget)
+        self._save_cache()
+        return self._record_results(dict(zip(file_paths, results)))
+
+    def _record_results(self, results: Dict[Path, CheckResult]) -> int:
+        """Store problems found in every file and return the total number"""
+        for file_path, result in results.items():
+            self.problems_by_file[normalize_path(file_path)] = result.problems_found
+        return sum(result.problems_found for result in results.values())
+
+    def _record_issues(self, issues: List[str], file_paths: Iterable[Path] = ()) -> None:
+        """Count issues reported as `file:line: message` in every file, `file_paths` were checked"""
+        for file_path in file_paths:
+            self.problems_by_file.setdefault(normalize_path(file_path), 0)
+        for issue in issues:
+            file_path, finding = parse_issue(issue)
+            file_path = normalize_path(file_path)
+            self.problems_by_file[file_path] = self.problems_by_file.get(file_path, 0) + 1
+            self._add_finding(file_path, finding)
+
+    def _load_cache(self) -> None:
+        if self._use_cache:
+            cache_file = self._config.project_root / CHECK_CACHE_DIR / f"{self.check_name}.json"
+            self._cache = CheckCache(cache_file, self.get_cache_context())
+
+    def _save_cache(self) -> None:
+        if self._cache:
+            self._cache.save(prune=self._changed_files is None)
+
+    def get_cache_context(self) -> Dict[str, Any]:
+        """Everything apart from the file content which affects the result of `check_file`"""
+        return {
+            "check": self.check_name,
+            "scargo": __version__,
+            "config": self.get_check_config().dict(),
+            "verbose": self._verbose,
+        }
+
+    def get_file_digest(self, file_path: Path) -> str:
+        """Digest of all files the result of `check_file` depends on"""
+        return file_digest(file_path)
+
+    def _check_file_cached(self, file_path: Path) -> CheckResult:
+        if not self._cache:
+            return self.check_file(file_path)
+
+        digest = self.get_file_digest(file_path)
+        cached = self._get_cached_result(file_path, digest)
+        if cached:
+            return cached
+
+        with buffered_log_records() as records:
+            result = self.check_file(file_path)
+        replay_log_records(records)
+        self._put_cached_result(file_path, digest, result, records)
+        return result
+
+    def _get_cached_result(self, file_path: Path, digest: str) -> Optional[CheckResult]:
+        """Replay messages of the cached result and return it, if there is one"""
+        cached = self._cache.get(file_path, digest) if self._cache else None
+        if not cached:
+            return None
+        logger.debug("Using cached %s result for %s", self.check_name, file_path)
+        for level, message in cached.messages:
+            logger.log(level, message)
+        for line, message, finding_level, finding_path in cached.findings:
+            self._add_finding(
+                Path(finding_path) if finding_path else file_path, Finding(line, message, finding_level), file_path
+            )
+        return CheckResult(cached.problems_found, cached.fix)
+
+    def _put_cached_result(
+        self, file_path: Path, digest: str, result: CheckResult, records: List[logging.LogRecord]
+    ) -> None:
+        if self._cache:
+            messages = [(record.levelno, record.getMessage()) for record in records]
+            source_path = normalize_path(file_path)
+            findings: List[Tuple[Optional[int], str, str, Optional[str]]] = [
+                (finding.line, finding.message, finding.level, None if path == source_path else str(path))
+                for path, finding in self._findings_by_source.get(source_path, [])
+            ]
+            self._cache.put(file_path, digest, CachedCheckResult(result.problems_found, result.fix, messages, findings))
+
+    def _check_and_fix_file(self, file_path: Path) -> CheckResult:
+        start = time.perf_counter()
+        result = self._check_file_cached(file_path)
+        self._record_duration(file_path, time.perf_counter() - start)
+        if result.problems_found > 0 and self._fix_errors and self.can_fix and result.fix:
+            logger.info("Fixing...")
+            self.fix_file(file_path)
+        return result
+
+    def report(self, count: int) -> None:
+        problem_count = self.format_problem_count(count)
+        if self._fix_errors and self.can_fix:
+            logger.info(f"Finished {self.check_name} check. Fixed {problem_count}.")
+        else:
+            logger.info(f"Finished {self.check_name} check. Found {problem_count}.")
+            if count > 0:
+                logger.error(f"{self.check_name} check fail!")
+
+    @staticmethod
+    def format_problem_count(count: int) -> str:
+        return f"problems in {count} files"
+
+    def get_exclude_patterns(self) -> List[str]:
+        return [*self._config.check.exclude, *self.get_check_config().exclude]
+
+    def get_check_config(self) -> CheckConfig:
+        return getattr(self._config.check, self.check_name.replace("-", "_"))  # type: ignore[no-any-return]
+
+    @abc.abstractmethod
+    def check_file(self, file_path: Path) -> CheckResult:
+        pass
+
+    def fix_file(self, file_path: Path) -> None:
+        pass
+
+
+def find_profile_build_dir(config: Config) -> Optional[Path]:
+    """Build directory of the first profile of the default target which was built"""
+    target = config.project.default_target
+    for profile in config.profiles:
+        profile_build_dir = config.project_root / target.get_profile_build_dir(profile)
+        if profile_build_dir.is_dir():
+            return profile_build_dir
+    return None
+
+
+def find_files(dir_path: Path, glob_patterns: Sequence[str], exclude_patterns: Sequence[str]) -> Iterable[Path]:
+    """
+    Find files in the shared index of `dir_path`.
+
+    :param dir_path: directory to search
+    :param glob_patterns: patterns file names are matched against
+    :param exclude_patterns: gitignore-style patterns relative to the project root
+    :return: found files
+    """
+    return get_file_index(dir_path).find(glob_patterns, exclude_patterns)
@@ -0,0 +1,187 @@
+"""Machine-readable results of `scargo check`"""
+
+import json
+import re
+from enum import Enum
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from scargo import __version__
+from scargo.logger import get_logger
+from scargo.utils.path_utils import normalize_path
+
+logger = get_logger()
+
+SARIF_SCHEMA = "https://json.schemastore.org/sarif-2.1.0.json"
+
+# `file:line[:column]: [severity:] message`, as printed by clang tools, cppcheck and lizard
+_ISSUE_PATTERN = re.compile(r"^(?P<file>[^:]+):(?P<line>\d+):(?:\d+:)? ?(?:(?P<severity>[a-z]+): )?(?P<message>.*)$")
+_CLANG_DIAGNOSTIC_PATTERN = re.compile(r"^(.+?):(\d+):\d+: (error|warning): (.*)$", re.MULTILINE)
+
+
+class CheckOutputFormat(str, Enum):
+    SARIF = "sarif"
+    JSON = "json"
+
+
+class Finding(NamedTuple):
+    line: Optional[int]
+    message: str
+    # SARIF level: error, warning or note
+    level: str = "warning"
+
+
+class CheckerRun(NamedTuple):
+    check_name: str
+    problems: int
+    # Wall time in seconds
+    duration: float
+    findings: Dict[Path, List[Finding]]
+    file_durations: Dict[Path, float]
+    # False if the tool failed, so its findings are incomplete
+    execution_successful: bool = True
+
+
+def _get_level(severity: Optional[str]) -> str:
+    if severity in ("error", "note"):
+        return severity
+    # cppcheck reports also style, performance, portability and information
+    return "note" if severity == "information" else "warning"
+
+
+def parse_issue(issue: str) -> Tuple[Path, Finding]:
+    """
+    Split issue reported as `file:line: message` into the file and the finding
+
+    :param str issue: issue printed by a tool
+    :return: path of the file as printed and the finding
+    """
+    match = _ISSUE_PATTERN.match(issue)
+    if not match:
+        return Path(issue.split(":", 1)[0]), Finding(None, issue)
+    return Path(match["file"]), Finding(int(match["line"]), match["message"], _get_level(match["severity"]))
+
+
+def parse_clang_diagnostics(output: str) -> List[Tuple[Path, Finding]]:
+    """
+    Warnings and errors in output of clang-format or clang-tidy for one file
+
+    :param str output: output of the tool
+    :return: path of the file every diagnostic is in, as printed (e.g. an included header), with the finding
+    """
+    return [
+        (Path(file_path), Finding(int(line), message, _get_level(severity)))
+        for file_path, line, severity, message in _CLANG_DIAGNOSTIC_PATTERN.findall(output)
+    ]
+
+
+def get_default_output_path(output_format: CheckOutputFormat) -> Path:
+    return Path("build", f"scargo_check.{output_format.value}")
+
+
+def write_check_report(
+    output_path: Path, output_format: CheckOutputFormat, project_root: Path, runs: Sequence[CheckerRun]
+) -> None:
+    """
+    Write findings and timings of all checkers.
+
+    :param output_path: path of the report
+    :param output_format: SARIF 2.1.0 for code scanning tools, or plain JSON
+    :param project_root: file paths in the report are relative to it
+    :param runs: results of every checker
+    """
+    project_root = normalize_path(project_root)
+    if output_format == CheckOutputFormat.SARIF:
+        report = _get_sarif_report(project_root, runs)
+    else:
+        report = get_json_report(project_root, runs)
+    try:
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        output_path.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+    except OSError as e:
+        logger.error("Unable to write check results to %s: %s", output_path, e)
+        return
+    logger.info("Check results written to %s", output_path)
+
+
+def _get_relative_path(file_path: Path, project_root: Path) -> str:
+    path = normalize_path(file_path)
+    if project_root in path.parents:
+        return path.relative_to(project_root).as_posix()
+    return path.as_posix()
+
+
+def _get_file_durations(run: CheckerRun, project_root: Path) -> Dict[str, float]:
+    """Wall time of every file, slowest first"""
+    return {
+        _get_relative_path(file_path, project_root): round(duration, 6)
+        for file_path, duration in sorted(run.file_durations.items(), key=lambda item: item[1], reverse=True)
+    }
+
+
+def get_json_report(project_root: Path, runs: Sequence[CheckerRun]) -> Dict[str, Any]:
+    """Report written by `--output-format json`, `project_root` has to be normalized"""
+    return {
+        "scargo": __version__,
+        "checkers": [
+            {
+                "name": run.check_name,
+                "problems": run.problems,
+                "duration": round(run.duration, 6),
+                "execution_successful": run.execution_successful,
+                "file_durations": _get_file_durations(run, project_root),
+            }
+            for run in runs
+        ],
+        "findings": [
+            {
+                "checker": run.check_name,
+                "file": _get_relative_path(file_path, project_root),
+                "line": finding.line,
+                "level": finding.level,
+                "message": finding.message,
+            }
+            for run in runs
+            for file_path, findings in sorted(run.findings.items())
+            for finding in findings
+        ],
+    }
+
+
+def _get_sarif_report(project_root: Path, runs: Sequence[CheckerRun]) -> Dict[str, Any]:
+    """One SARIF run per checker, timings are stored in properties of its invocation"""
+    sarif_runs = []
+    for run in runs:
+        results = []
+        for file_path, findings in sorted(run.findings.items()):
+            for finding in findings:
+                location: Dict[str, Any] = {
+                    "artifactLocation": {"uri": _get_relative_path(file_path, project_root), "uriBaseId": "SRCROOT"}
+                }
+                if finding.line:
+                    location["region"] = {"startLine": finding.line}
+                results.append(
+                    {
+                        "ruleId": run.check_name,
+                        "level": finding.level,
+                        "message": {"text": finding.message},
+                        "locations": [{"physicalLocation": location}],
+                    }
+                )
+        sarif_runs.append(
+            {
+                "tool": {"driver": {"name": f"scargo {run.check_name}", "version": __version__}},
+                "originalUriBaseIds": {"SRCROOT": {"uri": project_root.as_uri() + "/"}},
+                "invocations": [
+                    {
+                        "executionSuccessful": run.execution_successful,
+                        "properties": {
+                            "duration": round(run.duration, 6),
+                            "fileDurations": _get_file_durations(run, project_root),
+                        },
+                    }
+                ],
+                "results": results,
+            }
+        )
+    return {"$schema": SARIF_SCHEMA, "version": "2.1.0", "runs": sarif_runs}
@@ -0,0 +1,182 @@
+"""Resident process answering check requests on a Unix socket"""
+
+import json
+import socket
+import socketserver
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    Type,
+)
+
+from scargo.commands.check_report import get_json_report
+from scargo.commands.check_watch import select_affected_checkers
+from scargo.logger import get_logger
+from scargo.utils.file_index import clear_file_indexes, get_file_index
+from scargo.utils.path_utils import normalize_path
+
+if TYPE_CHECKING:
+    from scargo.commands.check_base import CheckerFixer
+
+logger = get_logger()
+
+# Relative to the project root, the directory is mounted in the docker container as well
+DEFAULT_SOCKET_PATH = Path("build", ".scargo_check.sock")
+
+RunCheckers = Callable[[List[Type["CheckerFixer"]], Optional[Set[Path]]], List[Tuple["CheckerFixer", int]]]
+
+
+class CheckServer(socketserver.UnixStreamServer):
+    """
+    Run checkers on files named in requests, one request at a time.
+
+    Requests and responses are JSON objects, one per line. A request is
+    `{"files": ["src/foo.cpp"], "checkers": ["clang-format"]}`, `checkers` is optional
+    and defaults to all checkers the server was started with. The response is the JSON
+    report of `--output-format json` with the total `problems` and `duration` added,
+    or `{"error": "..."}` for an invalid request or a failed check.
+    """
+
+    def __init__(
+        self,
+        socket_path: Path,
+        project_root: Path,
+        source_dir: Path,
+        checker_classes: List[Type["CheckerFixer"]],
+        run_checkers: RunCheckers,
+    ) -> None:
+        """
+        :param socket_path: path of the socket to listen on
+        :param project_root: paths in requests and responses are relative to it
+        :param source_dir: directory with checked files
+        :param checker_classes: checkers run by default
+        :param run_checkers: function running given checkers on given files
+        """
+        self.project_root = normalize_path(project_root)
+        self._source_dir = source_dir
+        self._checker_classes = checker_classes
+        self._run_checkers = run_checkers
+        self._lock = threading.Lock()
+        super().__init__(str(socket_path), _CheckRequestHandler)
+
+    def handle_check_request(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        files = {normalize_path(self.project_root / file_name) for file_name in request["files"]}
+        checker_names = request.get("checkers")
+        checker_classes = [
+            checker_class
+            for checker_class in self._checker_classes
+            if checker_names is None or checker_class.check_name in checker_names
+        ]
+        if checker_names is not None and len(checker_classes) != len(set(checker_names)):
+            known = {checker_class.check_name for checker_class in self._checker_classes}
+            raise ValueError(f"Unknown checkers: {', '.join(sorted(set(checker_names) - known))}")
+
+        start = time.perf_counter()
+        with self._lock:
+            # Files created since the index was built would not be found by checkers, deleted ones would fail them
+            file_index = get_file_index(self._source_dir)
+            if any(file_path.is_file() != (file_path in file_index) for file_path in files):
+                clear_file_indexes()
+            affected = select_affected_checkers(checker_classes, files)
+            results = self._run_checkers(affected, files) if affected else []
+        response = get_json_report(self.project_root, [checker.get_run(count) for checker, count in results])
+        response["problems"] = sum(count for _, count in results)
+        response["duration"] = round(time.perf_counter() - start, 6)
+        return response
+
+
+class _CheckRequestHandler(socketserver.StreamRequestHandler):
+    server: CheckServer
+
+    def handle(self) -> None:
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            try:
+                request = json.loads(line)
+                if not isinstance(request, dict) or not isinstance(request.get("files"), list):
+                    raise ValueError("Request must be an object with a list of files")
+                response = self.server.handle_check_request(request)
+            except (ValueError, TypeError, OSError) as e:
+                response = {"error": str(e)}
+            except SystemExit:
+                # Raised by a helper giving up on the whole command, the server keeps running
+                response = {"error": "Check failed, see the server log"}
+            self.wfile.write(json.dumps(response).encode() + b"\n")
+            self.wfile.flush()
+
+
+def serve_checks(
+    socket_path: Path,
+    project_root: Path,
+    source_dir: Path,
+    checker_classes: List[Type["CheckerFixer"]],
+    run_checkers: RunCheckers,
+) -> None:
+    """
+    Answer check requests on `socket_path` until interrupted.
+
+    Config, file index, compilation databases and check caches stay loaded between requests.
+    Parameters are described in `CheckServer`.
+    """
+    if socket_path.exists():
+        if _is_listening(socket_path):
+            logger.error("Check server is already running on %s", socket_path)
+            sys.exit(1)
+        # Left by a server which was killed
+        socket_path.unlink()
+    socket_path.parent.mkdir(parents=True, exist_ok=True)
+
+    with CheckServer(socket_path, project_root, source_dir, checker_classes, run_checkers) as server:
+        logger.info("Serving check requests on %s, press Ctrl+C to stop.", socket_path)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            logger.info("Stopped serving.")
+        finally:
+            socket_path.unlink()
+
+
+def request_check(
+    socket_path: Path, files: Sequence[Path], checkers: Optional[Sequence[str]] = None, timeout: Optional[float] = None
+) -> Dict[str, Any]:
+    """
+    Ask the server listening on `socket_path` to check files.
+
+    :param socket_path: socket of the server
+    :param files: files to check, relative to the project root or absolute
+    :param checkers: names of checkers to run, all checkers of the server by default
+    :param timeout: seconds to wait for the response
+    :return: response of the server
+    """
+    request: Dict[str, Any] = {"files": [str(file_path) for file_path in files]}
+    if checkers is not None:
+        request["checkers"] = list(checkers)
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.settimeout(timeout)
+        client.connect(str(socket_path))
+        with client.makefile("rwb") as stream:
+            stream.write(json.dumps(request).encode() + b"\n")
+            stream.flush()
+            response: Dict[str, Any] = json.loads(stream.readline())
+    return response
+
+
+def _is_listening(socket_path: Path) -> bool:
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        try:
+            client.connect(str(socket_path))
+        except OSError:
+            return False
+    return True
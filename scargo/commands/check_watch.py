@@ -0,0 +1,100 @@
+"""Re-check files whenever they change"""
+
+import fnmatch
+from pathlib import Path
+from typing import (
+    TYPE_CHECKING,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    Type,
+)
+
+from scargo.logger import get_logger
+from scargo.utils.file_index import clear_file_indexes
+from scargo.utils.file_watcher import FileWatcher
+
+if TYPE_CHECKING:
+    from scargo.commands.check_base import CheckerFixer
+
+logger = get_logger()
+
+
+def watch_and_check(
+    source_dir: Path,
+    initial_results: List[Tuple["CheckerFixer", int]],
+    run_checkers: Callable[[List[Type["CheckerFixer"]], Optional[Set[Path]]], List[Tuple["CheckerFixer", int]]],
+) -> None:
+    """
+    Re-run checkers on files changed under `source_dir` until interrupted.
+
+    Only checkers which look at the changed files are run, and only on those files
+    (clang-tidy also on translation units including them). Everything which does not
+    depend on the changed files (config, file index, compilation database, scan results)
+    stays warm between runs.
+
+    :param source_dir: directory to watch
+    :param initial_results: checkers of the first, complete run with their problem counts
+    :param run_checkers: function running given checkers on given files
+    """
+    checker_classes = [type(checker) for checker, _ in initial_results]
+    problems = {checker.check_name: dict(checker.problems_by_file) for checker, _ in initial_results}
+    _log_watch_summary(problems)
+
+    watcher = FileWatcher(source_dir)
+    logger.info("Watching %s for changes, press Ctrl+C to stop.", source_dir)
+    try:
+        while True:
+            changes = watcher.wait_for_changes()
+            previous = {check_name: sum(file_problems.values()) for check_name, file_problems in problems.items()}
+            if changes.tree_changed:
+                clear_file_indexes()
+            removed = {file_path for file_path in changes.files if not file_path.exists()}
+            changed = changes.files - removed
+            for file_problems in problems.values():
+                for file_path in changes.files:
+                    file_problems.pop(file_path, None)
+                # Removed directories take all files inside with them
+                for file_path in [path for path in file_problems if not removed.isdisjoint(path.parents)]:
+                    del file_problems[file_path]
+
+            affected = select_affected_checkers(checker_classes, changed)
+            if affected:
+                logger.info("%d files changed, checking them again...", len(changed))
+                for checker, _ in run_checkers(affected, changed):
+                    problems[checker.check_name].update(checker.problems_by_file)
+            if affected or removed:
+                _log_watch_summary(problems, previous)
+    except KeyboardInterrupt:
+        logger.info("Stopped watching.")
+    finally:
+        watcher.close()
+
+
+def select_affected_checkers(
+    checker_classes: List[Type["CheckerFixer"]], file_paths: Iterable[Path]
+) -> List[Type["CheckerFixer"]]:
+    """Checkers which look at any of the files"""
+    file_names = {file_path.name for file_path in file_paths}
+    return [
+        checker_class
+        for checker_class in checker_classes
+        if any(
+            fnmatch.fnmatch(file_name, pattern)
+            for file_name in file_names
+            for pattern in checker_class.get_source_patterns()
+        )
+    ]
+
+
+def _log_watch_summary(problems: Dict[str, Dict[Path, int]], previous: Optional[Dict[str, int]] = None) -> None:
+    """Log problem counts of all checkers, with the difference to the previous run"""
+    logger.info("Summary:")
+    for check_name, file_problems in problems.items():
+        count = sum(file_problems.values())
+        change = count - previous[check_name] if previous else 0
+        logger.info("%s: %d problems found%s", check_name, count, f" ({change:+d})" if change else "")
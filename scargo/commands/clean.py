@@ -18,7 +18,7 @@ def _case_insensitive_find_dir(source_dir: Path, dirname: str) -> Optional[Path]
     return None
 
 
-EXCLUDE_FROM_CLEAN = [".cmake_fetch_cache"]
+EXCLUDE_FROM_CLEAN = [".cmake_fetch_cache", ".compiler_cache"]
 
 
 def handle_item_deletion(item: Path) -> None:
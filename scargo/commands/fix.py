@@ -1,41 +1,56 @@
 """Format project code using formatter"""
 
 import os
-from typing import List, Type
-
-from scargo.commands.check import (
-    CheckerFixer,
-    ClangFormatChecker,
-    CopyrightChecker,
-    PragmaChecker,
-)
+from typing import List, Optional, Type
+
+from scargo.commands.check import ClangFormatChecker, CopyrightChecker, PragmaChecker
+from scargo.commands.check_base import CheckerFixer
 from scargo.config_utils import prepare_config
+from scargo.logger import get_logger
+from scargo.utils.git_utils import get_changed_lines
+
+logger = get_logger()
 
 
-def scargo_fix(pragma: bool, copy_right: bool, clang_format: bool) -> None:
+def scargo_fix(
+    pragma: bool,
+    copy_right: bool,
+    clang_format: bool,
+    jobs: Optional[int] = None,
+    lines_changed_since: Optional[str] = None,
+) -> None:
     """
     Fix format
 
     :param bool pragma: fix pragma format
     :param bool copy_right: fix copyrights
     :param bool clang_format: fix clang format
+    :param jobs: number of files fixed in parallel, defaults to the number of CPU cores
+    :param lines_changed_since: fix only files changed since this git ref, format only their changed lines
     :return: None
     """
     config = prepare_config()
 
+    # clang-format goes first, so its line ranges are not shifted by lines inserted by other fixers
     checkers: List[Type[CheckerFixer]] = []
+    if clang_format:
+        checkers.append(ClangFormatChecker)
     if pragma:
         checkers.append(PragmaChecker)
     if copy_right:
         checkers.append(CopyrightChecker)
-    if clang_format:
-        checkers.append(ClangFormatChecker)
 
     if not checkers:
-        checkers = [PragmaChecker, CopyrightChecker, ClangFormatChecker]
+        checkers = [ClangFormatChecker, PragmaChecker, CopyrightChecker]
 
     # Todo, remove chdir and change cwd for checks
     os.chdir(config.project_root)
 
+    changed_lines = None
+    if lines_changed_since:
+        changed_lines = get_changed_lines(config.project_root, lines_changed_since)
+        logger.info("Fixing %d files changed since %s", len(changed_lines), lines_changed_since)
+
+    # Fixers of one file run one after another, files are fixed in parallel
     for checker_class in checkers:
-        checker_class(config, fix_errors=True).check()
+        checker_class(config, fix_errors=True, jobs=jobs, changed_lines=changed_lines).check()
@@ -6,7 +6,7 @@ from pathlib import Path
 
 from scargo.config_utils import prepare_config
 from scargo.logger import get_logger
-from scargo.utils.conan_utils import conan_add_remote, conan_source
+from scargo.utils.conan_utils import conan_bootstrap
 
 logger = get_logger()
 
@@ -33,8 +33,7 @@ def scargo_publish(repo: str, profile: str = "Release") -> None:
         logger.info(f"Did you run 'scargo build --profile {profile}'?")
         sys.exit(1)
 
-    conan_add_remote(project_path, config)
-    conan_source(project_path)
+    conan_bootstrap(project_path, config)
 
     profile_name = target.get_conan_profile_name(profile)
     profile_path = f"./config/conan/profiles/{profile_name}"
@@ -34,7 +34,7 @@ def scargo_run(bin_path: Optional[Path], profile: str, params: List[str], skip_b
         params = []
 
     if not skip_build:
-        scargo_build(profile, ScargoTarget.x86)
+        scargo_build([profile], ScargoTarget.x86)
 
     if bin_path:
         bin_file_name = bin_path.name
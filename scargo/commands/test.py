@@ -8,23 +8,31 @@ from typing import Any, Dict, List, Union
 
 from scargo.config import Config
 from scargo.config_utils import prepare_config
-from scargo.file_generators.conan_gen import conan_add_default_profile_if_missing
 from scargo.global_values import (
     SCARGO_SRC_EXTENSIONS_DEFAULT,
     SCARGO_UT_COV_FILES_PREFIX,
 )
 from scargo.logger import get_logger
-from scargo.utils.conan_utils import conan_add_remote, conan_source
+from scargo.utils.conan_utils import (
+    conan_bootstrap,
+    get_conan_install_fingerprint,
+    is_conan_install_current,
+    save_conan_install_fingerprint,
+)
+from scargo.utils.file_index import get_file_index
 
 logger = get_logger()
 
 
-def scargo_test(verbose: bool, profile: str = "Debug", detailed_coverage: bool = False) -> None:
+def scargo_test(
+    verbose: bool, profile: str = "Debug", detailed_coverage: bool = False, force_install: bool = False
+) -> None:
     """
     Run test
     :param bool verbose: if verbose
     :param str profile: CMake profile to use
     :param bool detailed_coverage: Generate detailed coverage HTML files
+    :param bool force_install: Run `conan install` even if its inputs did not change
     """
     config = prepare_config()
 
@@ -43,27 +51,26 @@ def scargo_test(verbose: bool, profile: str = "Debug", detailed_coverage: bool =
         sys.exit(1)
 
     test_build_dir.mkdir(parents=True, exist_ok=True)
-    conan_add_default_profile_if_missing()
-
-    conan_add_remote(project_dir, config)
-    conan_source(project_dir)
-
+    conan_bootstrap(project_dir, config, force=force_install)
+
+    install_cmd: List[Union[str, Path]] = [
+        "conan",
+        "install",
+        tests_src_dir,
+        "-of",
+        test_build_dir,
+        f"-sbuild_type={profile}",
+        "-b",
+        "missing",
+    ]
+    fingerprint = get_conan_install_fingerprint(config, tests_src_dir, install_cmd)
+    install_needed = force_install or not is_conan_install_current(test_build_dir, fingerprint)
     try:
         # Run CMake and build tests.
-        subprocess.run(
-            [
-                "conan",
-                "install",
-                tests_src_dir,
-                "-of",
-                test_build_dir,
-                f"-sbuild_type={profile}",
-                "-b",
-                "missing",
-            ],
-            cwd=project_dir,
-            check=True,
-        )
+        if install_needed:
+            subprocess.run(install_cmd, cwd=project_dir, check=True)
+        else:
+            logger.info("Conan dependencies of tests are up to date, skipping conan install")
         subprocess.run(
             [
                 "conan",
@@ -81,6 +88,8 @@ def scargo_test(verbose: bool, profile: str = "Debug", detailed_coverage: bool =
     except subprocess.CalledProcessError:
         logger.error("Failed to build tests.")
         sys.exit(1)
+    if install_needed:
+        save_conan_install_fingerprint(test_build_dir, fingerprint)
 
     # run ut
     run_ut(config, verbose, test_build_dir, detailed_coverage)
@@ -99,9 +108,7 @@ def _gcov_json_create_empty_record(fpath: Path) -> Union[Dict[str, Any], None]:
 
 
 def _gcov_get_uncovered_src_files(config: Config, output_json: Dict[str, Any]) -> List[Any]:
-    covered_files: List[Path] = []
-    for ff in output_json["files"]:
-        covered_files.append(config.project_root / ff["file"])
+    covered_files = {config.project_root / ff["file"] for ff in output_json["files"]}
 
     accepted_extensions = config.project.src_extensions
     if not accepted_extensions:
@@ -110,9 +117,7 @@ def _gcov_get_uncovered_src_files(config: Config, output_json: Dict[str, Any]) -
         logger.warning(f"scargo: test: default extensions in use: '{SCARGO_SRC_EXTENSIONS_DEFAULT}'")
 
     uncovered_files: List[Path] = []
-    for ff in config.source_dir_path.rglob("*"):
-        if not ff.is_file():
-            continue
+    for ff in get_file_index(config.source_dir_path).find():
         if ff.suffix not in accepted_extensions:
             continue
         if ff in covered_files:
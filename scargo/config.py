@@ -42,6 +42,11 @@ ESP32_DEFAULT_PARTITIONS = [
 ]
 
 
+class CompilerCache(str, Enum):
+    CCACHE = "ccache"
+    SCCACHE = "sccache"
+
+
 class ConfigError(Exception):
     pass
 
@@ -59,6 +64,7 @@ class Config(BaseModel):
     stm32: Optional["Stm32Config"]
     esp32: Optional["Esp32Config"]
     scargo: "ScargoConfig" = Field(default_factory=lambda: ScargoConfig())  # pylint: disable=unnecessary-lambda
+    build: "BuildConfig" = Field(default_factory=lambda: BuildConfig())  # pylint: disable=unnecessary-lambda
     docker_compose: "DockerComposeConfig" = Field(
         default_factory=lambda: DockerComposeConfig(),  # pylint: disable=unnecessary-lambda
         alias="docker-compose",
@@ -149,6 +155,9 @@ class ProjectConfig(BaseModel):
     header_extensions: Optional[Sequence[str]]
 
     max_build_jobs: Optional[int] = Field(default=None, alias="max-build-jobs")
+    compiler_cache: Optional[CompilerCache] = Field(default=None, alias="compiler-cache")
+    # Relative to the project root, or absolute, e.g. a volume shared between CI jobs
+    compiler_cache_dir: Path = Field(default=Path("build", ".compiler_cache"), alias="compiler-cache-dir")
     cmake_variables: Dict[str, str] = Field(default={}, alias="cmake-variables")
 
     @property
@@ -229,7 +238,26 @@ TARGETS = {
 }
 
 
-class ProfileConfig(BaseModel, extra=Extra.allow):
+class CompileOptions(BaseModel):
+    """Precompiled headers and unity builds, unset options are inherited from the more general section"""
+
+    # `<header>` or a path relative to the project root
+    precompile_headers: Optional[List[str]] = Field(default=None, alias="precompile-headers")
+    unity_build: Optional[bool] = Field(default=None, alias="unity-build")
+    unity_build_batch_size: Optional[int] = Field(default=None, alias="unity-build-batch-size", gt=0)
+
+    @property
+    def is_set(self) -> bool:
+        return any(
+            value is not None for value in (self.precompile_headers, self.unity_build, self.unity_build_batch_size)
+        )
+
+
+class BuildConfig(CompileOptions):
+    targets: Dict[str, CompileOptions] = Field(default_factory=dict, alias="target")
+
+
+class ProfileConfig(CompileOptions, extra=Extra.allow):
     cflags: Optional[str]
     cxxflags: Optional[str]
     cc: Optional[str] = None
@@ -257,7 +285,7 @@ class ChecksConfig(BaseModel):
     cppcheck: "CppCheckConfig" = Field(..., alias="cppcheck")
     clang_format: "CheckConfig" = Field(..., alias="clang-format")
     clang_tidy: "CheckConfig" = Field(..., alias="clang-tidy")
-    cyclomatic: "CheckConfig"
+    cyclomatic: "CyclomaticCheckConfig"
     license: Optional[LicenseCheckConfig] = None
 
 
@@ -278,6 +306,11 @@ class TodoCheckConfig(CheckConfig):
     keywords: List[str] = Field(default_factory=list)
 
 
+class CyclomaticCheckConfig(CheckConfig):
+    # Functions with higher cyclomatic complexity are reported
+    threshold: int = 25
+
+
 class CppCheckConfig(BaseModel):
     description: Optional[str] = None
     exclude: List[str] = Field(default_factory=list)
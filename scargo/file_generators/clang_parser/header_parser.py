@@ -1,6 +1,7 @@
 from pathlib import Path
 
-from clang.cindex import Index
+from clang import native  # type: ignore[attr-defined]
+from clang.cindex import Config, Index
 
 from scargo.file_generators.clang_parser.data_classes import HeaderDescriptor
 from scargo.file_generators.clang_parser.params_extractor import (
@@ -9,6 +10,10 @@ from scargo.file_generators.clang_parser.params_extractor import (
     extract_namespaces,
 )
 
+# Use libclang shipped with the libclang package instead of searching for a system one
+if not Config.loaded:
+    Config().set_library_file(str(Path(native.__file__).with_name("libclang.so")))
+
 
 def parse_file(file_path: Path) -> HeaderDescriptor:
     """TODO documentation
@@ -1,5 +1,7 @@
 import logging
-from typing import Tuple
+import threading
+from contextlib import contextmanager
+from typing import Iterable, Iterator, List, Tuple
 
 import coloredlogs
 
@@ -7,6 +9,22 @@ from scargo.config import ScargoConfig, parse_config
 from scargo.global_values import SCARGO_LOCK_FILE
 from scargo.utils.path_utils import get_config_file_path, get_project_root_or_none
 
+_thread_log_buffers = threading.local()
+
+
+class _ThreadBufferFilter(logging.Filter):
+    """Hold back records emitted by threads running inside `buffered_log_records`"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        buffers: List[List[logging.LogRecord]] = getattr(_thread_log_buffers, "stack", [])
+        if buffers:
+            buffers[-1].append(record)
+            return False
+        return True
+
+
+_THREAD_BUFFER_FILTER = _ThreadBufferFilter()
+
 
 def __get_logging_config() -> Tuple[int, int]:
     console_log_level = logging.INFO
@@ -54,3 +72,40 @@ def get_logger(name: str = "scargo") -> logging.Logger:
         logger.addHandler(file_handler)
 
     return logger
+
+
+@contextmanager
+def buffered_log_records(name: str = "scargo") -> Iterator[List[logging.LogRecord]]:
+    """
+    Collect log records emitted by the current thread instead of printing them.
+
+    Records can be printed later with `replay_log_records`, which allows parallel
+    workers to keep their output grouped. Buffers can be nested.
+
+    :param str name: logger name
+    :yield: list which is filled with the held back records
+    """
+    logger = get_logger(name)
+    if _THREAD_BUFFER_FILTER not in logger.filters:
+        logger.addFilter(_THREAD_BUFFER_FILTER)
+
+    if not hasattr(_thread_log_buffers, "stack"):
+        _thread_log_buffers.stack = []
+    records: List[logging.LogRecord] = []
+    _thread_log_buffers.stack.append(records)
+    try:
+        yield records
+    finally:
+        _thread_log_buffers.stack.pop()
+
+
+def replay_log_records(records: Iterable[logging.LogRecord], name: str = "scargo") -> None:
+    """
+    Emit log records previously collected by `buffered_log_records`
+
+    :param records: records to emit
+    :param str name: logger name
+    """
+    logger = get_logger(name)
+    for record in records:
+        logger.handle(record)
@@ -0,0 +1,118 @@
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+from scargo.logger import get_logger
+
+logger = get_logger()
+
+CHECK_CACHE_DIR = Path("build", ".scargo_check_cache")
+
+
+class CachedCheckResult(NamedTuple):
+    problems_found: int
+    fix: bool
+    messages: List[Tuple[int, str]]
+    # Line, message, level and file (None for the checked file) of every problem
+    findings: List[Tuple[Optional[int], str, str, Optional[str]]] = []
+
+
+def file_digest(file_path: Path) -> str:
+    with open(file_path, "rb") as file:
+        return hashlib.sha256(file.read()).hexdigest()
+
+
+def context_digest(context: Dict[str, Any]) -> str:
+    return hashlib.sha256(json.dumps(context, sort_keys=True, default=str).encode()).hexdigest()
+
+
+class CheckCache:
+    """
+    Results of a file-level check stored between scargo runs.
+
+    A result is reused when both the file content and the check context
+    (checker name, tool version, tool and checker configuration) are unchanged.
+    Whole cache is dropped when the context changes.
+    """
+
+    def __init__(self, cache_file: Path, context: Dict[str, Any]) -> None:
+        self._cache_file = cache_file
+        self._context = context_digest(context)
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._used_entries: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self) -> None:
+        try:
+            with open(self._cache_file, encoding="utf-8") as file:
+                data = json.load(file)
+        except (OSError, ValueError):
+            return
+        if isinstance(data, dict) and data.get("context") == self._context:
+            self._entries = data.get("files", {})
+
+    def get(self, file_path: Path, digest: str) -> Optional[CachedCheckResult]:
+        with self._lock:
+            entry = self._entries.get(str(file_path))
+            if not entry or entry.get("digest") != digest:
+                return None
+            self._used_entries[str(file_path)] = entry
+        return CachedCheckResult(
+            entry["problems_found"],
+            entry["fix"],
+            [(int(level), str(message)) for level, message in entry["messages"]],
+            [
+                (finding[0], str(finding[1]), str(finding[2]), finding[3] if len(finding) > 3 else None)
+                for finding in entry.get("findings", [])
+            ],
+        )
+
+    def put(self, file_path: Path, digest: str, result: CachedCheckResult) -> None:
+        entry = {
+            "digest": digest,
+            "problems_found": result.problems_found,
+            "fix": result.fix,
+            "messages": result.messages,
+            "findings": result.findings,
+        }
+        with self._lock:
+            self._entries[str(file_path)] = entry
+            self._used_entries[str(file_path)] = entry
+
+    def get_data(self, file_path: Path, digest: str) -> Optional[Any]:
+        """Data stored with `put_data` for the file, if its digest is unchanged"""
+        with self._lock:
+            entry = self._entries.get(str(file_path))
+            if not entry or entry.get("digest") != digest or "data" not in entry:
+                return None
+            self._used_entries[str(file_path)] = entry
+        return entry["data"]
+
+    def put_data(self, file_path: Path, digest: str, data: Any) -> None:
+        """Store any JSON serializable data computed from the file instead of a check result"""
+        entry = {"digest": digest, "data": data}
+        with self._lock:
+            self._entries[str(file_path)] = entry
+            self._used_entries[str(file_path)] = entry
+
+    def save(self, prune: bool = True) -> None:
+        """
+        Store results in the cache file
+
+        :param bool prune: keep only results of files seen in this run, so entries of removed files
+            are dropped, should be False when only some of the files were checked
+        """
+        with self._lock:
+            data = {"context": self._context, "files": self._used_entries if prune else self._entries}
+        try:
+            self._cache_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp_file = self._cache_file.with_suffix(".tmp")
+            with open(tmp_file, "w", encoding="utf-8") as file:
+                json.dump(data, file)
+            os.replace(tmp_file, self._cache_file)
+        except OSError as e:
+            logger.debug("Unable to save check cache %s: %s", self._cache_file, e)
@@ -0,0 +1,94 @@
+"""Helpers for running clang-format and clang-tidy on many files at once"""
+
+import os
+import re
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from scargo.utils.compile_db import COMPILE_DB_FILE_NAME
+from scargo.utils.path_utils import normalize_path
+
+_DIAGNOSTIC_PATTERN = re.compile(r"^(.+):\d+:\d+: (?:error|warning): ")
+_ERROR_DIAGNOSTIC_PATTERN = re.compile(r"^.+:\d+:\d+: error: ", re.MULTILINE)
+
+# These flags are added by esp-idf, however they are not recognized by clang-tidy:
+_ESP32_UNSUPPORTED_FLAGS = [
+    "-mlongcalls",
+    "-fno-tree-switch-conversion",
+    "-fstrict-volatile-bitfields",
+    "-fno-shrink-wrap",
+]
+
+
+def split_clang_diagnostics(output: str, file_paths: List[Path]) -> Dict[Path, str]:
+    """
+    Split clang diagnostics (e.g. of clang-format) into diagnostics of each file.
+
+    Source and caret lines stay with the diagnostic they belong to.
+
+    :param output: output of the tool
+    :param file_paths: files passed to the tool, as they were passed
+    :return: diagnostics of files which have any
+    """
+    paths = {str(file_path): file_path for file_path in file_paths}
+    diagnostics: Dict[Path, List[str]] = {}
+    current: Optional[List[str]] = None
+    for line in output.splitlines():
+        match = _DIAGNOSTIC_PATTERN.match(line)
+        if match:
+            file_path = paths.get(match.group(1))
+            current = diagnostics.setdefault(file_path, []) if file_path else None
+        if current is not None:
+            current.append(line)
+    return {file_path: "\n".join(lines) for file_path, lines in diagnostics.items()}
+
+
+def split_run_clang_tidy_output(output: str, file_paths: List[Path]) -> Dict[Path, str]:
+    """
+    Split run-clang-tidy output into outputs of each file.
+
+    Output of every clang-tidy invocation is preceded by its command line, which ends with the file name.
+
+    :param output: output of run-clang-tidy
+    :param file_paths: checked files
+    :return: output of every file found in the output
+    """
+    paths = {str(normalize_path(file_path)): file_path for file_path in file_paths}
+    outputs: Dict[Path, List[str]] = {}
+    current: Optional[List[str]] = None
+    for line in output.splitlines():
+        words = line.split()
+        if "clang-tidy" in line and words and words[-1] in paths:
+            current = outputs.setdefault(paths[words[-1]], [])
+        if current is not None:
+            current.append(line)
+    return {file_path: "\n".join(lines) for file_path, lines in outputs.items()}
+
+
+def has_error_diagnostic(output: str) -> bool:
+    return _ERROR_DIAGNOSTIC_PATTERN.search(output) is not None
+
+
+def prepare_esp32_compile_db(build_path: Path) -> Path:
+    """
+    Remove flags clang-tidy does not understand from the esp-idf compilation database.
+
+    The sanitized copy is rewritten only when the original database is newer.
+
+    :param build_path: directory with the compilation database
+    :return: directory of the sanitized compilation database
+    """
+    db_path = build_path / COMPILE_DB_FILE_NAME
+    db_path_for_check = build_path / "compilation_db_for_check" / COMPILE_DB_FILE_NAME
+    if db_path_for_check.is_file() and db_path_for_check.stat().st_mtime_ns >= db_path.stat().st_mtime_ns:
+        return db_path_for_check.parent
+
+    file_contents = db_path.read_text(encoding="utf-8")
+    for flag in _ESP32_UNSUPPORTED_FLAGS:
+        file_contents = file_contents.replace(flag, "")
+
+    db_path_for_check.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = db_path_for_check.with_suffix(".tmp")
+    tmp_path.write_text(file_contents, encoding="utf-8")
+    os.replace(tmp_path, db_path_for_check)
+    return db_path_for_check.parent
@@ -0,0 +1,240 @@
+import hashlib
+import json
+import re
+import shlex
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from scargo.logger import get_logger
+from scargo.utils.path_utils import normalize_path
+
+logger = get_logger()
+
+COMPILE_DB_FILE_NAME = "compile_commands.json"
+
+_INCLUDE_PATTERN = re.compile(rb'^[ \t]*#[ \t]*include[ \t]*"([^"]+)"', re.MULTILINE)
+
+
+class CompileDatabase:
+    """Entries of `compile_commands.json` indexed by absolute source file path"""
+
+    def __init__(self, db_path: Path) -> None:
+        self.path = db_path
+        self.entries: Dict[Path, Dict[str, Any]] = {}
+        self._digest: Optional[str] = None
+        try:
+            with open(db_path, encoding="utf-8") as db_file:
+                entries = json.load(db_file)
+        except (OSError, ValueError) as e:
+            logger.debug("Unable to read compilation database %s: %s", db_path, e)
+            entries = []
+        for entry in entries:
+            directory = Path(entry.get("directory", "."))
+            self.entries[normalize_path(directory / entry["file"])] = entry
+
+    def get_entry(self, file_path: Path) -> Optional[Dict[str, Any]]:
+        return self.entries.get(normalize_path(file_path))
+
+    def get_digest(self) -> str:
+        if self._digest is None:
+            self._digest = _digest_json(self.entries[path] for path in sorted(self.entries))
+        return self._digest
+
+
+_compile_databases: Dict[Path, Tuple[Tuple[int, int], CompileDatabase]] = {}
+_compile_databases_lock = threading.Lock()
+
+
+def get_compile_database(db_path: Path) -> CompileDatabase:
+    """Database loaded from `db_path`, shared by all callers until the file changes"""
+    key = normalize_path(db_path)
+    try:
+        stat = key.stat()
+        state = (stat.st_mtime_ns, stat.st_size)
+    except OSError:
+        state = (0, 0)
+    with _compile_databases_lock:
+        if key in _compile_databases and _compile_databases[key][0] == state:
+            return _compile_databases[key][1]
+    compile_db = CompileDatabase(db_path)
+    with _compile_databases_lock:
+        _compile_databases[key] = (state, compile_db)
+    return compile_db
+
+
+def clear_compile_databases() -> None:
+    with _compile_databases_lock:
+        _compile_databases.clear()
+
+
+def get_entry_arguments(entry: Dict[str, Any]) -> List[str]:
+    if "arguments" in entry:
+        return list(entry["arguments"])
+    return shlex.split(entry.get("command", ""))
+
+
+def get_include_dirs(entry: Dict[str, Any]) -> List[Path]:
+    directory = Path(entry.get("directory", "."))
+    include_dirs = []
+    arguments = get_entry_arguments(entry)
+    for index, argument in enumerate(arguments):
+        for flag in ("-I", "-iquote", "-isystem"):
+            if argument == flag and index + 1 < len(arguments):
+                include_dirs.append(directory / arguments[index + 1])
+            elif argument.startswith(flag) and len(argument) > len(flag):
+                include_dirs.append(directory / argument[len(flag) :])
+    return include_dirs
+
+
+def get_depfile_path(entry: Dict[str, Any]) -> Optional[Path]:
+    """Path of the dependency file written by the compiler (-MD/-MMD) for this entry"""
+    directory = Path(entry.get("directory", "."))
+    arguments = get_entry_arguments(entry)
+    output = entry.get("output")
+    for index, argument in enumerate(arguments[:-1]):
+        if argument == "-MF":
+            return directory / arguments[index + 1]
+        if argument == "-o" and not output:
+            output = arguments[index + 1]
+    if output:
+        return directory / f"{output}.d"
+    return None
+
+
+def parse_depfile(depfile_path: Path, directory: Path) -> List[Path]:
+    """
+    Read prerequisites from a Makefile-style dependency file
+
+    :param depfile_path: path to the dependency file
+    :param directory: directory relative paths are resolved against (the compiler working directory)
+    :return: prerequisites listed in the file
+    """
+    content = depfile_path.read_text(encoding="utf-8", errors="replace")
+    content = content.replace("\\\r\n", " ").replace("\\\n", " ")
+    dependencies: List[Path] = []
+    for rule in content.splitlines():
+        _, separator, prerequisites = rule.partition(": ")
+        if not separator:
+            continue
+        # Escaped spaces are part of file names
+        for dependency in re.split(r"(?<!\\) +", prerequisites.strip()):
+            if dependency:
+                dependencies.append(directory / dependency.replace("\\ ", " "))
+    return dependencies
+
+
+def scan_includes(file_path: Path, include_dirs: Iterable[Path]) -> List[Path]:
+    """
+    Find local headers included by the file, directly or indirectly.
+
+    Only `#include "..."` directives which resolve to existing files are followed.
+
+    :param file_path: source file to scan
+    :param include_dirs: directories used to resolve includes
+    :return: headers in the include closure of the file
+    """
+    include_dirs = list(include_dirs)
+    found: Set[Path] = set()
+    to_scan = [file_path]
+    while to_scan:
+        current = to_scan.pop()
+        try:
+            content = current.read_bytes()
+        except OSError:
+            continue
+        for match in _INCLUDE_PATTERN.finditer(content):
+            name = match.group(1).decode(errors="replace")
+            for candidate_dir in [current.parent, *include_dirs]:
+                candidate = normalize_path(candidate_dir / name)
+                if candidate.is_file():
+                    if candidate not in found:
+                        found.add(candidate)
+                        to_scan.append(candidate)
+                    break
+    return sorted(found)
+
+
+class DependencyDigests:
+    """
+    Digests of files and their dependency closures, memoized for one run.
+
+    Files under `project_root` are hashed by content, files outside of it
+    (toolchain and system headers) only by modification time and size.
+    """
+
+    def __init__(self, project_root: Path, compile_db: CompileDatabase) -> None:
+        self._project_root = normalize_path(project_root)
+        self._compile_db = compile_db
+        self._file_digests: Dict[Path, str] = {}
+        self._dependencies: Dict[Path, Tuple[Optional[Dict[str, Any]], List[Path]]] = {}
+        self._digests: Dict[Path, str] = {}
+        self._lock = threading.Lock()
+
+    def get_dependencies(self, file_path: Path) -> Tuple[Optional[Dict[str, Any]], List[Path]]:
+        """
+        Compile database entry of the file and the files it depends on.
+
+        The depfile is written by the last build, so headers included since then are
+        found by scanning the sources and merged with it.
+        """
+        path = normalize_path(file_path)
+        with self._lock:
+            if path in self._dependencies:
+                return self._dependencies[path]
+        entry = self._compile_db.get_entry(path)
+        dependencies = {path, *scan_includes(path, get_include_dirs(entry) if entry else [])}
+        if entry:
+            depfile_path = get_depfile_path(entry)
+            if depfile_path and depfile_path.is_file():
+                directory = Path(entry.get("directory", "."))
+                dependencies.update(map(normalize_path, parse_depfile(depfile_path, directory)))
+        result = entry, sorted(dependencies)
+        with self._lock:
+            self._dependencies[path] = result
+        return result
+
+    def is_affected(self, file_path: Path, changed_files: Set[Path]) -> bool:
+        """Whether the file or any file it includes is one of `changed_files` (normalized paths)"""
+        return any(dependency in changed_files for dependency in self.get_dependencies(file_path)[1])
+
+    def get_digest(self, file_path: Path) -> str:
+        """Digest of the compile command and all files the result of analysing `file_path` depends on"""
+        path = normalize_path(file_path)
+        with self._lock:
+            if path in self._digests:
+                return self._digests[path]
+        entry, dependencies = self.get_dependencies(path)
+        digest = _digest_json(
+            {
+                # Files without own entry get flags interpolated from the whole database
+                "entry": entry if entry else self._compile_db.get_digest(),
+                "dependencies": {str(dependency): self._get_file_digest(dependency) for dependency in dependencies},
+            }
+        )
+        with self._lock:
+            self._digests[path] = digest
+        return digest
+
+    def _get_file_digest(self, file_path: Path) -> str:
+        path = normalize_path(file_path)
+        with self._lock:
+            if path in self._file_digests:
+                return self._file_digests[path]
+        try:
+            if self._project_root in path.parents:
+                digest = hashlib.sha256(path.read_bytes()).hexdigest()
+            else:
+                stat = path.stat()
+                digest = f"{stat.st_mtime_ns}:{stat.st_size}"
+        except OSError:
+            digest = "missing"
+        with self._lock:
+            self._file_digests[path] = digest
+        return digest
+
+
+def _digest_json(data: Any) -> str:
+    if not isinstance(data, (dict, list, str)):
+        data = list(data)
+    return hashlib.sha256(json.dumps(data, sort_keys=True, default=str).encode()).hexdigest()
@@ -0,0 +1,84 @@
+"""Statistics of the compiler cache (ccache or sccache) used by builds"""
+
+import json
+import os
+import subprocess
+from pathlib import Path
+from typing import NamedTuple, Optional
+
+from scargo.config import CompilerCache, Config
+from scargo.logger import get_logger
+
+logger = get_logger()
+
+
+class CompilerCacheStats(NamedTuple):
+    hits: int
+    misses: int
+
+
+def get_compiler_cache_dir(config: Config) -> Path:
+    """Directory of the compiler cache, as set in conan profiles"""
+    return Path(config.project_root, config.project.compiler_cache_dir)
+
+
+def get_compiler_cache_stats(config: Config) -> Optional[CompilerCacheStats]:
+    """
+    Counters of the compiler cache configured for the project.
+
+    :param Config config: project config
+    :return: total hits and misses, None if no cache is configured or the tool is not available
+    """
+    tool = config.project.compiler_cache
+    if tool is None:
+        return None
+    env = {**os.environ, f"{tool.value.upper()}_DIR": str(get_compiler_cache_dir(config))}
+    try:
+        if tool == CompilerCache.CCACHE:
+            output = subprocess.run(
+                ["ccache", "--print-stats"], env=env, check=True, stdout=subprocess.PIPE, text=True
+            ).stdout
+            return _parse_ccache_stats(output)
+        output = subprocess.run(
+            ["sccache", "--show-stats", "--stats-format=json"], env=env, check=True, stdout=subprocess.PIPE, text=True
+        ).stdout
+        return _parse_sccache_stats(output)
+    except (OSError, subprocess.CalledProcessError, ValueError, KeyError) as e:
+        logger.debug("Unable to get %s statistics: %s", tool.value, e)
+        return None
+
+
+def log_compiler_cache_stats(
+    config: Config, before: Optional[CompilerCacheStats], after: Optional[CompilerCacheStats]
+) -> None:
+    """Log hits and misses between two snapshots of the counters"""
+    if config.project.compiler_cache is None or after is None:
+        return
+    hits, misses = after
+    # Counters were not reset in the meantime, e.g. by restarting the sccache server
+    if before is not None and before.hits <= after.hits and before.misses <= after.misses:
+        hits, misses = after.hits - before.hits, after.misses - before.misses
+    total = hits + misses
+    hit_rate = f", {100 * hits / total:.1f}% hit rate" if total else ""
+    logger.info(
+        "Compiler cache (%s): %d hits, %d misses%s", config.project.compiler_cache.value, hits, misses, hit_rate
+    )
+
+
+def _parse_ccache_stats(output: str) -> CompilerCacheStats:
+    """Parse `ccache --print-stats`, tab separated names and values"""
+    counters = {}
+    for line in output.splitlines():
+        name, _, value = line.partition("\t")
+        if value.strip().isdigit():
+            counters[name] = int(value)
+    hits = counters.get("direct_cache_hit", 0) + counters.get("preprocessed_cache_hit", 0)
+    return CompilerCacheStats(hits, counters.get("cache_miss", 0))
+
+
+def _parse_sccache_stats(output: str) -> CompilerCacheStats:
+    """Parse `sccache --show-stats --stats-format=json`, counters are per language"""
+    stats = json.loads(output)["stats"]
+    return CompilerCacheStats(
+        sum(stats["cache_hits"]["counts"].values()), sum(stats["cache_misses"]["counts"].values())
+    )
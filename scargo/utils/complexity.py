@@ -0,0 +1,137 @@
+"""Function complexity metrics computed with lizard's Python API"""
+
+import json
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Sequence, Tuple
+
+from lizard import analyze_file
+from lizard import version as lizard_version
+from lizard_languages import languages
+
+from scargo.logger import get_logger
+from scargo.utils.path_utils import normalize_path
+
+logger = get_logger()
+
+LIZARD_VERSION: str = lizard_version
+# Files of all languages lizard can analyze, as found by the lizard command line tool
+LIZARD_SOURCE_PATTERNS = tuple(sorted({f"*.{ext}" for language in languages() for ext in language.ext}))
+
+# Per-function metrics of the last full cyclomatic check, relative to the project root
+CYCLOMATIC_REPORT_PATH = Path("build", "cyclomatic_report.json")
+# Limits of lizard which are not configurable in scargo.toml
+LIZARD_MAX_LENGTH = 1000
+LIZARD_MAX_PARAMETERS = 100
+
+
+class FunctionMetrics(NamedTuple):
+    name: str
+    long_name: str
+    start_line: int
+    end_line: int
+    nloc: int
+    cyclomatic_complexity: int
+    token_count: int
+    parameter_count: int
+    length: int
+
+    def exceeds_limits(self, threshold: int) -> bool:
+        """
+        :param int threshold: maximum cyclomatic complexity
+        :return: True if lizard would warn about the function
+        """
+        return (
+            self.cyclomatic_complexity > threshold
+            or self.length > LIZARD_MAX_LENGTH
+            or self.parameter_count > LIZARD_MAX_PARAMETERS
+        )
+
+    def format_warning(self, file_path: Path) -> str:
+        """Warning in the format of `lizard -w`"""
+        return (
+            f"{file_path}:{self.start_line}: warning: {self.name} has {self.nloc} NLOC, "
+            f"{self.cyclomatic_complexity} CCN, {self.token_count} token, "
+            f"{self.parameter_count} PARAM, {self.length} length"
+        )
+
+
+def analyze_source(file_name: str, code: str) -> List[FunctionMetrics]:
+    """
+    Measure every function defined in the source.
+
+    :param str file_name: file name, used by lizard to detect the language
+    :param str code: content of the file
+    :return: metrics of functions in order of their definition
+    """
+    file_info = analyze_file.analyze_source_code(file_name, code)
+    return [
+        FunctionMetrics(
+            str(function.name),
+            str(function.long_name),
+            int(function.start_line),
+            int(function.end_line),
+            int(function.nloc),
+            int(function.cyclomatic_complexity),
+            int(function.token_count),
+            int(function.parameter_count),
+            int(function.length),
+        )
+        for function in file_info.function_list
+    ]
+
+
+def _analyze_source(source: Tuple[str, str]) -> List[FunctionMetrics]:
+    return analyze_source(*source)
+
+
+def analyze_sources(sources: Sequence[Tuple[str, str]], jobs: int) -> List[List[FunctionMetrics]]:
+    """
+    Analyze sources in a pool of `jobs` processes, lizard is pure Python and does not scale with threads.
+
+    File contents are sent to the workers, so they do not have to read them again.
+
+    :param sources: file name and content of every source
+    :param int jobs: maximum number of worker processes
+    :return: metrics of every source, in the order of `sources`
+    """
+    jobs = min(jobs, len(sources))
+    if jobs <= 1:
+        return [_analyze_source(source) for source in sources]
+    # Called from a checker thread, forking while other threads hold locks could deadlock the workers
+    start_method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+    with ProcessPoolExecutor(max_workers=jobs, mp_context=multiprocessing.get_context(start_method)) as executor:
+        return list(executor.map(_analyze_source, sources, chunksize=max(1, len(sources) // (jobs * 4))))
+
+
+def write_complexity_report(
+    report_path: Path, project_root: Path, threshold: int, metrics: Dict[Path, List[FunctionMetrics]]
+) -> None:
+    """
+    Store metrics of all functions as JSON with paths relative to the project root and sorted keys,
+    so reports of different commits can be compared with diff.
+
+    :param report_path: path of the JSON file
+    :param project_root: directory paths in the report are relative to
+    :param int threshold: complexity threshold the metrics were checked against
+    :param metrics: metrics of functions in every file
+    """
+    project_root = normalize_path(project_root)
+    report = {
+        "lizard": LIZARD_VERSION,
+        "threshold": threshold,
+        "files": {
+            normalize_path(file_path)
+            .relative_to(project_root)
+            .as_posix(): [function._asdict() for function in functions]
+            for file_path, functions in sorted(metrics.items())
+        },
+    }
+    try:
+        report_path.parent.mkdir(parents=True, exist_ok=True)
+        report_path.write_text(json.dumps(report, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+    except OSError as e:
+        logger.warning("Unable to write complexity report %s: %s", report_path, e)
+        return
+    logger.info("Complexity report written to %s", report_path)
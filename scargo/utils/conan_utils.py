@@ -1,24 +1,113 @@
+import os
+import shutil
 import subprocess
+from importlib import metadata
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, List, Optional, Sequence, Union
 
 from scargo.config import Config
+from scargo.file_generators.conan_gen import conan_add_default_profile_if_missing
 from scargo.logger import get_logger
+from scargo.utils.check_cache import context_digest, file_digest
 
 logger = get_logger()
 
 
 DEFAULT_PROFILES = ["Debug", "Release", "RelWithDebInfo", "MinSizeRel"]
 
+# Fingerprint of inputs of the last successful `conan install`, stored in its output folder
+CONAN_INSTALL_STAMP = ".scargo_conan_install"
+# Fingerprint of inputs of the last successful `conan_bootstrap`, relative to the project root
+CONAN_BOOTSTRAP_STAMP = Path("build", ".scargo_conan_bootstrap")
 
-def conan_add_remote(project_path: Path, config: Config) -> None:
+
+def get_conan_home() -> Path:
+    return Path(os.environ.get("CONAN_HOME", Path.home() / ".conan2"))
+
+
+def get_conan_version() -> Optional[str]:
+    """Version of conan installed with scargo, without starting conan"""
+    try:
+        return metadata.version("conan")
+    except metadata.PackageNotFoundError:
+        pass
+    # Conan installed separately, it changes together with its executable
+    executable = shutil.which("conan")
+    if executable is None:
+        return None
+    return f"{executable}@{os.stat(executable).st_mtime_ns}"
+
+
+def conan_bootstrap(project_path: Path, config: Config, force: bool = False) -> None:
+    """
+    Prepare conan for commands of the project: default profile, remotes and `conan source`.
+
+    Each step starts conan, so they are skipped when the conan home, conan version, remotes,
+    default profile and conanfile are the same as after the last successful bootstrap
+    and directories downloaded by `conan source` still exist.
+
+    :param Path project_path: path to project
+    :param Config config: project config
+    :param bool force: run all steps even if nothing changed
+    :return: None
+    """
+    stamp_path = project_path / CONAN_BOOTSTRAP_STAMP
+    sources_present = all(Path(project_path, source_dir).is_dir() for source_dir in get_conan_source_dirs(config))
+    if not force and sources_present and _read_stamp(stamp_path) == _get_bootstrap_fingerprint(project_path, config):
+        logger.debug("Conan remotes and sources are up to date")
+        return
+
+    conan_add_default_profile_if_missing()
+    success = conan_add_remote(project_path, config)
+    success = conan_source(project_path) and success
+    if success:
+        # Computed again, the steps above modify the conan home
+        stamp_path.parent.mkdir(parents=True, exist_ok=True)
+        stamp_path.write_text(_get_bootstrap_fingerprint(project_path, config) + "\n", encoding="utf-8")
+    else:
+        stamp_path.unlink(missing_ok=True)
+
+
+def get_conan_source_dirs(config: Config) -> List[Path]:
+    """Directories downloaded by `conan source` of the generated conanfile, relative to the project root"""
+    source_dirs = []
+    if config.project.is_stm32():
+        source_dirs.append(Path("third-party", "stm32-cmake"))
+    if config.project.is_atsam():
+        source_dirs.extend([Path(f"{config.get_atsam_config().chip_series}_DFP"), Path("CMSIS")])
+    return source_dirs
+
+
+def _get_bootstrap_fingerprint(project_path: Path, config: Config) -> str:
+    conan_home = get_conan_home()
+    return context_digest(
+        {
+            "conan_home": str(conan_home),
+            "conan_version": get_conan_version(),
+            "remotes": config.conan.repo,
+            "remotes_file": _optional_file_digest(conan_home / "remotes.json"),
+            "default_profile": _optional_file_digest(conan_home / "profiles" / "default"),
+            "conanfile": _optional_file_digest(project_path / "conanfile.py"),
+        }
+    )
+
+
+def _read_stamp(stamp_path: Path) -> Optional[str]:
+    try:
+        return stamp_path.read_text(encoding="utf-8").strip()
+    except OSError:
+        return None
+
+
+def conan_add_remote(project_path: Path, config: Config) -> bool:
     """
     Add conan remote repository
 
     :param Path project_path: path to project
     :param Config config:
-    :return: None
+    :return: True if all remotes were added and logged in to
     """
+    success = True
     remotes_without_user = _get_remotes_without_user(config.conan.repo)
     for repo_name, repo_url in config.conan.repo.items():
         try:
@@ -32,18 +121,20 @@ def conan_add_remote(project_path: Path, config: Config) -> None:
             if b"already exists in remotes" not in e.stderr:
                 logger.error(e.stderr.decode().strip())
                 logger.error("Unable to add remote repository")
+                success = False
             else:
                 pass
         if repo_name in remotes_without_user:
-            conan_remote_login(repo_name)
+            success = conan_remote_login(repo_name) and success
+    return success
 
 
-def conan_remote_login(remote: str) -> None:
+def conan_remote_login(remote: str) -> bool:
     """
     Add conan user
 
     :param str remote: name of remote repository
-    :return: None
+    :return: True if logged in
     """
     remote_login_command = ["conan", "remote", "login", remote]
     logger.info("Login to conan remote %s", remote)
@@ -52,13 +143,63 @@ def conan_remote_login(remote: str) -> None:
         subprocess.run(remote_login_command, check=True)
     except subprocess.CalledProcessError:
         logger.error(f"Unable to log in to conan remote {remote}")
+        return False
+    return True
 
 
-def conan_source(project_dir: Path) -> None:
+def conan_source(project_dir: Path) -> bool:
     try:
         subprocess.run(["conan", "source", "."], cwd=project_dir, check=True)
     except subprocess.CalledProcessError:
         logger.error("Unable to source")
+        return False
+    return True
+
+
+def get_conan_install_fingerprint(
+    config: Config,
+    conanfile_dir: Path,
+    install_cmd: Sequence[Union[str, Path]],
+    profile_path: Optional[Path] = None,
+) -> str:
+    """
+    Digest of everything `conan install` output depends on.
+
+    :param Config config: project config, its dependencies and conan remotes are included
+    :param Path conanfile_dir: directory with `conanfile.py` and optional `conan.lock`
+    :param install_cmd: whole `conan install` command
+    :param profile_path: host profile, the default conan profile if not given
+    :return: hex digest
+    """
+    if profile_path is None:
+        profile_path = get_conan_home() / "profiles" / "default"
+    return context_digest(
+        {
+            "command": [str(arg) for arg in install_cmd],
+            "conanfile": _optional_file_digest(conanfile_dir / "conanfile.py"),
+            "lockfile": _optional_file_digest(conanfile_dir / "conan.lock"),
+            "profile": _optional_file_digest(profile_path),
+            "dependencies": config.dependencies.dict(),
+            "remotes": config.conan.repo,
+        }
+    )
+
+
+def is_conan_install_current(output_dir: Path, fingerprint: str) -> bool:
+    """Whether the last successful `conan install` into `output_dir` had the same inputs"""
+    try:
+        return (output_dir / CONAN_INSTALL_STAMP).read_text(encoding="utf-8").strip() == fingerprint
+    except OSError:
+        return False
+
+
+def save_conan_install_fingerprint(output_dir: Path, fingerprint: str) -> None:
+    """Remember inputs of a successful `conan install` into `output_dir`"""
+    (output_dir / CONAN_INSTALL_STAMP).write_text(fingerprint + "\n", encoding="utf-8")
+
+
+def _optional_file_digest(file_path: Path) -> Optional[str]:
+    return file_digest(file_path) if file_path.is_file() else None
 
 
 def _get_remotes_without_user(conan_remotes: Dict[str, str]) -> List[str]:
@@ -0,0 +1,29 @@
+"""Reading cppcheck results"""
+
+from typing import IO, Iterator
+from xml.etree import ElementTree
+
+
+def iter_cppcheck_xml_issues(stream: IO[bytes]) -> Iterator[str]:
+    """
+    Parse cppcheck `--xml` output while it is being written.
+
+    Every reported error is released as soon as it is parsed, so memory use does not
+    grow with the number of issues. Errors without a location (e.g. a summary of
+    active checkers) are skipped.
+
+    :param stream: cppcheck stderr
+    :raises ElementTree.ParseError: if the output is not valid XML, e.g. when cppcheck failed to start
+    :yield: issues formatted as `file:line: severity: message [id]`
+    """
+    for _, element in ElementTree.iterparse(stream, events=("end",)):
+        if element.tag != "error":
+            continue
+        # First location is the primary one, the others show how it was reached
+        location = element.find("location")
+        if location is not None:
+            yield (
+                f"{location.get('file')}:{location.get('line')}: "
+                f"{element.get('severity')}: {element.get('msg')} [{element.get('id')}]"
+            )
+        element.clear()
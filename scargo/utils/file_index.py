@@ -0,0 +1,221 @@
+"""Index of files under a directory, built with a single walk and shared by all commands of a run"""
+
+import fnmatch
+import os
+import re
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Pattern, Sequence, Tuple
+
+from scargo.logger import get_logger
+from scargo.utils.path_utils import normalize_path
+
+logger = get_logger()
+
+
+def _translate_pattern(pattern: str) -> Optional[Tuple[str, bool]]:
+    """
+    Translate gitignore-style pattern into a regular expression matching relative posix paths.
+
+    :param str pattern: pattern, e.g. `src/bsp`, `*.pb.cc`, `**/generated/`
+    :return: regular expression and whether the pattern is negated, None for blank lines and comments
+    """
+    pattern = pattern.strip()
+    if not pattern or pattern.startswith("#"):
+        return None
+    negated = pattern.startswith("!")
+    if negated:
+        pattern = pattern[1:]
+    dir_only = pattern.endswith("/")
+    pattern = pattern.rstrip("/")
+    if pattern.startswith("./"):
+        pattern = pattern[2:]
+    # Patterns with a slash are relative to the base directory, others match at any depth
+    anchored = "/" in pattern
+    pattern = pattern.lstrip("/")
+
+    regex = ""
+    index = 0
+    while index < len(pattern):
+        if pattern.startswith("**/", index):
+            regex += "(?:.*/)?"
+            index += 3
+        elif pattern.startswith("**", index):
+            regex += ".*"
+            index += 2
+        elif pattern[index] == "*":
+            regex += "[^/]*"
+            index += 1
+        elif pattern[index] == "?":
+            regex += "[^/]"
+            index += 1
+        elif pattern[index] == "[" and "]" in pattern[index + 2 :]:
+            end = pattern.index("]", index + 2)
+            char_class = pattern[index + 1 : end].replace("\\", "\\\\")
+            if char_class.startswith("!"):
+                char_class = "^" + char_class[1:]
+            regex += f"[{char_class}]"
+            index = end + 1
+        else:
+            regex += re.escape(pattern[index])
+            index += 1
+
+    prefix = "" if anchored else "(?:.*/)?"
+    # A matched directory excludes everything below it; directory-only patterns need something below
+    suffix = "/.*" if dir_only else "(?:/.*)?"
+    return f"{prefix}{regex}{suffix}", negated
+
+
+class ExcludeMatcher:
+    """
+    Exclude patterns with gitignore-style semantics, compiled once.
+
+    Patterns containing a slash are relative to the base directory (the project root),
+    other patterns match file and directory names at any depth. `*` and `?` do not
+    match slashes, `**` does. Trailing slash matches only directories, leading `!`
+    includes again paths excluded by earlier patterns.
+    """
+
+    def __init__(self, patterns: Iterable[str]) -> None:
+        translated = [result for result in map(_translate_pattern, patterns) if result]
+        self._ordered: List[Tuple[Pattern[str], bool]] = []
+        self._combined: Optional[Pattern[str]] = None
+        if any(negated for _, negated in translated):
+            # The last matching pattern decides, so patterns are evaluated one by one
+            self._ordered = [(re.compile(regex), negated) for regex, negated in translated]
+        elif translated:
+            self._combined = re.compile("|".join(f"(?:{regex})" for regex, _ in translated))
+
+    def __bool__(self) -> bool:
+        return bool(self._combined or self._ordered)
+
+    def matches(self, path: str, is_dir: bool = False) -> bool:
+        """
+        :param str path: posix path relative to the base directory
+        :param bool is_dir: whether the path is a directory
+        :return: True if the path is excluded
+        """
+        if is_dir:
+            path += "/"
+        if self._combined:
+            return self._combined.fullmatch(path) is not None
+        excluded = False
+        for regex, negated in self._ordered:
+            if regex.fullmatch(path):
+                excluded = not negated
+        return excluded
+
+
+class FileIndex:
+    """
+    All files under `root`, found with one `os.scandir` walk.
+
+    Symbolic links to directories are not followed.
+    """
+
+    def __init__(self, root: Path) -> None:
+        self.root = root
+        # Posix directory paths relative to root ("" for root itself) with names of their files, in walk order
+        self._directories: List[Tuple[str, List[str]]] = []
+        self._walk()
+        self._files = {_join(relative_dir, name) for relative_dir, names in self._directories for name in names}
+
+    def _walk(self) -> None:
+        to_visit = [""]
+        while to_visit:
+            relative_dir = to_visit.pop()
+            try:
+                with os.scandir(self.root / relative_dir) as entries:
+                    sorted_entries = sorted(entries, key=lambda entry: entry.name)
+            except OSError as e:
+                logger.debug("Unable to list %s: %s", self.root / relative_dir, e)
+                continue
+            file_names = []
+            sub_dirs = []
+            for entry in sorted_entries:
+                if entry.is_dir(follow_symlinks=False):
+                    sub_dirs.append(f"{relative_dir}/{entry.name}" if relative_dir else entry.name)
+                elif entry.is_file():
+                    file_names.append(entry.name)
+            self._directories.append((relative_dir, file_names))
+            to_visit.extend(reversed(sub_dirs))
+
+    def __len__(self) -> int:
+        return len(self._files)
+
+    def __contains__(self, path: object) -> bool:
+        """Whether the file was found by the walk, i.e. the index is not older than the file"""
+        if not isinstance(path, Path):
+            return False
+        try:
+            relative_path = normalize_path(path).relative_to(normalize_path(self.root))
+        except ValueError:
+            return False
+        return relative_path.as_posix() in self._files
+
+    def find(
+        self, glob_patterns: Sequence[str] = ("*",), exclude_patterns: Sequence[str] = (), base_dir: Path = Path()
+    ) -> List[Path]:
+        """
+        Find indexed files matching any of the glob patterns.
+
+        :param glob_patterns: patterns file names are matched against, e.g. `*.cpp`
+        :param exclude_patterns: gitignore-style patterns relative to `base_dir`
+        :param base_dir: directory exclude patterns are relative to, current working directory by default
+        :return: paths of matching files which are not excluded
+        """
+        name_regex = re.compile("|".join(fnmatch.translate(pattern) for pattern in glob_patterns))
+        matcher = ExcludeMatcher(exclude_patterns)
+        root_prefix = Path(os.path.relpath(self.root, base_dir)).as_posix() if matcher else ""
+        if matcher and root_prefix != "." and matcher.matches(root_prefix, is_dir=True):
+            logger.info("Skipping %s", self.root)
+            return []
+
+        found = []
+        # Directories are in depth-first order, so everything below an excluded directory directly follows it
+        excluded_dir: Optional[str] = None
+        for relative_dir, file_names in self._directories:
+            if excluded_dir is not None and relative_dir.startswith(excluded_dir + "/"):
+                continue
+            excluded_dir = None
+            dir_path = self.root / relative_dir
+            prefix = _join(root_prefix, relative_dir)
+            if matcher and relative_dir and matcher.matches(prefix, is_dir=True):
+                logger.info("Skipping %s", dir_path)
+                excluded_dir = relative_dir
+                continue
+            for file_name in file_names:
+                if not name_regex.match(file_name):
+                    continue
+                if matcher and matcher.matches(_join(prefix, file_name)):
+                    logger.info("Skipping %s", dir_path / file_name)
+                    continue
+                found.append(dir_path / file_name)
+        return found
+
+
+def _join(directory: str, name: str) -> str:
+    if not directory or directory == ".":
+        return name
+    if not name:
+        return directory
+    return f"{directory}/{name}"
+
+
+_file_indexes: Dict[Path, FileIndex] = {}
+_file_indexes_lock = threading.Lock()
+
+
+def get_file_index(root: Path) -> FileIndex:
+    """Index of `root`, built on first use and shared by every caller in this process"""
+    key = normalize_path(root)
+    with _file_indexes_lock:
+        if key not in _file_indexes:
+            _file_indexes[key] = FileIndex(root)
+        return _file_indexes[key]
+
+
+def clear_file_indexes() -> None:
+    """Forget all indexes, e.g. when files were added or removed"""
+    with _file_indexes_lock:
+        _file_indexes.clear()
@@ -1,82 +1,155 @@
-import re
-from pathlib import Path
-from typing import Iterable, List, Tuple
+"""Writing files safely"""
 
+import filecmp
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Iterable, NamedTuple
 
-def finditer_with_line_numbers(
-    pattern: re.Pattern, string: str, flags: int = 0  # type: ignore[type-arg]
-) -> Iterable[Tuple[re.Match, int]]:  # type: ignore[type-arg]
-    """
-    Version of re.finditer that additionally returns the line number for each match.
+from scargo.logger import get_logger
 
-    :param pattern: A compiled regular expression pattern.
-    :param string: The string to be searched.
-    :param flags: Standard re flags to modify the regex behavior
-    :yield: Tuples of (match object, line number), where line number is the line on which the match starts.
-    """
-    matches = list(re.finditer(pattern, string, flags))
-    if not matches:
-        return
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None  # type: ignore[assignment]
 
-    end = matches[-1].start()
-    newline_table = {-1: 0}
-    for i, m in enumerate(re.finditer("\\n", string), 1):
-        offset = m.start()
-        if offset > end:
-            break
-        newline_table[offset] = i
+logger = get_logger()
 
-    for m in matches:
-        newline_offset = string.rfind("\n", 0, m.start())
-        line_number = newline_table[newline_offset]
-        yield (m, line_number)
+# Intermediate build files, not needed next to the artifacts
+OBJECT_FILE_SUFFIXES = (".o", ".obj", ".d")
 
+# ioctl from <linux/fs.h> sharing data blocks of two files on copy-on-write file systems (btrfs, xfs)
+_FICLONE = 0x40049409
 
-def extract_block_comments(content: str) -> List[str]:
-    """
-    Extracts block comments from the given content.
 
-    :param content: The string to extract comments from.
-    :return: A list of block comments.
+def write_atomically(file_path: Path, content: bytes) -> None:
     """
-    pattern = re.compile(r"/\*[\s\S]*?\*/", re.DOTALL)
-    return pattern.findall(content)
+    Replace content of the file, so that readers (editors, build tools, other fixers)
+    see either the old or the new content, never a partially written file.
 
+    Content is written to a temporary file in the same directory, which is then renamed.
 
-def extract_grouped_line_comments(content: str) -> List[str]:
+    :param file_path: file to replace, its permissions are kept
+    :param bytes content: new content
     """
-    Extracts and groups line comments from the given content.
+    fd, tmp_name = tempfile.mkstemp(dir=file_path.parent, prefix=f".{file_path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as tmp_file:
+            tmp_file.write(content)
+        if file_path.exists():
+            shutil.copymode(file_path, tmp_name)
+        os.replace(tmp_name, file_path)
+    except BaseException:
+        os.unlink(tmp_name)
+        raise
 
-    :param content: The string to extract comments from.
-    :param pattern: The compiled regex pattern for line comments.
-    :return: A list of grouped line comments.
-    """
-    pattern = re.compile(r"//.*", re.MULTILINE)
-    grouped_comments = []
-    current_section: List[Tuple[str, int]] = []
 
-    for comment, line_number in finditer_with_line_numbers(pattern, content):
-        if current_section and line_number > current_section[-1][1] + 1:
-            grouped_comments.append("\n".join(comment[0] for comment in current_section))
-            current_section = []
-        current_section.append((comment.group(), line_number))
+class SyncStats(NamedTuple):
+    copied_files: int
+    copied_bytes: int
+    unchanged_files: int
 
-    if current_section:
-        grouped_comments.append("\n".join(comment[0] for comment in current_section))
 
-    return grouped_comments
-
-
-def extract_comment_sections(file_path: Path) -> List[str]:
+def sync_tree(source_dir: Path, dest_dir: Path, skip_suffixes: Iterable[str] = OBJECT_FILE_SUFFIXES) -> SyncStats:
     """
-    Extracts comment sections from the given file.
-
-    :param file_path: A Path object pointing to the file.
-    :return: A list of comment sections.
+    Copy files from `source_dir` to `dest_dir`, keeping the directory structure, like `cp -r -f source/* dest`.
+
+    Files whose size and modification time match are skipped, as are files with a different
+    modification time but the same content. Files are reflinked where the file system supports it
+    and replaced atomically, so a running executable can be updated as well. Symlinks, to files
+    and directories, are copied as symlinks.
+
+    :param source_dir: directory to copy from
+    :param dest_dir: directory to copy to, may contain `source_dir`
+    :param skip_suffixes: suffixes of files which are not copied
+    :return: numbers of copied and unchanged files
+    :raises FileNotFoundError: if `source_dir` does not exist
     """
-    content = file_path.read_text()
-
-    block_comments = extract_block_comments(content)
-    grouped_line_comments = extract_grouped_line_comments(content)
-
-    return block_comments + grouped_line_comments
+    if not source_dir.is_dir():
+        raise FileNotFoundError(f"Directory to copy {source_dir} does not exist")
+    skip_suffixes = tuple(skip_suffixes)
+    copied_files = copied_bytes = unchanged_files = 0
+    for dir_path, dir_names, file_names in os.walk(source_dir):
+        relative_dir = Path(dir_path).relative_to(source_dir)
+        # Not followed by os.walk
+        dir_links = [dir_name for dir_name in dir_names if Path(dir_path, dir_name).is_symlink()]
+        for file_name in [*dir_links, *file_names]:
+            if file_name.endswith(skip_suffixes):
+                continue
+            source = Path(dir_path, file_name)
+            dest = dest_dir / relative_dir / file_name
+            if source.is_symlink():
+                if _copy_symlink(source, dest):
+                    copied_files += 1
+                else:
+                    unchanged_files += 1
+                continue
+            source_stat = source.stat()
+            if _is_unchanged(source, source_stat, dest):
+                unchanged_files += 1
+                continue
+            dest.parent.mkdir(parents=True, exist_ok=True)
+            _copy_file(source, dest)
+            copied_files += 1
+            copied_bytes += source_stat.st_size
+    return SyncStats(copied_files, copied_bytes, unchanged_files)
+
+
+def _copy_symlink(source: Path, dest: Path) -> bool:
+    """Create `dest` with the target of the `source` symlink, False if it already has it"""
+    target = os.readlink(source)
+    if dest.is_symlink():
+        if os.readlink(dest) == target:
+            return False
+        dest.unlink()
+    elif dest.is_file():
+        dest.unlink()
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    os.symlink(target, dest)
+    return True
+
+
+def _is_unchanged(source: Path, source_stat: os.stat_result, dest: Path) -> bool:
+    if dest.is_symlink():
+        # Replaced by a copy of the file, even if it links to the same content
+        return False
+    try:
+        dest_stat = dest.stat()
+    except OSError:
+        return False
+    if dest_stat.st_size != source_stat.st_size:
+        return False
+    if dest_stat.st_mtime_ns == source_stat.st_mtime_ns:
+        return True
+    # Rebuilt with the same result
+    if filecmp.cmp(source, dest, shallow=False):
+        os.utime(dest, ns=(source_stat.st_atime_ns, source_stat.st_mtime_ns))
+        return True
+    return False
+
+
+def _copy_file(source: Path, dest: Path) -> None:
+    fd, tmp_name = tempfile.mkstemp(dir=dest.parent, prefix=f".{dest.name}.", suffix=".tmp")
+    try:
+        with open(source, "rb") as source_file, os.fdopen(fd, "wb") as tmp_file:
+            if not _reflink(source_file.fileno(), tmp_file.fileno()):
+                tmp_file.seek(0)
+                tmp_file.truncate()
+                shutil.copyfileobj(source_file, tmp_file)
+        shutil.copystat(source, tmp_name)
+        os.replace(tmp_name, dest)
+    except BaseException:
+        os.unlink(tmp_name)
+        raise
+
+
+def _reflink(source_fd: int, dest_fd: int) -> bool:
+    """Share data blocks of the files, False if the file system does not support it"""
+    if fcntl is None:
+        return False
+    try:
+        fcntl.ioctl(dest_fd, _FICLONE, source_fd)
+    except OSError:
+        return False
+    return os.fstat(dest_fd).st_size == os.fstat(source_fd).st_size
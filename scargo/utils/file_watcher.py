@@ -0,0 +1,205 @@
+"""Wait for changes of files under a directory"""
+
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import time
+from pathlib import Path
+from typing import Dict, NamedTuple, Optional, Set, Tuple
+
+from scargo.logger import get_logger
+from scargo.utils.path_utils import normalize_path
+
+logger = get_logger()
+
+# Flags from <sys/inotify.h>
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+
+_WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_DELETE_SELF
+_EVENT_HEADER = struct.Struct("iIII")
+
+
+class FileChanges(NamedTuple):
+    # Modified, created and removed files, and removed directories
+    files: Set[Path]
+    # True if a file was created or removed, i.e. a listing of the tree is no longer valid
+    tree_changed: bool
+
+
+class _Inotify:
+    """Minimal inotify binding, only available on Linux"""
+
+    def __init__(self) -> None:
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self.fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno))
+
+    def add_watch(self, path: Path) -> int:
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(path), _WATCH_MASK)
+        if wd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno), str(path))
+        return int(wd)
+
+    def read_events(self, timeout: Optional[float]) -> Optional[bytes]:
+        """Wait for events, return None on timeout"""
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        if not readable:
+            return None
+        try:
+            return os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return b""
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+class FileWatcher:
+    """
+    Report files changed under `root`.
+
+    Uses inotify where it is available and falls back to polling modification times.
+    Directories created while watching are watched as well.
+    """
+
+    def __init__(self, root: Path, poll_interval: float = 1.0, settle_time: float = 0.2) -> None:
+        """
+        :param root: directory to watch
+        :param poll_interval: seconds between scans when inotify is not available
+        :param settle_time: changes are collected until there are none for this many seconds,
+            so saving several files at once triggers one re-check
+        """
+        self.root = normalize_path(root)
+        self._poll_interval = poll_interval
+        self._settle_time = settle_time
+        self._inotify: Optional[_Inotify] = None
+        self._watched_dirs: Dict[int, Path] = {}
+        self._snapshot: Dict[Path, Tuple[int, int]] = {}
+        try:
+            self._inotify = _Inotify()
+            self._watch_tree(self.root)
+        except (OSError, AttributeError) as e:
+            logger.debug("inotify not available (%s), polling for changes", e)
+            if self._inotify:
+                self._inotify.close()
+                self._inotify = None
+            self._snapshot = self._take_snapshot()
+
+    def close(self) -> None:
+        if self._inotify:
+            self._inotify.close()
+            self._inotify = None
+
+    def wait_for_changes(self) -> FileChanges:
+        """Block until some files change"""
+        if self._inotify:
+            return self._wait_inotify(self._inotify)
+        return self._wait_polling()
+
+    def _watch_tree(self, directory: Path) -> Set[Path]:
+        """Watch directory and its subdirectories, return files already in them"""
+        assert self._inotify
+        files: Set[Path] = set()
+        to_visit = [directory]
+        while to_visit:
+            current = to_visit.pop()
+            try:
+                self._watched_dirs[self._inotify.add_watch(current)] = current
+                with os.scandir(current) as entries:
+                    for entry in entries:
+                        if entry.is_dir(follow_symlinks=False):
+                            to_visit.append(Path(entry.path))
+                        elif entry.is_file():
+                            files.add(Path(entry.path))
+            except OSError as e:
+                # Directory removed in the meantime or watch limit reached
+                logger.debug("Unable to watch %s: %s", current, e)
+        return files
+
+    def _wait_inotify(self, inotify: _Inotify) -> FileChanges:
+        changes = FileChanges(set(), False)
+        timeout: Optional[float] = None
+        while True:
+            data = inotify.read_events(timeout)
+            if data is None:
+                if changes.files or changes.tree_changed:
+                    return changes
+                timeout = None
+                continue
+            changes = self._parse_events(data, changes)
+            timeout = self._settle_time
+
+    def _parse_events(self, data: bytes, changes: FileChanges) -> FileChanges:
+        files = changes.files
+        tree_changed = changes.tree_changed
+        offset = 0
+        while offset + _EVENT_HEADER.size <= len(data):
+            wd, mask, _, name_length = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            name = data[offset : offset + name_length].rstrip(b"\0")
+            offset += name_length
+
+            if mask & IN_Q_OVERFLOW:
+                # Events were lost, everything has to be treated as changed
+                logger.debug("inotify queue overflow, rescanning %s", self.root)
+                files.update(self._watch_tree(self.root))
+                tree_changed = True
+                continue
+            if mask & IN_IGNORED:
+                self._watched_dirs.pop(wd, None)
+                continue
+            directory = self._watched_dirs.get(wd)
+            if directory is None or not name:
+                continue
+            path = directory / os.fsdecode(name)
+            if mask & IN_ISDIR:
+                if mask & (IN_CREATE | IN_MOVED_TO):
+                    files.update(self._watch_tree(path))
+                elif mask & (IN_DELETE | IN_MOVED_FROM):
+                    # Files moved away with the directory get no events of their own
+                    files.add(path)
+                tree_changed = True
+                continue
+            files.add(path)
+            if mask & (IN_CREATE | IN_DELETE | IN_MOVED_FROM | IN_MOVED_TO):
+                tree_changed = True
+        return FileChanges(files, tree_changed)
+
+    def _take_snapshot(self) -> Dict[Path, Tuple[int, int]]:
+        snapshot = {}
+        for dir_path, _, file_names in os.walk(self.root):
+            for file_name in file_names:
+                path = Path(dir_path, file_name)
+                try:
+                    stat = path.stat()
+                except OSError:
+                    continue
+                snapshot[path] = (stat.st_mtime_ns, stat.st_size)
+        return snapshot
+
+    def _wait_polling(self) -> FileChanges:
+        changes = FileChanges(set(), False)
+        while True:
+            time.sleep(self._settle_time if changes.files else self._poll_interval)
+            previous, self._snapshot = self._snapshot, self._take_snapshot()
+            changed = {path for path, state in self._snapshot.items() if previous.get(path) != state}
+            removed = set(previous) - set(self._snapshot)
+            if not changed and not removed:
+                if changes.files:
+                    return changes
+                continue
+            tree_changed = bool(removed) or any(path not in previous for path in changed)
+            changes = FileChanges(changes.files | changed | removed, changes.tree_changed or tree_changed)
@@ -0,0 +1,107 @@
+import re
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+from scargo.logger import get_logger
+from scargo.utils.path_utils import normalize_path
+
+logger = get_logger()
+
+# New side of a hunk header of `git diff -U0`, count is 1 when omitted
+_HUNK_PATTERN = re.compile(r"^@@ -\S+ \+(\d+)(?:,(\d+))? @@")
+
+
+def get_changed_files(project_root: Path, ref: str) -> Set[Path]:
+    """
+    Files changed since the point where the current branch forked from `ref`.
+
+    Committed, staged, unstaged and untracked files are included, deleted ones are not.
+
+    :param project_root: directory inside the git repository, returned files are limited to it
+    :param str ref: git ref to compare with, e.g. target branch of a merge request
+    :return: absolute paths of changed files
+    """
+    try:
+        merge_base = _git(project_root, "merge-base", ref, "HEAD").strip()
+        changed = _git(project_root, "diff", "-z", "--name-only", "--relative", "--diff-filter=d", merge_base)
+        untracked = _git(project_root, "ls-files", "-z", "--others", "--exclude-standard")
+    except subprocess.CalledProcessError as e:
+        logger.error("Unable to get files changed since %s: %s", ref, e.stderr.strip())
+        sys.exit(1)
+
+    project_root = normalize_path(project_root)
+    return {project_root / name for name in [*changed.split("\0"), *untracked.split("\0")] if name}
+
+
+def get_changed_lines(project_root: Path, ref: str) -> Dict[Path, Optional[List[Tuple[int, int]]]]:
+    """
+    Lines changed since the point where the current branch forked from `ref`.
+
+    Committed, staged and unstaged changes are included. Files with only removed lines are not.
+
+    :param project_root: directory inside the git repository, returned files are limited to it
+    :param str ref: git ref to compare with
+    :return: first and last line of every changed range in the current version of the file,
+        None for untracked files, which are new as a whole
+    """
+    try:
+        merge_base = _git(project_root, "merge-base", ref, "HEAD").strip()
+        diff = _git(
+            project_root,
+            "diff",
+            "-U0",
+            "--no-color",
+            "--no-ext-diff",
+            # Parsed below, independent of diff.noprefix and diff.mnemonicPrefix
+            "--src-prefix=a/",
+            "--dst-prefix=b/",
+            "--relative",
+            "--diff-filter=d",
+            merge_base,
+        )
+        untracked = _git(project_root, "ls-files", "-z", "--others", "--exclude-standard")
+    except subprocess.CalledProcessError as e:
+        logger.error("Unable to get lines changed since %s: %s", ref, e.stderr.strip())
+        sys.exit(1)
+
+    project_root = normalize_path(project_root)
+    changed_lines: Dict[Path, Optional[List[Tuple[int, int]]]] = {}
+    ranges: List[Tuple[int, int]] = []
+    for line in diff.splitlines():
+        if line.startswith("+++ "):
+            ranges = []
+            if line != "+++ /dev/null":
+                changed_lines[project_root / _unquote_path(line[len("+++ ") :])[len("b/") :]] = ranges
+            continue
+        match = _HUNK_PATTERN.match(line)
+        if match:
+            start, count = int(match.group(1)), int(match.group(2) or 1)
+            # Hunks which only remove lines have nothing to format
+            if count:
+                ranges.append((start, start + count - 1))
+    changed_lines = {file_path: file_ranges for file_path, file_ranges in changed_lines.items() if file_ranges}
+    changed_lines.update((project_root / name, None) for name in untracked.split("\0") if name)
+    return changed_lines
+
+
+def _unquote_path(path: str) -> str:
+    """Path from a diff header, quoted and escaped like a C string if it has special characters"""
+    # Git adds a tab after names with spaces
+    path = path.rstrip("\t")
+    if not path.startswith('"'):
+        return path
+    # Octal escapes are UTF-8 bytes, unicode_escape decodes them as single characters
+    return path[1:-1].encode("utf-8").decode("unicode_escape").encode("latin-1").decode("utf-8")
+
+
+def _git(cwd: Path, *args: str) -> str:
+    return subprocess.run(
+        # Non-ASCII characters in paths are not escaped
+        ["git", "-c", "core.quotepath=off", *args],
+        cwd=cwd,
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
@@ -0,0 +1,203 @@
+"""Analysis of build steps recorded by ninja in `.ninja_log`"""
+
+import json
+from bisect import bisect_right
+from itertools import groupby
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Set, Tuple
+
+NINJA_LOG_NAME = ".ninja_log"
+# A step is a bottleneck if it runs alone for at least this part of the build...
+BOTTLENECK_SHARE = 0.1
+# ...and at least this many seconds
+BOTTLENECK_MIN_SECONDS = 1.0
+
+
+class NinjaStep(NamedTuple):
+    # Seconds since the start of the build
+    start: float
+    end: float
+    # Outputs of the step, one step can have several
+    outputs: Tuple[str, ...]
+
+    @property
+    def duration(self) -> float:
+        return self.end - self.start
+
+    @property
+    def name(self) -> str:
+        return self.outputs[0]
+
+
+class BuildAnalysis(NamedTuple):
+    wall_time: float
+    # Sum of durations of all steps
+    total_time: float
+    # Estimate of the critical path: chain of steps ending with the last one,
+    # each started after the previous one finished
+    critical_path: List[NinjaStep]
+    # Average number of running steps in consecutive, equally long parts of the build
+    parallelism: List[float]
+    # Steps which ran alone for long, with the time they ran alone
+    bottlenecks: List[Tuple[NinjaStep, float]]
+
+
+def read_ninja_log(log_path: Path) -> List[NinjaStep]:
+    """
+    Steps of the last build recorded in the log.
+
+    Ninja appends steps in the order they finished, so a new build starts where end time goes down.
+
+    :param log_path: path of `.ninja_log`
+    :return: steps ordered by the end time
+    """
+    steps: Dict[Tuple[int, int, str], List[str]] = {}
+    last_end = -1
+    for line in log_path.read_text(encoding="utf-8", errors="replace").splitlines():
+        if line.startswith("#"):
+            continue
+        fields = line.split("\t")
+        if len(fields) < 5:
+            continue
+        start, end, output, command_hash = int(fields[0]), int(fields[1]), fields[3], fields[4]
+        if end < last_end:
+            steps.clear()
+        last_end = end
+        steps.setdefault((start, end, command_hash), []).append(output)
+    return [NinjaStep(start / 1000, end / 1000, tuple(outputs)) for (start, end, _), outputs in steps.items()]
+
+
+def analyze_steps(steps: List[NinjaStep], segments: int = 10) -> BuildAnalysis:
+    """
+    Compute the critical path, parallelism and bottlenecks of a build.
+
+    Ninja does not record dependencies, so the critical path is approximated: a step follows
+    the step which finished last before it started.
+
+    :param steps: steps of one build
+    :param int segments: number of parts of the build the parallelism is computed for
+    :return: analysis of the build
+    """
+    if not steps:
+        return BuildAnalysis(0.0, 0.0, [], [], [])
+    begin = min(step.start for step in steps)
+    wall_time = max(step.end for step in steps) - begin
+    return BuildAnalysis(
+        wall_time=wall_time,
+        total_time=sum(step.duration for step in steps),
+        critical_path=_get_critical_path(steps),
+        parallelism=_get_parallelism(steps, begin, wall_time, segments),
+        bottlenecks=_get_bottlenecks(steps, wall_time),
+    )
+
+
+def format_build_analysis(analysis: BuildAnalysis) -> str:
+    if not analysis.wall_time:
+        return "No build steps found."
+    lines = [
+        f"Build took {analysis.wall_time:.1f} s, steps took {analysis.total_time:.1f} s, "
+        f"average parallelism {analysis.total_time / analysis.wall_time:.1f}",
+        "Parallelism over time: " + " ".join(f"{value:.1f}" for value in analysis.parallelism),
+        f"Critical path (estimated from step times, {sum(step.duration for step in analysis.critical_path):.1f} s):",
+    ]
+    lines.extend(f"  {step.duration:9.3f} s  {step.name}" for step in analysis.critical_path)
+    if analysis.bottlenecks:
+        lines.append("Serialized bottlenecks:")
+        lines.extend(
+            f"  {alone:9.3f} s  {step.name} ran alone for {100 * alone / analysis.wall_time:.0f}% of the build"
+            for step, alone in analysis.bottlenecks
+        )
+    return "\n".join(lines)
+
+
+def write_chrome_trace(steps: List[NinjaStep], trace_path: Path) -> None:
+    """
+    Write steps as a timeline which can be opened in chrome://tracing or Perfetto.
+
+    :param steps: steps of one build
+    :param trace_path: path of the JSON file
+    """
+    lane_ends: List[float] = []
+    events = []
+    for step in sorted(steps):
+        # Every lane holds steps which did not overlap, like a thread of ninja
+        lane = next((index for index, end in enumerate(lane_ends) if end <= step.start), len(lane_ends))
+        if lane == len(lane_ends):
+            lane_ends.append(step.end)
+        else:
+            lane_ends[lane] = step.end
+        events.append(
+            {
+                "name": step.name,
+                "cat": "build",
+                "ph": "X",
+                "ts": round(step.start * 1e6),
+                "dur": round(step.duration * 1e6),
+                "pid": 0,
+                "tid": lane,
+                "args": {"outputs": list(step.outputs)},
+            }
+        )
+    trace_path.write_text(json.dumps({"traceEvents": events, "displayTimeUnit": "ms"}), encoding="utf-8")
+
+
+def _get_critical_path(steps: List[NinjaStep]) -> List[NinjaStep]:
+    """
+    Heuristic chain of steps ending with the last one, not the real critical path.
+
+    Ninja does not log dependencies, so each step is assumed to wait for the step which finished
+    last before it started. Steps found with a binary search over end times.
+    """
+    by_end = sorted(steps, key=lambda step: step.end)
+    ends = [step.end for step in by_end]
+    index = len(by_end) - 1
+    path = [by_end[index]]
+    while True:
+        # Only earlier steps, a step which takes no time must not follow itself
+        index = bisect_right(ends, by_end[index].start, hi=index) - 1
+        if index < 0:
+            break
+        path.append(by_end[index])
+    return path[::-1]
+
+
+def _get_parallelism(steps: List[NinjaStep], begin: float, wall_time: float, segments: int) -> List[float]:
+    if not wall_time:
+        return []
+    segment_length = wall_time / segments
+    parallelism = []
+    for index in range(segments):
+        segment_start = begin + index * segment_length
+        segment_end = segment_start + segment_length
+        busy = sum(max(0.0, min(step.end, segment_end) - max(step.start, segment_start)) for step in steps)
+        parallelism.append(busy / segment_length)
+    return parallelism
+
+
+def _get_bottlenecks(steps: List[NinjaStep], wall_time: float) -> List[Tuple[NinjaStep, float]]:
+    """Steps with the longest time they were the only running step, found with a sweep over start and end times"""
+    # Starts before ends of the same time, so steps which take no time are not left running
+    events = sorted(
+        (time, is_end, index)
+        for index, step in enumerate(steps)
+        for time, is_end in ((step.start, False), (step.end, True))
+    )
+    running: Set[int] = set()
+    alone: Dict[NinjaStep, float] = {}
+    last_time = 0.0
+    for time, time_events in groupby(events, key=lambda event: event[0]):
+        if len(running) == 1:
+            step = steps[next(iter(running))]
+            alone[step] = alone.get(step, 0.0) + time - last_time
+        for _, is_end, index in time_events:
+            if is_end:
+                running.discard(index)
+            else:
+                running.add(index)
+        last_time = time
+    threshold = max(BOTTLENECK_MIN_SECONDS, BOTTLENECK_SHARE * wall_time)
+    return sorted(
+        ((step, seconds) for step, seconds in alone.items() if seconds >= threshold),
+        key=lambda item: item[1],
+        reverse=True,
+    )
@@ -0,0 +1,119 @@
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager, nullcontext
+from typing import (
+    Callable,
+    ContextManager,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    TypeVar,
+)
+
+from scargo.logger import buffered_log_records, replay_log_records
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+def get_default_jobs() -> int:
+    return os.cpu_count() or 1
+
+
+class JobBudget:
+    """
+    Limit the number of jobs running at the same time.
+
+    One budget can be shared by several independent workers (e.g. checkers),
+    so that together they never use more than `jobs` CPU cores.
+    """
+
+    def __init__(self, jobs: Optional[int] = None) -> None:
+        self.jobs = max(1, jobs or get_default_jobs())
+        self._available = self.jobs
+        # Reservations waiting for more than one slot, new small ones let them go first
+        self._waiting_large = 0
+        self._condition = threading.Condition()
+
+    @contextmanager
+    def reserve(self, count: int = 1, minimum: int = 1) -> Iterator[int]:
+        """
+        Block until at least `minimum` job slots are free and take up to `count` slots.
+
+        Taking whatever is free instead of waiting for all `count` slots
+        prevents large reservations from starving. Long running tools which size
+        their process pool from the grant ask for a larger `minimum`, so they are not
+        stuck with the single slot which happened to be free when they started.
+
+        :param int count: number of slots wanted
+        :param int minimum: number of slots to wait for, at most all slots of the budget
+        :yield: number of slots granted
+        """
+        minimum = max(1, min(minimum, count, self.jobs))
+        with self._condition:
+            if minimum > 1:
+                self._waiting_large += 1
+                try:
+                    self._condition.wait_for(lambda: self._available >= minimum)
+                finally:
+                    self._waiting_large -= 1
+                    self._condition.notify_all()
+            else:
+                self._condition.wait_for(lambda: self._available > 0 and not self._waiting_large)
+            granted = min(count, self._available)
+            self._available -= granted
+        try:
+            yield granted
+        finally:
+            with self._condition:
+                self._available += granted
+                self._condition.notify_all()
+
+
+def run_grouped(
+    func: Callable[[T], R],
+    items: Sequence[T],
+    jobs: int,
+    budget: Optional[JobBudget] = None,
+) -> List[R]:
+    """
+    Call `func` for every item using a pool of `jobs` worker threads.
+
+    Log messages emitted while processing an item are held back and printed
+    in the order of `items`, so the output of every item stays grouped.
+
+    :param func: function to call for each item
+    :param items: items to process
+    :param int jobs: number of worker threads
+    :param budget: if given, every call takes one slot from this budget
+    :return: results in the order of `items`
+    """
+
+    def call(item: T) -> R:
+        reservation: ContextManager[object] = budget.reserve() if budget else nullcontext()
+        with reservation:
+            return func(item)
+
+    if jobs <= 1 or len(items) <= 1:
+        return [call(item) for item in items]
+
+    def run(item: T) -> Tuple[R, List[logging.LogRecord]]:
+        records: List[logging.LogRecord] = []
+        try:
+            with buffered_log_records() as records:
+                result = call(item)
+        except BaseException:
+            replay_log_records(records)
+            raise
+        return result, records
+
+    results = []
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        for result, records in executor.map(run, items):
+            replay_log_records(records)
+            results.append(result)
+    return results
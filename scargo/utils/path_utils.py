@@ -1,3 +1,4 @@
+import os
 from pathlib import Path
 from typing import Optional
 
@@ -16,3 +17,8 @@ def get_config_file_path(config_file_name: str) -> Optional[Path]:
 def get_project_root_or_none() -> Optional[Path]:
     config_path = get_config_file_path(SCARGO_LOCK_FILE) or get_config_file_path(SCARGO_DEFAULT_CONFIG_FILE)
     return config_path.parent if config_path else None
+
+
+def normalize_path(path: Path) -> Path:
+    """Absolute path with `..` and `.` segments collapsed, without resolving symlinks"""
+    return Path(os.path.normpath(Path(path).absolute()))
@@ -0,0 +1,139 @@
+"""Read C/C++ sources once and extract everything the text-based checkers need"""
+
+import mmap
+import re
+import threading
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Tuple, Union
+
+from scargo.utils.path_utils import normalize_path
+
+# Comments, string and character literals which may contain comment-like text, and newlines to count lines
+_TOKEN_PATTERN = re.compile(rb"""\n|//[^\n]*|/\*.*?(?:\*/|\Z)|"(?:\\.|[^"\\\n])*"|'(?:\\.|[^'\\\n])*'""", re.DOTALL)
+
+# Whitespace, comments and preprocessor directives at the beginning of a file
+_HEADER_PATTERN = re.compile(rb"""(?:\s+|//[^\n]*|/\*.*?\*/|\#[^\n]*(?:\\\n[^\n]*)*)*""", re.DOTALL)
+
+_PRAGMA_ONCE = b"#pragma once"
+
+# Mapping a file costs more than reading it, unless the file is large
+MMAP_MIN_SIZE = 64 * 1024
+
+
+class Comment(NamedTuple):
+    line_number: int
+    text: str
+    # Line comment, as opposed to a block comment
+    is_line_comment: bool
+
+
+class ScannedSource:
+    """Comments and other facts about a source file gathered in one pass over its content"""
+
+    def __init__(self, comments: List[Comment], header_end_line: int, has_pragma_once: bool) -> None:
+        self.comments = comments
+        self.header_end_line = header_end_line
+        self.has_pragma_once = has_pragma_once
+
+    def get_comment_lines(self) -> List[Tuple[int, str]]:
+        """Every line of every comment with its line number"""
+        return [
+            (comment.line_number + offset, line)
+            for comment in self.comments
+            for offset, line in enumerate(comment.text.splitlines())
+        ]
+
+    def get_comment_sections(self, header_only: bool = False) -> List[str]:
+        """
+        Block comments and groups of line comments in consecutive lines
+
+        :param bool header_only: only comments before the first line of code,
+            i.e. among blank lines and preprocessor directives at the top of the file
+        :return: text of every comment section
+        """
+        sections: List[str] = []
+        group: List[Comment] = []
+        for comment in self.comments:
+            if header_only and comment.line_number > self.header_end_line:
+                break
+            if group and (not comment.is_line_comment or comment.line_number > group[-1].line_number + 1):
+                sections.append("\n".join(line_comment.text for line_comment in group))
+                group = []
+            if comment.is_line_comment:
+                group.append(comment)
+            else:
+                sections.append(comment.text)
+        if group:
+            sections.append("\n".join(line_comment.text for line_comment in group))
+        return sections
+
+
+class SourceScanner:
+    """
+    Scan files and memoize results until the file changes.
+
+    One scanner is shared by all checkers of a run, so each file is read once
+    no matter how many checkers look at it.
+    """
+
+    def __init__(self) -> None:
+        self._scanned: Dict[Path, Tuple[Tuple[int, int], ScannedSource]] = {}
+        self._lock = threading.Lock()
+
+    def scan(self, file_path: Path) -> ScannedSource:
+        path = normalize_path(file_path)
+        stat = path.stat()
+        key = (stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            if path in self._scanned and self._scanned[path][0] == key:
+                return self._scanned[path][1]
+
+        scanned = _scan_file(path, stat.st_size)
+        with self._lock:
+            self._scanned[path] = (key, scanned)
+        return scanned
+
+
+def _scan_file(file_path: Path, size: int) -> ScannedSource:
+    with open(file_path, "rb") as file:
+        if size < MMAP_MIN_SIZE:
+            return _scan_buffer(file.read())
+        try:
+            buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            # Files which do not support mapping, e.g. pipes
+            return _scan_buffer(file.read())
+        with buffer:
+            return _scan_buffer(buffer)
+
+
+def _scan_buffer(buffer: Union[bytes, mmap.mmap]) -> ScannedSource:
+    header_match = _HEADER_PATTERN.match(buffer)
+    header_end = header_match.end() if header_match else 0
+    header_end_line: Optional[int] = None
+
+    comments = []
+    line_number = 1
+    for match in _TOKEN_PATTERN.finditer(buffer):
+        if header_end_line is None and match.start() >= header_end:
+            header_end_line = line_number
+        token = match.group()
+        if token == b"\n":
+            line_number += 1
+            continue
+        if token.startswith(b"/"):
+            comments.append(Comment(line_number, token.decode(errors="replace"), token.startswith(b"//")))
+        # Block comments and strings with escaped newlines span several lines
+        line_number += token.count(b"\n")
+
+    if header_end_line is None:
+        header_end_line = line_number
+    return ScannedSource(comments, header_end_line, buffer.find(_PRAGMA_ONCE) != -1)
+
+
+_default_scanner = SourceScanner()
+
+
+def scan_source(file_path: Path) -> ScannedSource:
+    """Scan the file with the scanner shared by all checkers"""
+    return _default_scanner.scan(file_path)
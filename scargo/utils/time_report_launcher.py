@@ -0,0 +1,44 @@
+"""
+Compiler launcher saving gcc `-ftime-report` output of every translation unit.
+
+Used as CMAKE_<LANG>_COMPILER_LAUNCHER by `scargo build --time-trace`:
+`python -m scargo.utils.time_report_launcher <compiler> <arguments>`
+"""
+
+import subprocess
+import sys
+from pathlib import Path
+from typing import List, Optional
+
+from scargo.utils.time_trace import TIME_REPORT_SUFFIX
+
+# First line of the report, everything before it are diagnostics
+_REPORT_START = ("Time variable", "Execution times")
+
+
+def get_output_path(args: List[str]) -> Optional[Path]:
+    for index, arg in enumerate(args[:-1]):
+        if arg == "-o":
+            return Path(args[index + 1])
+    return None
+
+
+def main(args: List[str]) -> int:
+    result = subprocess.run(args, stderr=subprocess.PIPE, text=True, errors="replace", check=False)
+    diagnostics = []
+    report: List[str] = []
+    for line in result.stderr.splitlines(keepends=True):
+        if not report and not line.startswith(_REPORT_START):
+            diagnostics.append(line)
+        else:
+            report.append(line)
+    sys.stderr.write("".join(diagnostics))
+
+    output_path = get_output_path(args)
+    if report and output_path:
+        Path(output_path).with_suffix(TIME_REPORT_SUFFIX).write_text("".join(report), encoding="utf-8")
+    return result.returncode
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,198 @@
+"""Compile-time hotspots of a build, from clang `-ftime-trace` or gcc `-ftime-report`"""
+
+import json
+import re
+import sys
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, DefaultDict, Dict, Iterable, List, NamedTuple, Tuple
+
+from scargo.logger import get_logger
+
+logger = get_logger()
+
+# Written next to the object file by `scargo.utils.time_report_launcher`
+TIME_REPORT_SUFFIX = ".time-report"
+TIME_TRACE_REPORT_NAME = "time_trace_report"
+# Number of entries of every ranking in the text report
+TEXT_REPORT_LIMIT = 20
+JSON_REPORT_LIMIT = 100
+
+_CLANG_TEMPLATE_EVENTS = ("InstantiateClass", "InstantiateFunction")
+# ` phase parsing   :   0.14 ( 58%)   0.07 ( 78%)   0.21 ( 64%)  10234 kB ( 81%)`, user, system and wall time
+_GCC_TIME_PATTERN = re.compile(
+    r"^\s*(?P<name>[^:]+?)\s*:\s*[\d.]+\s*(?:\(\s*\d+%\))?\s*[\d.]+\s*(?:\(\s*\d+%\))?\s*(?P<wall>[\d.]+)"
+)
+
+
+class TimeEntry(NamedTuple):
+    name: str
+    # Total wall time in seconds
+    seconds: float
+    # Number of translation units it was found in
+    occurrences: int = 1
+
+
+class TimeTraceReport(NamedTuple):
+    units: List[TimeEntry]
+    # Parse time including nested includes, only with clang
+    headers: List[TimeEntry]
+    # Only with clang
+    templates: List[TimeEntry]
+    # Compiler phases summed over all units, only with gcc
+    phases: List[TimeEntry]
+
+
+def is_clang(compiler: str) -> bool:
+    return "clang" in Path(compiler).name
+
+
+def get_time_trace_conf(clang: bool) -> List[str]:
+    """
+    Conan `-c` arguments adding time measurement to every compilation.
+
+    Compiler launchers, e.g. a compiler cache, are replaced, cache hits would not be measured.
+
+    :param bool clang: clang writes trace files itself, gcc prints the report which is saved by a launcher
+    :return: arguments for `conan install` and `conan build`
+    """
+    if clang:
+        flag = "-ftime-trace"
+        launcher = ""
+    else:
+        flag = "-ftime-report"
+        launcher = f"{sys.executable};-m;scargo.utils.time_report_launcher"
+    launchers = {"CMAKE_C_COMPILER_LAUNCHER": launcher, "CMAKE_CXX_COMPILER_LAUNCHER": launcher}
+    return [
+        "-c",
+        f'tools.build:cflags+=["{flag}"]',
+        "-c",
+        f'tools.build:cxxflags+=["{flag}"]',
+        "-c",
+        f"tools.cmake.cmaketoolchain:extra_variables={json.dumps(launchers)}",
+    ]
+
+
+def collect_time_trace(cmake_build_dir: Path, since: float = 0.0) -> TimeTraceReport:
+    """
+    Aggregate time measurements of all translation units compiled in the build directory.
+
+    :param cmake_build_dir: directory configured by CMake
+    :param float since: start of the build as a timestamp, older files are left by earlier builds
+    :return: rankings, slowest first
+    """
+    units: List[TimeEntry] = []
+    headers: DefaultDict[str, List[float]] = defaultdict(list)
+    templates: DefaultDict[str, List[float]] = defaultdict(list)
+    phases: DefaultDict[str, List[float]] = defaultdict(list)
+
+    for trace_path in _find_files(cmake_build_dir, "**/CMakeFiles/**/*.json", since):
+        events = _load_clang_trace(trace_path)
+        if events is None:
+            continue
+        unit_seconds = 0.0
+        for event in events:
+            name = event.get("name")
+            seconds = event.get("dur", 0) / 1e6
+            if name == "Total ExecuteCompiler":
+                unit_seconds = seconds
+            elif name == "Source":
+                headers[event["args"]["detail"]].append(seconds)
+            elif name in _CLANG_TEMPLATE_EVENTS:
+                templates[event["args"]["detail"]].append(seconds)
+        units.append(TimeEntry(_get_unit_name(trace_path, cmake_build_dir, ".json"), unit_seconds))
+
+    for report_path in _find_files(cmake_build_dir, f"**/*{TIME_REPORT_SUFFIX}", since):
+        unit_seconds = 0.0
+        for name, seconds in _parse_gcc_time_report(report_path.read_text(encoding="utf-8", errors="replace")):
+            if name == "TOTAL":
+                unit_seconds = seconds
+            else:
+                phases[name].append(seconds)
+        units.append(TimeEntry(_get_unit_name(report_path, cmake_build_dir, TIME_REPORT_SUFFIX), unit_seconds))
+
+    return TimeTraceReport(
+        units=_rank(units),
+        headers=_rank(TimeEntry(name, sum(times), len(times)) for name, times in headers.items()),
+        templates=_rank(TimeEntry(name, sum(times), len(times)) for name, times in templates.items()),
+        phases=_rank(TimeEntry(name, sum(times), len(times)) for name, times in phases.items()),
+    )
+
+
+def format_time_trace_report(report: TimeTraceReport, limit: int = TEXT_REPORT_LIMIT) -> str:
+    sections: List[Tuple[str, List[TimeEntry]]] = [
+        ("Slowest translation units", report.units),
+        ("Most expensive headers (parse time, including nested includes)", report.headers),
+        ("Slowest template instantiations", report.templates),
+        ("Compiler phases", report.phases),
+    ]
+    lines = []
+    for title, entries in sections:
+        if not entries:
+            continue
+        lines.append(f"{title}:")
+        for entry in entries[:limit]:
+            count = f"  ({entry.occurrences} units)" if entry.occurrences > 1 else ""
+            lines.append(f"  {entry.seconds:9.3f} s  {entry.name}{count}")
+        lines.append("")
+    if not lines:
+        return "No time trace files found, were all units up to date?"
+    return "\n".join(lines).rstrip("\n")
+
+
+def write_time_trace_report(report: TimeTraceReport, output_dir: Path) -> Path:
+    """
+    Write the report as text and JSON.
+
+    :param report: collected report
+    :param output_dir: directory of the reports
+    :return: path of the text report
+    """
+    json_report: Dict[str, Any] = {
+        section: [entry._asdict() for entry in entries[:JSON_REPORT_LIMIT]]
+        for section, entries in report._asdict().items()
+    }
+    text_path = output_dir / f"{TIME_TRACE_REPORT_NAME}.txt"
+    text_path.write_text(format_time_trace_report(report) + "\n", encoding="utf-8")
+    (output_dir / f"{TIME_TRACE_REPORT_NAME}.json").write_text(json.dumps(json_report, indent=2), encoding="utf-8")
+    return text_path
+
+
+def _find_files(directory: Path, pattern: str, since: float) -> List[Path]:
+    """Files matching the pattern modified at `since` or later"""
+    paths = []
+    for path in sorted(directory.glob(pattern)):
+        try:
+            if path.stat().st_mtime >= since:
+                paths.append(path)
+        except OSError as e:
+            logger.debug("Unable to read %s: %s", path, e)
+    return paths
+
+
+def _load_clang_trace(trace_path: Path) -> Any:
+    """Events of a clang trace, None for other JSON files"""
+    try:
+        data = json.loads(trace_path.read_text(encoding="utf-8"))
+    except (OSError, ValueError) as e:
+        logger.debug("Unable to read %s: %s", trace_path, e)
+        return None
+    if not isinstance(data, dict) or not isinstance(data.get("traceEvents"), list):
+        return None
+    return data["traceEvents"]
+
+
+def _parse_gcc_time_report(report: str) -> Iterable[Tuple[str, float]]:
+    """Name and wall time of every line of `-ftime-report` output"""
+    for line in report.splitlines():
+        match = _GCC_TIME_PATTERN.match(line)
+        if match:
+            yield match["name"], float(match["wall"])
+
+
+def _get_unit_name(trace_path: Path, cmake_build_dir: Path, suffix: str) -> str:
+    return trace_path.relative_to(cmake_build_dir).as_posix()[: -len(suffix)]
+
+
+def _rank(entries: Iterable[TimeEntry]) -> List[TimeEntry]:
+    return sorted(entries, key=lambda entry: entry.seconds, reverse=True)
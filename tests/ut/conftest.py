@@ -21,6 +21,8 @@ from scargo.config import (
     TestConfig,
     TodoCheckConfig,
 )
+from scargo.utils.compile_db import clear_compile_databases
+from scargo.utils.file_index import clear_file_indexes
 
 TARGET_X86 = ScargoTarget.x86
 TARGET_ESP32 = ScargoTarget.esp32
@@ -35,6 +37,16 @@ TEST_PROJECT_ESP32_PATH = Path(TEST_DATA_PATH, "test_projects", TEST_PROJECT_ESP
 TEST_PROJECT_STM32_PATH = Path(TEST_DATA_PATH, "test_projects", TEST_PROJECT_STM32_NAME)
 
 
+@pytest.fixture(autouse=True)
+def clear_file_index() -> Generator[None, None, None]:
+    # Indexes and compilation databases are shared by the whole process, every test has its own (fake) filesystem
+    clear_file_indexes()
+    clear_compile_databases()
+    yield
+    clear_file_indexes()
+    clear_compile_databases()
+
+
 @pytest.fixture()
 def config(fs: FakeFilesystem) -> Config:
     return Config(
@@ -0,0 +1,61 @@
+from pathlib import Path
+
+import pytest
+from pyfakefs.fake_filesystem import FakeFilesystem
+
+from scargo.config import CompileOptions, Config, ProfileConfig
+from scargo.file_generators.base_gen import TEMPLATE_ROOT
+from scargo.file_generators.cmake_gen import generate_cmake
+from scargo.file_generators.tests_gen import generate_tests
+
+
+@pytest.fixture
+def templates(fs: FakeFilesystem) -> None:
+    fs.add_real_directory(TEMPLATE_ROOT)
+
+
+def test_generate_cmake_without_compile_options(config: Config, templates: None) -> None:
+    generate_cmake(config)
+
+    cmake = Path("CMakeLists.txt").read_text()
+    assert "function(scargo_precompile_headers target)" in cmake
+    assert "SCARGO_PRECOMPILE_HEADERS\n" not in cmake
+    assert "CMAKE_UNITY_BUILD" not in cmake
+
+
+def test_generate_cmake_compile_options(config: Config, templates: None) -> None:
+    config.build.precompile_headers = ["<vector>", "src/include/lib.h"]
+    config.build.unity_build = True
+    config.build.targets = {"stm32": CompileOptions.parse_obj({"unity-build": False})}
+    config.profiles["Debug"].unity_build_batch_size = 4
+    # Build type of a custom profile is Debug by default
+    config.profiles["Custom"] = ProfileConfig.parse_obj({"cmake-build-type": "Debug", "unity-build": False})
+
+    generate_cmake(config)
+
+    cmake = Path("CMakeLists.txt").read_text()
+    assert (
+        "set(SCARGO_PRECOMPILE_HEADERS\n"
+        '  "$<$<COMPILE_LANGUAGE:CXX>:<vector>>"\n'
+        '  "$<$<COMPILE_LANGUAGE:CXX>:${CMAKE_SOURCE_DIR}/src/include/lib.h>"\n'
+        ")\n"
+        "set(CMAKE_UNITY_BUILD ON)\n"
+    ) in cmake
+    assert '# stm32\nif("${SCARGO_BUILD_TARGET}" STREQUAL "STM32")\n  set(CMAKE_UNITY_BUILD OFF)\nendif()\n' in cmake
+    assert (
+        '# Debug\nif("${SCARGO_PROFILE}" STREQUAL "Debug")\n  set(CMAKE_UNITY_BUILD_BATCH_SIZE 4)\nendif()\n'
+        '# Custom\nif("${SCARGO_PROFILE}" STREQUAL "Custom")\n  set(CMAKE_UNITY_BUILD OFF)\nendif()\n'
+    ) in cmake
+    assert 'set(SCARGO_PROFILE "$ENV{SCARGO_PROFILE}" CACHE STRING "Profile from scargo.toml" FORCE)' in cmake
+
+
+def test_generate_tests_compile_options(config: Config, templates: None) -> None:
+    config.build.precompile_headers = ["src/include/lib.h"]
+    config.build.targets = {"x86": CompileOptions.parse_obj({"unity-build": True})}
+
+    generate_tests(config)
+
+    cmake = Path("tests/CMakeLists.txt").read_text()
+    assert '"$<$<COMPILE_LANGUAGE:CXX>:${PROJECT_ROOT_DIR}/src/include/lib.h>"' in cmake
+    # Unit tests are built for the host, not for the target
+    assert "CMAKE_UNITY_BUILD" not in cmake
@@ -0,0 +1,63 @@
+from pathlib import Path
+
+import pytest
+from pyfakefs.fake_filesystem import FakeFilesystem
+
+from scargo.config import CompilerCache, Config
+from scargo.file_generators.base_gen import TEMPLATE_ROOT
+from scargo.file_generators.conan_gen import generate_conanprofile
+from tests.ut.utils import get_test_project_config
+
+
+@pytest.fixture
+def templates(fs: FakeFilesystem) -> None:
+    fs.add_real_directory(TEMPLATE_ROOT)
+
+
+def test_generate_conanprofile_without_compiler_cache(config: Config, templates: None) -> None:
+    generate_conanprofile(config)
+
+    assert "COMPILER_LAUNCHER" not in Path("config/conan/profiles/x86_Debug").read_text()
+    # Options of a profile are selected by its name, several profiles can have the same build type
+    assert "SCARGO_PROFILE=Release" in Path("config/conan/profiles/x86_Release").read_text().splitlines()
+
+
+@pytest.mark.parametrize(
+    ["cache_dir", "expected_dir"],
+    [
+        (
+            Path("build/.compiler_cache"),
+            "{{ os.path.normpath(os.path.join(profile_dir, '../../..', 'build/.compiler_cache')) }}",
+        ),
+        (Path("/cache/ccache"), "/cache/ccache"),
+    ],
+)
+def test_generate_conanprofile_compiler_cache(
+    cache_dir: Path, expected_dir: str, config: Config, templates: None
+) -> None:
+    config.project.compiler_cache = CompilerCache.CCACHE
+    config.project.compiler_cache_dir = cache_dir
+
+    generate_conanprofile(config)
+
+    launcher = f"env;CCACHE_DIR={expected_dir};ccache"
+    assert (
+        f'tools.cmake.cmaketoolchain:extra_variables={{"CMAKE_C_COMPILER_LAUNCHER": "{launcher}", '
+        f'"CMAKE_CXX_COMPILER_LAUNCHER": "{launcher}"}}'
+    ) in Path("config/conan/profiles/x86_Debug").read_text().splitlines()
+
+
+def test_generate_esp32_conanprofile_compiler_cache(fs: FakeFilesystem, templates: None) -> None:
+    fs.add_real_directory(Path(__file__).parent.parent / "data")
+    config = get_test_project_config("esp32")
+    config.project_root = Path()
+    config.project.compiler_cache = CompilerCache.SCCACHE
+    config.project.compiler_cache_dir = Path("/cache/sccache")
+
+    generate_conanprofile(config)
+
+    # The IDF toolchain replaces conan_toolchain.cmake, the launcher is read by CMakeLists.txt from the environment
+    profile_lines = Path("config/conan/profiles/esp32_Debug").read_text().splitlines()
+    assert "WORKAROUND_FOR_ESP32_COMPILER_LAUNCHER=env;SCCACHE_DIR=/cache/sccache;sccache" in profile_lines
+    assert profile_lines.index("[buildenv]") < profile_lines.index("[conf]")
+    assert not any("extra_variables" in line for line in profile_lines)
@@ -0,0 +1,27 @@
+from pathlib import Path
+
+from scargo.file_generators.clang_parser.header_parser import parse_file
+
+HEADER = """\
+#include <string>
+
+namespace app {
+class Sensor {
+  public:
+    virtual ~Sensor() = default;
+    virtual int read(int channel) = 0;
+};
+}  // namespace app
+"""
+
+
+def test_parse_file(tmp_path: Path) -> None:
+    header_path = tmp_path / "sensor.h"
+    header_path.write_text(HEADER)
+
+    header = parse_file(header_path)
+
+    assert header.name == "sensor.h"
+    assert [namespace.name for namespace in header.namespaces] == ["app"]
+    assert [cls.name for cls in header.classes] == ["Sensor"]
+    assert [method.name for method in header.classes[0].methods] == ["read"]
@@ -1,10 +1,11 @@
 from pathlib import Path
-from unittest.mock import MagicMock, mock_open
+from unittest.mock import MagicMock
 
 import pytest
+from pyfakefs.fake_filesystem import FakeFilesystem
 from pytest_mock import MockerFixture
 
-from scargo.commands.check import CheckerFixer, find_files
+from scargo.commands.check_base import CheckerFixer, find_files
 
 
 @pytest.fixture
@@ -16,11 +17,11 @@ def mock_find_files(mocker: MockerFixture) -> MagicMock:
 
 
 @pytest.fixture
-def mock_file_contents(request: pytest.FixtureRequest, mocker: MockerFixture) -> MagicMock:
-    return mocker.patch(  # type: ignore[no-any-return]
-        f"{CheckerFixer.__module__}.open",
-        mock_open(read_data="\n".join(request.param)),
-    )
+def source_file(request: pytest.FixtureRequest, fs: FakeFilesystem) -> Path:
+    """File returned by `mock_find_files` with given lines"""
+    file_path = Path("foo/bar.hpp")
+    fs.create_file(file_path, contents="\n".join(request.param))
+    return file_path
 
 
 @pytest.fixture
@@ -0,0 +1,95 @@
+import json
+from pathlib import Path
+
+import pytest
+from pyfakefs.fake_filesystem import FakeFilesystem
+from pytest_subprocess import FakeProcess
+
+from scargo.commands.check import ClangTidyChecker, CppcheckChecker, PragmaChecker
+from scargo.config import Config
+
+BUILD_PATH = Path("build/x86/Debug")
+
+
+@pytest.fixture
+def sources(fs: FakeFilesystem) -> None:
+    fs.create_file("src/changed.hpp", contents="#pragma once\nint changed();\n")
+    fs.create_file("src/unchanged.hpp", contents="int unchanged();\n")
+    fs.create_file("src/includes_changed.cpp", contents='#include "changed.hpp"\n')
+    fs.create_file("src/other.cpp", contents='#include "unchanged.hpp"\n')
+    fs.create_file(BUILD_PATH / "compile_commands.json", contents="[]")
+
+
+def test_only_changed_files_are_checked(config: Config, sources: None) -> None:
+    result = PragmaChecker(config, changed_files={Path("src/changed.hpp")}).check()
+    assert result == 0
+
+
+def test_clang_tidy_checks_files_including_changed_headers(
+    config: Config, sources: None, fake_process: FakeProcess
+) -> None:
+    checked_files = ["src/changed.hpp", "src/includes_changed.cpp"]
+    for file_name in checked_files:
+        fake_process.register(["clang-tidy", str(config.source_dir_path / Path(file_name).name), "-p", BUILD_PATH])
+
+    result = ClangTidyChecker(config, changed_files={Path("src/changed.hpp")}).check()
+
+    assert result == 0
+    assert len(fake_process.calls) == len(checked_files)
+
+
+def test_cppcheck_checks_changed_files(config: Config, sources: None, fake_process: FakeProcess) -> None:
+    config.check.cppcheck.directories = ["src/"]
+    cmd = [
+        "cppcheck",
+        "--enable=all",
+        "--inline-suppr",
+        "--language=c++",
+        "--std=c++17",
+        "--xml",
+        str(config.source_dir_path / "other.cpp"),
+        "--cppcheck-build-dir=build/cppcheck",
+        "-j",
+        "2",
+    ]
+    fake_process.register(cmd, stderr="<results><errors></errors></results>")
+
+    result = CppcheckChecker(config, jobs=2, changed_files={Path("src/other.cpp")}).check()
+
+    assert result == 0
+    assert fake_process.call_count(cmd) == 1
+
+
+def test_cppcheck_checks_changed_units_from_compile_db(
+    config: Config, fs: FakeFilesystem, sources: None, fake_process: FakeProcess
+) -> None:
+    units = [(config.source_dir_path / name).absolute() for name in ("includes_changed.cpp", "other.cpp")]
+    db_path = BUILD_PATH / "compile_commands.json"
+    entries = [{"directory": str(BUILD_PATH.absolute()), "file": str(unit), "command": "c++ -c"} for unit in units]
+    db_path.write_text(json.dumps(entries))
+    cmd = [
+        "cppcheck",
+        "--enable=all",
+        "--inline-suppr",
+        "--language=c++",
+        "--std=c++17",
+        "--xml",
+        f"--project={db_path}",
+        f"--file-filter={units[0]}",
+        f"--cppcheck-build-dir={BUILD_PATH / 'cppcheck'}",
+        "-j",
+        "2",
+    ]
+    fake_process.register(cmd, stderr="<results><errors></errors></results>")
+
+    result = CppcheckChecker(config, jobs=2, changed_files={Path("src/changed.hpp")}).check()
+
+    assert result == 0
+    assert fake_process.call_count(cmd) == 1
+
+
+def test_cppcheck_skipped_without_changed_files(config: Config, sources: None, fake_process: FakeProcess) -> None:
+    result = CppcheckChecker(config, changed_files=set()).check()
+
+    assert result == 0
+    assert not fake_process.calls
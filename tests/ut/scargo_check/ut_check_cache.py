@@ -0,0 +1,69 @@
+import json
+from pathlib import Path
+
+import pytest
+from pyfakefs.fake_filesystem import FakeFilesystem
+from pytest_mock import MockerFixture
+
+from scargo.commands.check import PragmaChecker, TodoChecker
+from scargo.config import Config
+from scargo.utils.check_cache import CHECK_CACHE_DIR
+from tests.ut.utils import get_log_data
+
+HEADER_PATH = Path("src/foo.hpp")
+
+
+@pytest.fixture
+def header(fs: FakeFilesystem) -> Path:
+    fs.create_file(HEADER_PATH, contents="int foo(void);\n")
+    return HEADER_PATH
+
+
+def test_cached_result_is_reused(
+    config: Config, header: Path, mocker: MockerFixture, caplog: pytest.LogCaptureFixture
+) -> None:
+    assert PragmaChecker(config, use_cache=True).check() == 1
+    assert Path(CHECK_CACHE_DIR, "pragma.json").is_file()
+
+    caplog.clear()
+    check_file = mocker.spy(PragmaChecker, "check_file")
+    assert PragmaChecker(config, use_cache=True).check() == 1
+    assert check_file.call_count == 0
+    assert ("WARNING", f"Missing '#pragma once' in {header}") in get_log_data(caplog.records)
+
+
+def test_cache_invalidated_by_file_change(config: Config, header: Path, mocker: MockerFixture) -> None:
+    assert PragmaChecker(config, use_cache=True).check() == 1
+
+    header.write_text("#pragma once\nint foo(void);\n")
+    check_file = mocker.spy(PragmaChecker, "check_file")
+    assert PragmaChecker(config, use_cache=True).check() == 0
+    assert check_file.call_count == 1
+
+
+def test_cache_invalidated_by_config_change(config: Config, header: Path) -> None:
+    header.write_text("// TODO\nint foo(void);\n")
+    assert TodoChecker(config, use_cache=True).check() == 1
+
+    config.check.todo.keywords = ["FIXME"]
+    assert TodoChecker(config, use_cache=True).check() == 0
+
+
+def test_cache_disabled(config: Config, header: Path, mocker: MockerFixture) -> None:
+    PragmaChecker(config).check()
+    check_file = mocker.spy(PragmaChecker, "check_file")
+    PragmaChecker(config).check()
+    assert check_file.call_count == 1
+    assert not CHECK_CACHE_DIR.exists()
+
+
+def test_partial_run_keeps_other_entries(config: Config, header: Path, fs: FakeFilesystem) -> None:
+    other_header = Path("src/bar.hpp")
+    fs.create_file(other_header, contents="int bar(void);\n")
+    assert PragmaChecker(config, use_cache=True).check() == 2
+
+    header.write_text("#pragma once\nint foo(void);\n")
+    assert PragmaChecker(config, use_cache=True, changed_files={header}).check() == 0
+
+    cached_files = json.loads(Path(CHECK_CACHE_DIR, "pragma.json").read_text())["files"]
+    assert set(cached_files) == {str(header), str(other_header)}
@@ -0,0 +1,186 @@
+import json
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import pytest
+from pyfakefs.fake_filesystem import FakeFilesystem
+from pytest_mock import MockerFixture
+
+from scargo.commands.check import TodoChecker
+from scargo.commands.check_base import CheckerFixer, CheckResult, find_files
+from scargo.commands.check_report import (
+    CheckerRun,
+    CheckOutputFormat,
+    Finding,
+    parse_clang_diagnostics,
+    parse_issue,
+    write_check_report,
+)
+from scargo.config import CheckConfig, Config
+
+PROJECT_ROOT = Path("/project")
+RUNS = [
+    CheckerRun(
+        "todo",
+        2,
+        1.5,
+        {PROJECT_ROOT / "src/foo.cpp": [Finding(3, "Found TODO"), Finding(7, "Found FIXME")]},
+        {PROJECT_ROOT / "src/foo.cpp": 0.25, PROJECT_ROOT / "src/bar.cpp": 1.0},
+    ),
+    CheckerRun(
+        "clang-tidy", 1, 0.5, {PROJECT_ROOT / "src/bar.cpp": [Finding(None, "clang-tidy found error")]}, {}, False
+    ),
+]
+
+
+@pytest.mark.parametrize(
+    "issue, expected",
+    [
+        (
+            "src/foo.cpp:7: error: Null pointer dereference: ptr [nullPointer]",
+            (Path("src/foo.cpp"), Finding(7, "Null pointer dereference: ptr [nullPointer]", "error")),
+        ),
+        (
+            "src/foo.cpp:2: warning: complex has 8 NLOC, 3 CCN",
+            (Path("src/foo.cpp"), Finding(2, "complex has 8 NLOC, 3 CCN", "warning")),
+        ),
+        (
+            "src/bar.cpp:12: style: The function 'bar' is never used.",
+            (Path("src/bar.cpp"), Finding(12, "The function 'bar' is never used.", "warning")),
+        ),
+        ("src/bar.cpp: something", (Path("src/bar.cpp"), Finding(None, "src/bar.cpp: something"))),
+    ],
+)
+def test_parse_issue(issue: str, expected: tuple) -> None:  # type: ignore[type-arg]
+    assert parse_issue(issue) == expected
+
+
+def test_parse_clang_diagnostics() -> None:
+    output = "\n".join(
+        [
+            "/project/src/foo.cpp:3:5: warning: use auto [modernize-use-auto]",
+            "    int x = 1;",
+            "    ^",
+            "/project/inc/foo.h:12:3: warning: use override [modernize-use-override]",
+            "src/foo.cpp:9:1: error: code should be clang-formatted [-Wclang-format-violations]",
+        ]
+    )
+    assert parse_clang_diagnostics(output) == [
+        (Path("/project/src/foo.cpp"), Finding(3, "use auto [modernize-use-auto]", "warning")),
+        (Path("/project/inc/foo.h"), Finding(12, "use override [modernize-use-override]", "warning")),
+        (Path("src/foo.cpp"), Finding(9, "code should be clang-formatted [-Wclang-format-violations]", "error")),
+    ]
+
+
+def test_write_json_report(tmp_path: Path) -> None:
+    output_path = tmp_path / "results.json"
+
+    write_check_report(output_path, CheckOutputFormat.JSON, PROJECT_ROOT, RUNS)
+
+    report = json.loads(output_path.read_text())
+    assert report["checkers"][0] == {
+        "name": "todo",
+        "problems": 2,
+        "duration": 1.5,
+        "execution_successful": True,
+        "file_durations": {"src/bar.cpp": 1.0, "src/foo.cpp": 0.25},
+    }
+    assert not report["checkers"][1]["execution_successful"]
+    assert list(report["checkers"][0]["file_durations"]) == ["src/bar.cpp", "src/foo.cpp"]
+    assert report["findings"] == [
+        {"checker": "todo", "file": "src/foo.cpp", "line": 3, "level": "warning", "message": "Found TODO"},
+        {"checker": "todo", "file": "src/foo.cpp", "line": 7, "level": "warning", "message": "Found FIXME"},
+        {
+            "checker": "clang-tidy",
+            "file": "src/bar.cpp",
+            "line": None,
+            "level": "warning",
+            "message": "clang-tidy found error",
+        },
+    ]
+
+
+def test_write_sarif_report(tmp_path: Path) -> None:
+    output_path = tmp_path / "results.sarif"
+
+    write_check_report(output_path, CheckOutputFormat.SARIF, PROJECT_ROOT, RUNS)
+
+    report = json.loads(output_path.read_text())
+    assert report["version"] == "2.1.0"
+    todo_run, tidy_run = report["runs"]
+    assert todo_run["tool"]["driver"]["name"] == "scargo todo"
+    assert todo_run["originalUriBaseIds"]["SRCROOT"]["uri"] == "file:///project/"
+    assert todo_run["invocations"][0]["properties"]["duration"] == 1.5
+    assert todo_run["invocations"][0]["executionSuccessful"]
+    assert not tidy_run["invocations"][0]["executionSuccessful"]
+    assert todo_run["results"][0] == {
+        "ruleId": "todo",
+        "level": "warning",
+        "message": {"text": "Found TODO"},
+        "locations": [
+            {
+                "physicalLocation": {
+                    "artifactLocation": {"uri": "src/foo.cpp", "uriBaseId": "SRCROOT"},
+                    "region": {"startLine": 3},
+                }
+            }
+        ],
+    }
+    assert "region" not in tidy_run["results"][0]["locations"][0]["physicalLocation"]
+
+
+@pytest.mark.parametrize("source_file", [["// TODO: one", "int x;", "// todo two"]], indirect=True)
+def test_checker_findings_and_durations(config: Config, source_file: Path, mock_find_files: MagicMock) -> None:
+    config.check.todo.keywords = ["TODO", "todo"]
+
+    checker = TodoChecker(config, use_cache=True)
+    assert checker.check() == 2
+
+    file_path = source_file.absolute()
+    expected = {file_path: [Finding(1, "Found TODO"), Finding(3, "Found todo")]}
+    assert checker.findings == expected
+    assert list(checker.file_durations) == [file_path]
+    assert checker.duration > 0
+
+    # Findings of cached results are restored
+    cached_checker = TodoChecker(config, use_cache=True)
+    assert cached_checker.check() == 2
+    assert cached_checker.findings == expected
+
+
+class DiagnosticChecker(CheckerFixer):
+    """Reports clang diagnostics of a header included by every checked unit"""
+
+    check_name = "diagnostic"
+    cacheable = True
+
+    def check_file(self, file_path: Path) -> CheckResult:
+        output = f"{file_path}:1:1: warning: unit\n/project/inc/foo.h:12:3: warning: header [check]\n"
+        self._add_diagnostic_findings(file_path, output, "diagnostic found error")
+        return CheckResult(1)
+
+    def get_check_config(self) -> CheckConfig:
+        return CheckConfig()
+
+
+def test_diagnostics_in_included_headers(config: Config, fs: FakeFilesystem, mocker: MockerFixture) -> None:
+    units = [Path("/project/src/a.cpp"), Path("/project/src/b.cpp")]
+    for unit in units:
+        fs.create_file(unit)
+    mocker.patch(f"{CheckerFixer.__module__}.{find_files.__name__}", return_value=units)
+    expected = {
+        units[0]: [Finding(1, "unit")],
+        Path("/project/inc/foo.h"): [Finding(12, "header [check]")],
+        units[1]: [Finding(1, "unit")],
+    }
+
+    checker = DiagnosticChecker(config, use_cache=True)
+    checker.check()
+    # Reported in the header, once for all units which include it
+    assert checker.findings == expected
+
+    cached_checker = DiagnosticChecker(config, use_cache=True)
+    cached_checker.check_file = MagicMock()  # type: ignore[method-assign]
+    cached_checker.check()
+    cached_checker.check_file.assert_not_called()
+    assert cached_checker.findings == expected
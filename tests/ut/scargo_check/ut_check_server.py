@@ -0,0 +1,126 @@
+import threading
+from pathlib import Path
+from typing import Generator, List, Optional, Set, Tuple, Type
+from unittest.mock import MagicMock
+
+import pytest
+
+from scargo.commands.check import ClangFormatChecker, PragmaChecker
+from scargo.commands.check_base import CheckerFixer
+from scargo.commands.check_report import CheckerRun, Finding
+from scargo.commands.check_server import CheckServer, request_check, serve_checks
+from scargo.utils.file_index import get_file_index
+
+
+class FakeRunCheckers:
+    def __init__(self) -> None:
+        self.calls: List[Tuple[List[str], Optional[Set[Path]]]] = []
+        # Raised by the next call
+        self.error: Optional[BaseException] = None
+
+    def __call__(
+        self, checker_classes: List[Type[CheckerFixer]], files: Optional[Set[Path]]
+    ) -> List[Tuple[CheckerFixer, int]]:
+        self.calls.append(([checker_class.check_name for checker_class in checker_classes], files))
+        if self.error:
+            error, self.error = self.error, None
+            raise error
+        results = []
+        for checker_class in checker_classes:
+            checker = MagicMock()
+            findings = {file_path: [Finding(1, "Missing '#pragma once'")] for file_path in files or ()}
+            checker.get_run.return_value = CheckerRun(checker_class.check_name, len(findings), 0.01, findings, {})
+            results.append((checker, len(findings)))
+        return results
+
+
+@pytest.fixture
+def run_checkers() -> FakeRunCheckers:
+    return FakeRunCheckers()
+
+
+@pytest.fixture
+def socket_path(tmp_path: Path) -> Path:
+    return tmp_path / "check.sock"
+
+
+@pytest.fixture
+def server(tmp_path: Path, socket_path: Path, run_checkers: FakeRunCheckers) -> Generator[CheckServer, None, None]:
+    (tmp_path / "src").mkdir()
+    (tmp_path / "src" / "foo.hpp").touch()
+    check_server = CheckServer(
+        socket_path, tmp_path, tmp_path / "src", [ClangFormatChecker, PragmaChecker], run_checkers
+    )
+    thread = threading.Thread(target=check_server.serve_forever, kwargs={"poll_interval": 0.01})
+    thread.start()
+    yield check_server
+    check_server.shutdown()
+    check_server.server_close()
+    thread.join()
+
+
+def test_check_request(server: CheckServer, socket_path: Path, run_checkers: FakeRunCheckers) -> None:
+    response = request_check(socket_path, [Path("src/foo.hpp")], timeout=5)
+
+    file_path = server.project_root / "src" / "foo.hpp"
+    assert run_checkers.calls == [(["clang-format", "pragma"], {file_path})]
+    assert response["problems"] == 2
+    assert [checker["name"] for checker in response["checkers"]] == ["clang-format", "pragma"]
+    assert response["findings"][1] == {
+        "checker": "pragma",
+        "file": "src/foo.hpp",
+        "line": 1,
+        "level": "warning",
+        "message": "Missing '#pragma once'",
+    }
+
+
+def test_check_request_selected_checkers(server: CheckServer, socket_path: Path, run_checkers: FakeRunCheckers) -> None:
+    request_check(socket_path, [server.project_root / "src" / "foo.hpp"], checkers=["pragma"], timeout=5)
+
+    assert run_checkers.calls[0][0] == ["pragma"]
+
+
+def test_check_request_without_checked_files(
+    server: CheckServer, socket_path: Path, run_checkers: FakeRunCheckers
+) -> None:
+    # Only headers are checked by pragma and clang-format takes only C/C++ sources
+    response = request_check(socket_path, [Path("README.md")], timeout=5)
+
+    assert not run_checkers.calls
+    assert response["problems"] == 0
+
+
+def test_invalid_check_requests(server: CheckServer, socket_path: Path) -> None:
+    assert request_check(socket_path, [Path("src/foo.hpp")], checkers=["unknown"], timeout=5) == {
+        "error": "Unknown checkers: unknown"
+    }
+
+
+@pytest.mark.parametrize("error", [SystemExit(1), FileNotFoundError("src/foo.hpp")])
+def test_check_request_failed_check(
+    error: BaseException, server: CheckServer, socket_path: Path, run_checkers: FakeRunCheckers
+) -> None:
+    run_checkers.error = error
+    response = request_check(socket_path, [Path("src/foo.hpp")], timeout=5)
+    assert "error" in response
+
+    # Server is still running
+    assert request_check(socket_path, [Path("src/foo.hpp")], timeout=5)["problems"] == 2
+
+
+def test_check_request_deleted_file(server: CheckServer, socket_path: Path) -> None:
+    file_path = server.project_root / "src" / "foo.hpp"
+    request_check(socket_path, [file_path], timeout=5)
+    file_path.unlink()
+
+    request_check(socket_path, [file_path], timeout=5)
+
+    assert file_path not in get_file_index(file_path.parent)
+
+
+def test_serve_checks_refuses_second_server(
+    server: CheckServer, socket_path: Path, tmp_path: Path, run_checkers: FakeRunCheckers
+) -> None:
+    with pytest.raises(SystemExit):
+        serve_checks(socket_path, tmp_path, tmp_path / "src", [PragmaChecker], run_checkers)
@@ -0,0 +1,76 @@
+from pathlib import Path
+from typing import List, Optional, Set, Tuple, Type
+from unittest.mock import MagicMock
+
+import pytest
+from pytest_mock import MockerFixture
+
+from scargo.commands import check_watch
+from scargo.commands.check import ClangFormatChecker, PragmaChecker
+from scargo.commands.check_base import CheckerFixer
+from scargo.commands.check_watch import watch_and_check
+from scargo.utils.file_watcher import FileChanges
+from tests.ut.utils import get_log_data
+
+HEADER = Path("/project/src/foo.hpp").absolute()
+SOURCE = Path("/project/src/foo.cpp").absolute()
+
+
+@pytest.fixture
+def mock_watcher(mocker: MockerFixture) -> MagicMock:
+    watcher = mocker.patch.object(check_watch, "FileWatcher").return_value
+    watcher.wait_for_changes.side_effect = [
+        FileChanges({SOURCE}, tree_changed=False),
+        FileChanges({HEADER}, tree_changed=False),
+        KeyboardInterrupt,
+    ]
+    return watcher  # type: ignore[no-any-return]
+
+
+def test_watch_and_check(mock_watcher: MagicMock, mocker: MockerFixture, caplog: pytest.LogCaptureFixture) -> None:
+    mocker.patch.object(Path, "exists", return_value=True)
+    runs: List[Tuple[List[str], Optional[Set[Path]]]] = []
+
+    def run_checkers(
+        checker_classes: List[Type[CheckerFixer]], files: Optional[Set[Path]]
+    ) -> List[Tuple[CheckerFixer, int]]:
+        runs.append(([checker_class.check_name for checker_class in checker_classes], files))
+        results = []
+        for checker_class in checker_classes:
+            checker = checker_class.__new__(checker_class)
+            checker.problems_by_file = {file_path: 0 for file_path in files or ()}
+            results.append((checker, 0))
+        return results
+
+    format_checker = ClangFormatChecker.__new__(ClangFormatChecker)
+    format_checker.problems_by_file = {SOURCE: 1, HEADER: 1}
+    pragma_checker = PragmaChecker.__new__(PragmaChecker)
+    pragma_checker.problems_by_file = {HEADER: 1}
+
+    watch_and_check(Path("src"), [(format_checker, 2), (pragma_checker, 1)], run_checkers)
+
+    # Pragma check looks only at headers
+    assert runs == [(["clang-format"], {SOURCE}), (["clang-format", "pragma"], {HEADER})]
+    assert mock_watcher.close.called
+    log_data = get_log_data(caplog.records)
+    assert ("INFO", "clang-format: 2 problems found") in log_data
+    assert ("INFO", "clang-format: 1 problems found (-1)") in log_data
+    assert ("INFO", "clang-format: 0 problems found (-1)") in log_data
+    assert ("INFO", "pragma: 0 problems found (-1)") in log_data
+    assert log_data[-1] == ("INFO", "Stopped watching.")
+
+
+def test_watch_and_check_removed_directory(
+    mocker: MockerFixture, tmp_path: Path, caplog: pytest.LogCaptureFixture
+) -> None:
+    watcher = mocker.patch.object(check_watch, "FileWatcher").return_value
+    removed_dir = tmp_path / "src" / "lib"
+    watcher.wait_for_changes.side_effect = [FileChanges({removed_dir}, tree_changed=True), KeyboardInterrupt]
+    run_checkers = MagicMock()
+    format_checker = ClangFormatChecker.__new__(ClangFormatChecker)
+    format_checker.problems_by_file = {removed_dir / "a.cpp": 1, removed_dir / "b" / "b.hpp": 2, tmp_path / "c.cpp": 1}
+
+    watch_and_check(tmp_path, [(format_checker, 4)], run_checkers)
+
+    run_checkers.assert_not_called()
+    assert ("INFO", "clang-format: 1 problems found (-3)") in get_log_data(caplog.records)
@@ -1,11 +1,14 @@
+import time
 from pathlib import Path
 from typing import List, NamedTuple, Tuple, Type
 from unittest.mock import MagicMock
 
 import pytest
+from pytest_mock import MockerFixture
 
-from scargo.commands.check import CheckerFixer, CheckResult
+from scargo.commands.check_base import CheckerFixer, CheckResult, find_files
 from scargo.config import CheckConfig, Config
+from scargo.logger import get_logger
 from tests.ut.utils import get_log_data
 
 
@@ -107,3 +110,36 @@ class TestCheckerFixer:
             ("ERROR", "failing check fail!"),
         ]
         assert get_log_data(caplog.records) == expected
+
+
+def test_check_files_parallel_keeps_output_grouped(
+    config: Config, caplog: pytest.LogCaptureFixture, mocker: MockerFixture
+) -> None:
+    file_paths = [Path(f"foo/file_{index}.hpp") for index in range(8)]
+    mocker.patch(f"{CheckerFixer.__module__}.{find_files.__name__}", return_value=file_paths)
+
+    class SlowChecker(CheckerFixer):
+        check_name = "slow"
+
+        def check_file(self, file_path: Path) -> CheckResult:
+            logger = get_logger()
+            logger.info(f"Begin {file_path}")
+            # Files checked first finish last, so ungrouped output would be reordered
+            time.sleep(0.01 * (len(file_paths) - file_paths.index(file_path)))
+            logger.info(f"End {file_path}")
+            return CheckResult(1)
+
+        def get_check_config(self) -> CheckConfig:
+            return CheckConfig()
+
+    result = SlowChecker(config, jobs=4).check()
+
+    assert result == len(file_paths)
+    expected = [("INFO", "Starting slow check...")]
+    for file_path in file_paths:
+        expected += [("INFO", f"Begin {file_path}"), ("INFO", f"End {file_path}")]
+    expected += [
+        ("INFO", f"Finished slow check. Found problems in {len(file_paths)} files."),
+        ("ERROR", "slow check fail!"),
+    ]
+    assert get_log_data(caplog.records) == expected
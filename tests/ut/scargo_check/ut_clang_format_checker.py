@@ -1,10 +1,14 @@
+from pathlib import Path
 from typing import Tuple
 from unittest.mock import MagicMock
 
 import pytest
+from pyfakefs.fake_filesystem import FakeFilesystem
+from pytest_mock import MockerFixture
 from pytest_subprocess import FakeProcess
 
 from scargo.commands.check import ClangFormatChecker
+from scargo.commands.check_base import CheckerFixer, find_files
 from scargo.config import Config
 from tests.ut.utils import get_log_data
 
@@ -16,7 +20,7 @@ CLANG_FORMAT_COMMAND = [
     "foo/bar.hpp",
 ]
 
-CLANG_FORMAT_FIX_COMMAND = ["/usr/bin/clang-format", "-style=file", "-i", "foo/bar.hpp"]
+CLANG_FORMAT_FIX_COMMAND = ["/usr/bin/clang-format", "--style=file", "foo/bar.hpp"]
 
 CLANG_FORMAT_ERROR_OUTPUT = "clang-format error!"
 
@@ -54,9 +58,101 @@ def test_check_clang_format_fail(
     assert expected_message in get_log_data(caplog.records)
 
 
-def test_check_clang_format_fix(config: Config, mock_find_files: MagicMock, fake_process: FakeProcess) -> None:
+def test_check_clang_format_fix(
+    config: Config, fs: FakeFilesystem, mock_find_files: MagicMock, fake_process: FakeProcess
+) -> None:
+    fs.create_file("foo/bar.hpp", contents="int  x;\n")
     fake_process.register(CLANG_FORMAT_COMMAND, stdout=CLANG_FORMAT_ERROR_OUTPUT, returncode=1)
-    fake_process.register(CLANG_FORMAT_FIX_COMMAND)
+    fake_process.register(CLANG_FORMAT_FIX_COMMAND, stdout="int x;\n")
     result = ClangFormatChecker(config, fix_errors=True).check()
     assert result == 1
     assert fake_process.call_count(CLANG_FORMAT_FIX_COMMAND) == 1
+    assert Path("foo/bar.hpp").read_text() == "int x;\n"
+    assert list(Path("foo").iterdir()) == [Path("foo/bar.hpp")]
+
+
+def test_check_clang_format_changed_lines(
+    config: Config, fs: FakeFilesystem, mock_find_files: MagicMock, fake_process: FakeProcess
+) -> None:
+    fs.create_file("foo/bar.hpp", contents="int  x;\nint  y;\nint  z;\n")
+    lines_args = ["--lines=1:1", "--lines=3:3"]
+    check_command = [*CLANG_FORMAT_COMMAND[:-1], *lines_args, "foo/bar.hpp"]
+    fix_command = [*CLANG_FORMAT_FIX_COMMAND[:-1], *lines_args, "foo/bar.hpp"]
+    fake_process.register(check_command, stdout=CLANG_FORMAT_ERROR_OUTPUT, returncode=1)
+    fake_process.register(fix_command, stdout="int x;\nint  y;\nint z;\n")
+    changed_lines = {Path("foo/bar.hpp").absolute(): [(1, 1), (3, 3)]}
+    result = ClangFormatChecker(config, fix_errors=True, changed_lines=changed_lines).check()
+    assert result == 1
+    assert Path("foo/bar.hpp").read_text() == "int x;\nint  y;\nint z;\n"
+
+
+BATCH_FILES = [Path("foo/bar.hpp"), Path("foo/baz.cpp")]
+
+CLANG_FORMAT_BATCH_COMMAND = [*CLANG_FORMAT_COMMAND[:-1], *map(str, BATCH_FILES)]
+
+CLANG_FORMAT_BATCH_ERROR_OUTPUT = """\
+foo/baz.cpp:3:10: error: code should be clang-formatted [-Wclang-format-violations]
+int  x;
+   ^
+"""
+
+
+@pytest.fixture
+def mock_find_batch_files(mocker: MockerFixture) -> MagicMock:
+    return mocker.patch(f"{CheckerFixer.__module__}.{find_files.__name__}", return_value=BATCH_FILES)
+
+
+def test_check_clang_format_batch_pass(
+    config: Config, mock_find_batch_files: MagicMock, fake_process: FakeProcess
+) -> None:
+    fake_process.register(CLANG_FORMAT_BATCH_COMMAND)
+    checker = ClangFormatChecker(config, jobs=1)
+    result = checker.check()
+    assert result == 0
+    assert fake_process.call_count(CLANG_FORMAT_BATCH_COMMAND) == 1
+    # Time of a batch is not split between its files
+    assert not checker.file_durations
+
+
+@pytest.mark.parametrize(
+    ["verbose", "expected_message"],
+    [
+        (False, ("WARNING", "clang-format found error in file foo/baz.cpp")),
+        (True, ("INFO", CLANG_FORMAT_BATCH_ERROR_OUTPUT.rstrip("\n"))),
+    ],
+)
+def test_check_clang_format_batch_fail(
+    verbose: bool,
+    expected_message: Tuple[str, str],
+    caplog: pytest.LogCaptureFixture,
+    config: Config,
+    mock_find_batch_files: MagicMock,
+    fake_process: FakeProcess,
+) -> None:
+    fake_process.register(CLANG_FORMAT_BATCH_COMMAND, stderr=CLANG_FORMAT_BATCH_ERROR_OUTPUT, returncode=1)
+    result = ClangFormatChecker(config, verbose=verbose, jobs=1).check()
+    assert result == 1
+    assert expected_message in get_log_data(caplog.records)
+    assert "foo/bar.hpp" not in "".join(msg for level, msg in get_log_data(caplog.records) if level == "WARNING")
+
+
+def test_check_clang_format_batch_unattributed_failure(
+    config: Config, mock_find_batch_files: MagicMock, fake_process: FakeProcess
+) -> None:
+    fake_process.register(CLANG_FORMAT_BATCH_COMMAND, stderr="Invalid style\n", returncode=1)
+    for file_path in BATCH_FILES:
+        fake_process.register([*CLANG_FORMAT_COMMAND[:-1], str(file_path)], returncode=int(file_path.suffix == ".cpp"))
+    result = ClangFormatChecker(config, jobs=1).check()
+    assert result == 1
+
+
+def test_check_clang_format_batch_fix(
+    config: Config, fs: FakeFilesystem, mock_find_batch_files: MagicMock, fake_process: FakeProcess
+) -> None:
+    error_output = CLANG_FORMAT_BATCH_ERROR_OUTPUT + CLANG_FORMAT_BATCH_ERROR_OUTPUT.replace("baz.cpp", "bar.hpp")
+    fake_process.register(CLANG_FORMAT_BATCH_COMMAND, stderr=error_output, returncode=1)
+    fake_process.register([*CLANG_FORMAT_FIX_COMMAND[:-1], "-i", *map(str, BATCH_FILES)])
+    result = ClangFormatChecker(config, fix_errors=True, jobs=1).check()
+    assert result == 2
+    # Fixed with one clang-format process
+    assert fake_process.call_count([*CLANG_FORMAT_FIX_COMMAND[:-1], "-i", *map(str, BATCH_FILES)]) == 1
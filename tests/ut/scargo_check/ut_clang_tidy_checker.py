@@ -1,11 +1,14 @@
+import json
 from pathlib import Path
 from typing import Tuple
 from unittest.mock import MagicMock
 
 import pytest
+from pytest_mock import MockerFixture
 from pytest_subprocess import FakeProcess
 
 from scargo.commands.check import ClangTidyChecker
+from scargo.commands.check_base import find_files
 from scargo.config import Config
 from scargo.utils.conan_utils import DEFAULT_PROFILES
 from tests.ut.utils import get_log_data
@@ -83,5 +86,82 @@ def test_check_clang_tidy_fail_wrong_dirs(
         stdout=CLANG_TIDY_ERROR_OUTPUT,
         occurrences=0,
     )
-    with pytest.raises(SystemExit):
-        ClangTidyChecker(config).check()
+    # Fails like a check with problems instead of exiting, other checkers run in the same pool
+    assert ClangTidyChecker(config).check() == 1
+    assert ("ERROR", "clang-tidy check fail!") in get_log_data(caplog.records)
+
+
+def test_check_clang_tidy_cache(
+    config: Config,
+    fake_process: FakeProcess,
+    mocker: MockerFixture,
+) -> None:
+    build_path = Path("build/x86/Debug")
+    build_path.mkdir(parents=True)
+    Path(build_path, "compile_commands.json").write_text("[]")
+    header = Path("src/foo.hpp")
+    header.parent.mkdir()
+    header.write_text('#include "bar.hpp"\n')
+    included_header = Path("src/bar.hpp")
+    included_header.write_text("int bar();\n")
+    mocker.patch(f"{find_files.__module__}.{find_files.__name__}", return_value=[header])
+    fake_process.keep_last_process(True)
+    fake_process.register(["clang-tidy", "--version"], stdout="clang-tidy 14")
+    fake_process.register(["clang-tidy", str(header), "-p", build_path])
+
+    assert ClangTidyChecker(config, use_cache=True).check() == 0
+    assert ClangTidyChecker(config, use_cache=True).check() == 0
+    assert fake_process.call_count(["clang-tidy", str(header), "-p", build_path]) == 1
+
+    included_header.write_text("int bar(int);\n")
+    assert ClangTidyChecker(config, use_cache=True).check() == 0
+    assert fake_process.call_count(["clang-tidy", str(header), "-p", build_path]) == 2
+
+
+RUN_CLANG_TIDY_OUTPUT = """\
+clang-tidy -p=build/x86/Debug /src/foo.cpp
+/src/foo.cpp:3:5: error: use of undeclared identifier 'x' [clang-diagnostic-error]
+    x = 1;
+    ^
+1 error generated.
+clang-tidy -p=build/x86/Debug /src/bar.cpp
+/src/bar.cpp:1:5: warning: variable 'y' is not initialized [cppcoreguidelines-init-variables]
+1 warning generated.
+"""
+
+
+@pytest.mark.parametrize(
+    ["verbose", "expected_message"],
+    [
+        (False, ("WARNING", "clang-tidy found error in file src/foo.cpp")),
+        (True, ("INFO", "\n".join(RUN_CLANG_TIDY_OUTPUT.splitlines()[:5]))),
+    ],
+)
+def test_check_clang_tidy_translation_units(
+    verbose: bool,
+    expected_message: Tuple[str, str],
+    caplog: pytest.LogCaptureFixture,
+    config: Config,
+    fake_process: FakeProcess,
+    mocker: MockerFixture,
+) -> None:
+    build_path = Path("build/x86/Debug")
+    build_path.mkdir(parents=True)
+    units = [Path("src/foo.cpp"), Path("src/bar.cpp")]
+    header = Path("src/foo.hpp")
+    Path("src").mkdir()
+    for file_path in [*units, header]:
+        file_path.touch()
+    compile_db = [{"directory": "/", "file": str(unit), "command": f"c++ -c {unit}"} for unit in units]
+    Path(build_path, "compile_commands.json").write_text(json.dumps(compile_db))
+    mocker.patch(f"{find_files.__module__}.{find_files.__name__}", return_value=[*units, header])
+    run_clang_tidy_cmd = ["run-clang-tidy", "-p", str(build_path), "-j", "2", r"^/src/foo\.cpp$", r"^/src/bar\.cpp$"]
+    fake_process.register(run_clang_tidy_cmd, stdout=RUN_CLANG_TIDY_OUTPUT, returncode=1)
+    fake_process.register(["clang-tidy", str(header), "-p", build_path])
+
+    result = ClangTidyChecker(config, verbose=verbose, jobs=2).check()
+
+    assert result == 1
+    assert fake_process.call_count(run_clang_tidy_cmd) == 1
+    assert expected_message in get_log_data(caplog.records)
+    assert not any("bar.cpp" in msg for level, msg in get_log_data(caplog.records) if level == "WARNING")
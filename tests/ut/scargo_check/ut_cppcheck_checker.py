@@ -1,4 +1,8 @@
+import json
+from pathlib import Path
+
 import pytest
+from pyfakefs.fake_filesystem import FakeFilesystem
 from pytest_subprocess import FakeProcess
 
 from scargo.commands.check import CppcheckChecker
@@ -11,13 +15,33 @@ CPPCHECK_COMMAND = [
     "--inline-suppr",
     "--language=c++",
     "--std=c++17",
+    "--xml",
+    "--cppcheck-build-dir=build/cppcheck",
+    "-j",
+    "2",
 ]
 
+CPPCHECK_XML = """<?xml version="1.0" encoding="UTF-8"?>
+<results version="2">
+    <cppcheck version="2.13.0"/>
+    <errors>
+        <error id="nullPointer" severity="error" msg="Null pointer dereference: ptr" verbose="Null pointer dereference">
+            <location file="src/foo.cpp" line="7" column="5" info="Null pointer dereference"/>
+            <location file="src/foo.cpp" line="3" column="10" info="Assignment"/>
+        </error>
+        <error id="unusedFunction" severity="style" msg="The function 'bar' is never used." verbose="">
+            <location file="src/bar.cpp" line="12" column="0"/>
+        </error>
+        <error id="checkersReport" severity="information" msg="Active checkers: 106/592" verbose=""/>
+    </errors>
+</results>
+"""
+
 
 def test_cppcheck_checker_pass(config: Config, fake_process: FakeProcess, caplog: pytest.LogCaptureFixture) -> None:
-    fake_process.register(CPPCHECK_COMMAND)
+    fake_process.register(CPPCHECK_COMMAND, stderr="<results><errors></errors></results>")
 
-    result = CppcheckChecker(config=config).check()
+    result = CppcheckChecker(config=config, jobs=2).check()
 
     assert result == 0
     assert fake_process.call_count(CPPCHECK_COMMAND) == 1
@@ -29,10 +53,105 @@ def test_cppcheck_checker_pass(config: Config, fake_process: FakeProcess, caplog
 def test_cppcheck_checker_fail(config: Config, fake_process: FakeProcess, caplog: pytest.LogCaptureFixture) -> None:
     fake_process.register(CPPCHECK_COMMAND, returncode=1)
 
-    result = CppcheckChecker(config=config).check()
-    assert result == 0
+    checker = CppcheckChecker(config=config, jobs=2)
+    result = checker.check()
+    assert result == 1
+    assert not checker.execution_successful
 
     expected_messages = [
         "cppcheck check failed!",
     ]
     assert log_contains(get_log_data(caplog.records), expected_messages)
+    assert "No problems found" not in caplog.text
+
+
+def test_cppcheck_checker_unparseable_output(
+    config: Config, fake_process: FakeProcess, caplog: pytest.LogCaptureFixture
+) -> None:
+    fake_process.register(CPPCHECK_COMMAND, stderr="<results><errors><error id=")
+
+    result = CppcheckChecker(config=config, jobs=2).check()
+
+    assert result == 1
+    assert "Unable to parse cppcheck output" in caplog.text
+    assert "No problems found" not in caplog.text
+
+
+def test_cppcheck_checker_xml_issues(
+    config: Config, fake_process: FakeProcess, caplog: pytest.LogCaptureFixture
+) -> None:
+    fake_process.register(CPPCHECK_COMMAND, stderr=CPPCHECK_XML)
+
+    checker = CppcheckChecker(config=config, jobs=2)
+    result = checker.check()
+
+    assert result == 2
+    expected_messages = [
+        "src/foo.cpp:7: error: Null pointer dereference: ptr [nullPointer]",
+        "src/bar.cpp:12: style: The function 'bar' is never used. [unusedFunction]",
+    ]
+    assert log_contains(get_log_data(caplog.records), expected_messages)
+    assert "Active checkers" not in caplog.text
+
+
+def test_cppcheck_checker_uses_compile_db(config: Config, fs: FakeFilesystem, fake_process: FakeProcess) -> None:
+    config.check.cppcheck.directories = ["src"]
+    build_path = Path("build/x86/Debug")
+    db_path = build_path / "compile_commands.json"
+    entry = {"directory": str(build_path.absolute()), "file": str(Path("src/foo.cpp").absolute()), "command": "c++"}
+    fs.create_file(db_path, contents=json.dumps([entry]))
+    cmd = [
+        *CPPCHECK_COMMAND[:6],
+        f"--project={db_path}",
+        f"--file-filter={Path('src').absolute()}/*",
+        f"--cppcheck-build-dir={build_path / 'cppcheck'}",
+        "-j",
+        "2",
+    ]
+    fake_process.register(cmd, stderr="<results><errors></errors></results>")
+
+    result = CppcheckChecker(config=config, jobs=2).check()
+
+    assert result == 0
+    assert fake_process.call_count(cmd) == 1
+    assert (build_path / "cppcheck").is_dir()
+
+
+def test_cppcheck_checker_skips_directories_without_units(
+    config: Config, fs: FakeFilesystem, fake_process: FakeProcess, caplog: pytest.LogCaptureFixture
+) -> None:
+    config.check.cppcheck.directories = ["main", "src"]
+    build_path = Path("build/x86/Debug")
+    db_path = build_path / "compile_commands.json"
+    entry = {"directory": str(build_path.absolute()), "file": str(Path("src/foo.cpp").absolute()), "command": "c++"}
+    fs.create_file(db_path, contents=json.dumps([entry]))
+    cmd = [
+        *CPPCHECK_COMMAND[:6],
+        f"--project={db_path}",
+        f"--file-filter={Path('src').absolute()}/*",
+        f"--cppcheck-build-dir={build_path / 'cppcheck'}",
+        "-j",
+        "2",
+    ]
+    fake_process.register(cmd, stderr="<results><errors></errors></results>")
+
+    result = CppcheckChecker(config=config, jobs=2).check()
+
+    assert result == 0
+    assert fake_process.call_count(cmd) == 1
+    assert "No translation units in main, skipping it" in caplog.text
+
+
+def test_cppcheck_checker_no_directories_with_units(
+    config: Config, fs: FakeFilesystem, fake_process: FakeProcess, caplog: pytest.LogCaptureFixture
+) -> None:
+    config.check.cppcheck.directories = ["main"]
+    build_path = Path("build/x86/Debug")
+    entry = {"directory": str(build_path.absolute()), "file": str(Path("src/foo.cpp").absolute()), "command": "c++"}
+    fs.create_file(build_path / "compile_commands.json", contents=json.dumps([entry]))
+
+    result = CppcheckChecker(config=config, jobs=2).check()
+
+    assert result == 0
+    assert fake_process.call_count(["cppcheck", fake_process.any()]) == 0
+    assert "No translation units to check." in caplog.text
@@ -1,60 +1,105 @@
 from pathlib import Path
-from unittest.mock import MagicMock
+from typing import List
 
 import pytest
-from pytest_mock import MockerFixture
+from pyfakefs.fake_filesystem import FakeFilesystem
 
-from scargo.commands.check import find_files
+from scargo.commands.check_base import find_files
+from scargo.utils.file_index import ExcludeMatcher, get_file_index
 from tests.ut.utils import get_log_data
 
-
-@pytest.mark.parametrize("mock_path_is_file", [True], indirect=True)
-def test_find_files(
-    mock_path_rglob: MagicMock,
-    mock_path_is_file: MagicMock,
-    caplog: pytest.LogCaptureFixture,
-) -> None:
-    result = find_files(Path(), glob_patterns=["*.hpp"], exclude_patterns=[])
-    assert list(result) == [Path("foo/bar.hpp")]
-    assert caplog.records == []
-
-
-@pytest.mark.parametrize("mock_path_is_file", [False], indirect=True)
-def test_find_files__exclude_non_files(
-    mock_path_rglob: MagicMock,
-    mock_path_is_file: MagicMock,
-    caplog: pytest.LogCaptureFixture,
-) -> None:
-    result = find_files(Path(), glob_patterns=["*.hpp"], exclude_patterns=[])
-    assert list(result) == []
-    assert caplog.records == []
-
-
-@pytest.mark.parametrize("mock_path_is_file", [True], indirect=True)
-def test_find_files__exclude_patterns(
-    mock_path_rglob: MagicMock,
-    mock_path_is_file: MagicMock,
-    mock_glob_glob: MagicMock,
-    caplog: pytest.LogCaptureFixture,
-) -> None:
-    result = find_files(Path(), glob_patterns=["*.hpp"], exclude_patterns=["foo/*"])
-    assert list(result) == []
-    assert get_log_data(caplog.records) == [("INFO", "Skipping foo/bar.hpp")]
-
-
-# Fixtures
+FILES = [
+    "src/main.cpp",
+    "src/main.hpp",
+    "src/bsp/board.c",
+    "src/bsp/board.h",
+    "src/bsp/vendor/hal.c",
+    "src/generated/proto.pb.cc",
+    "src/lib/generated/api.hpp",
+    "src/readme.md",
+]
 
 
 @pytest.fixture
-def mock_path_rglob(mocker: MockerFixture) -> MagicMock:
-    return mocker.patch.object(Path, "rglob", return_value=[Path("foo/bar.hpp")])
+def files(fs: FakeFilesystem) -> None:
+    for file_path in FILES:
+        fs.create_file(file_path)
+    fs.create_dir("src/empty")
 
 
-@pytest.fixture
-def mock_path_is_file(request: pytest.FixtureRequest, mocker: MockerFixture) -> MagicMock:
-    return mocker.patch.object(Path, "is_file", return_value=request.param)
+def test_find_files(files: None, caplog: pytest.LogCaptureFixture) -> None:
+    result = find_files(Path("src"), glob_patterns=["*.hpp", "*.h"], exclude_patterns=[])
+    assert result == [Path("src/main.hpp"), Path("src/bsp/board.h"), Path("src/lib/generated/api.hpp")]
+    assert caplog.records == []
 
 
-@pytest.fixture
-def mock_glob_glob(mocker: MockerFixture) -> MagicMock:
-    return mocker.patch(f"{find_files.__module__}.glob.glob", return_value=["foo/bar.hpp"])
+@pytest.mark.parametrize(
+    ["exclude_patterns", "expected_files"],
+    [
+        (["src/bsp"], ["src/main.cpp", "src/main.hpp", "src/generated/proto.pb.cc", "src/lib/generated/api.hpp"]),
+        (["generated/"], ["src/main.cpp", "src/main.hpp", "src/bsp/board.c", "src/bsp/vendor/hal.c"]),
+        (
+            ["src/generated/"],
+            ["src/main.cpp", "src/main.hpp", "src/bsp/board.c", "src/bsp/vendor/hal.c", "src/lib/generated/api.hpp"],
+        ),
+        (["*.c"], ["src/main.cpp", "src/main.hpp", "src/generated/proto.pb.cc", "src/lib/generated/api.hpp"]),
+        (["src/**/*.c", "src/*.cpp"], ["src/main.hpp", "src/generated/proto.pb.cc", "src/lib/generated/api.hpp"]),
+        (
+            ["src/bsp", "!src/bsp/vendor"],
+            ["src/main.cpp", "src/main.hpp", "src/generated/proto.pb.cc", "src/lib/generated/api.hpp"],
+        ),
+        (
+            ["*.c", "!hal.c"],
+            [
+                "src/main.cpp",
+                "src/main.hpp",
+                "src/bsp/vendor/hal.c",
+                "src/generated/proto.pb.cc",
+                "src/lib/generated/api.hpp",
+            ],
+        ),
+        (["src"], []),
+    ],
+)
+def test_find_files__exclude_patterns(files: None, exclude_patterns: List[str], expected_files: List[str]) -> None:
+    result = find_files(Path("src"), glob_patterns=["*.c", "*.cpp", "*.cc", "*.hpp"], exclude_patterns=exclude_patterns)
+    assert result == [Path(file_path) for file_path in expected_files]
+
+
+def test_find_files__log_skipped(files: None, caplog: pytest.LogCaptureFixture) -> None:
+    find_files(Path("src"), glob_patterns=["*.c", "*.cpp"], exclude_patterns=["src/bsp", "main.cpp"])
+    assert get_log_data(caplog.records) == [("INFO", "Skipping src/main.cpp"), ("INFO", "Skipping src/bsp")]
+
+
+def test_file_index_is_shared(files: None) -> None:
+    index = get_file_index(Path("src"))
+    assert get_file_index(Path("src").absolute()) is index
+    assert len(index) == len(FILES)
+
+
+@pytest.mark.parametrize(
+    ["pattern", "path", "is_dir", "expected"],
+    [
+        ("build", "a/build", True, True),
+        ("build", "a/build/x.c", False, True),
+        ("build/", "a/build", False, False),
+        ("a/*.c", "a/b/x.c", False, False),
+        ("a/**/x.c", "a/x.c", False, True),
+        ("a/**/x.c", "a/b/c/x.c", False, True),
+        ("x[0-9].c", "x1.c", False, True),
+        ("x[!0-9].c", "x1.c", False, False),
+        ("# comment", "# comment", False, False),
+    ],
+)
+def test_exclude_matcher(pattern: str, path: str, is_dir: bool, expected: bool) -> None:
+    assert ExcludeMatcher([pattern]).matches(path, is_dir) == expected
+
+
+def test_file_index_contains(files: None) -> None:
+    file_index = get_file_index(Path("src"))
+
+    assert Path("src/bsp/board.c") in file_index
+    assert Path("src/bsp/board.c").absolute() in file_index
+    assert Path("src/bsp/missing.c") not in file_index
+    assert Path("other/main.cpp") not in file_index
+    assert len(file_index) == len(FILES)
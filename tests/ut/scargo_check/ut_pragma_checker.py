@@ -1,4 +1,5 @@
-from unittest.mock import MagicMock, call
+from pathlib import Path
+from unittest.mock import MagicMock
 
 import pytest
 
@@ -17,47 +18,44 @@ FILE_CONTENTS_WITH_PRAGMA = [
 
 
 @pytest.mark.parametrize(
-    "mock_file_contents",
+    "source_file",
     [FILE_CONTENTS_WITH_PRAGMA],
     indirect=True,
 )
 def test_check_pragma_pass(
-    mock_file_contents: MagicMock,
+    source_file: Path,
+    mock_find_files: MagicMock,
     caplog: pytest.LogCaptureFixture,
     config: Config,
-    mock_find_files: MagicMock,
 ) -> None:
     result = PragmaChecker(config).check()
     assert result == 0
-    assert ("WARNING", "Missing pragma in foo/bar.hpp") not in get_log_data(caplog.records)
+    assert ("WARNING", f"Missing '#pragma once' in {source_file}") not in get_log_data(caplog.records)
 
 
 @pytest.mark.parametrize(
-    "mock_file_contents",
+    "source_file",
     [FILE_CONTENTS_WITHOUT_PRAGMA],
     indirect=True,
 )
 def test_check_pragma_fail(
-    mock_file_contents: MagicMock,
+    source_file: Path,
+    mock_find_files: MagicMock,
     caplog: pytest.LogCaptureFixture,
     config: Config,
-    mock_find_files: MagicMock,
 ) -> None:
     result = PragmaChecker(config).check()
     assert result == 1
-    assert ("WARNING", "Missing '#pragma once' in foo/bar.hpp") in get_log_data(caplog.records)
+    assert ("WARNING", f"Missing '#pragma once' in {source_file}") in get_log_data(caplog.records)
 
 
 @pytest.mark.parametrize(
-    ["mock_file_contents"],
-    [(FILE_CONTENTS_WITHOUT_PRAGMA,)],
+    "source_file",
+    [FILE_CONTENTS_WITHOUT_PRAGMA],
     indirect=True,
 )
-def test_check_pragma_fix(mock_file_contents: MagicMock, config: Config, mock_find_files: MagicMock) -> None:
+def test_check_pragma_fix(source_file: Path, mock_find_files: MagicMock, config: Config) -> None:
     result = PragmaChecker(config, fix_errors=True).check()
     assert result == 1
-    assert mock_file_contents().write.mock_calls == [
-        call("#pragma once\n"),
-        call("\n"),
-        call("int main(void);"),
-    ]
+    assert source_file.read_text() == "#pragma once\n\nint main(void);"
+    assert PragmaChecker(config).check() == 0
@@ -1,3 +1,5 @@
+import json
+import time
 from typing import Dict
 from unittest.mock import MagicMock
 
@@ -6,7 +8,9 @@ from pytest_mock import MockerFixture
 
 from scargo.commands import check
 from scargo.commands.check import scargo_check
+from scargo.commands.check_report import CheckerRun, CheckOutputFormat
 from scargo.config import Config
+from tests.ut.utils import get_log_data
 
 CHECKERS = [
     check.PragmaChecker,
@@ -107,3 +111,60 @@ def test_scargo_check_default(
     assert mock_checkers["cyclomatic"]().check.call_count == 1
     assert mock_checkers["pragma"]().check.call_count == 1
     assert mock_checkers["todo"]().check.call_count == 1
+
+
+def test_scargo_check_summary_order(
+    mock_checkers: Dict[str, MagicMock],
+    mock_prepare_config: MagicMock,
+    caplog: pytest.LogCaptureFixture,
+) -> None:
+    def slow_check() -> int:
+        time.sleep(0.05)
+        return 2
+
+    mock_checkers["clang-format"]().check.side_effect = slow_check
+    mock_checkers["todo"]().check.return_value = 1
+
+    with pytest.raises(SystemExit):
+        scargo_check(
+            clang_format=True,
+            clang_tidy=False,
+            copy_right=False,
+            cppcheck=False,
+            cyclomatic=False,
+            pragma=False,
+            todo=True,
+            verbose=False,
+            jobs=2,
+        )
+
+    assert get_log_data(caplog.records)[-3:] == [
+        ("INFO", "Summary:"),
+        ("INFO", "clang-format: 2 problems found"),
+        ("INFO", "todo: 1 problems found"),
+    ]
+
+
+def test_scargo_check_output_format(
+    mock_checkers: Dict[str, MagicMock],
+    mock_prepare_config: MagicMock,
+    config: Config,
+) -> None:
+    mock_checkers["todo"]().get_run.return_value = CheckerRun("todo", 0, 0.1, {}, {})
+    scargo_check(
+        clang_format=False,
+        clang_tidy=False,
+        copy_right=False,
+        cppcheck=False,
+        cyclomatic=False,
+        pragma=False,
+        todo=True,
+        verbose=False,
+        output_format=CheckOutputFormat.JSON,
+    )
+
+    report = json.loads((config.project_root / "build/scargo_check.json").read_text())
+    assert report["checkers"] == [
+        {"name": "todo", "problems": 0, "duration": 0.1, "execution_successful": True, "file_durations": {}}
+    ]
+    assert report["findings"] == []
@@ -1,40 +1,36 @@
+from pathlib import Path
 from unittest.mock import MagicMock
 
 import pytest
-from pytest_mock import MockerFixture
 
 from scargo.commands.check import TodoChecker
 from scargo.config import Config
-from scargo.utils.clang_utils import get_comment_lines
 from tests.ut.utils import get_log_data
 
-COMMENT_LINES_WITHOUT_TODO = [
-    (1, "// Copyright Mastodon 2023"),
+FILE_CONTENTS_WITHOUT_TODO = [
+    "// Copyright Mastodon 2023",
+    'const char* text = "// TODO in a string is not a comment";',
 ]
 
-COMMENT_LINES_WITH_TODO = [
-    (1, "// TODO add more stuff"),
+FILE_CONTENTS_WITH_TODO = [
+    "// Copyright Mastodon 2023",
+    "int main(void); // TODO add more stuff",
+    "/*",
+    " * todo: document",
+    " */",
 ]
 
 
-@pytest.fixture
-def mock_get_comment_lines(request: pytest.FixtureRequest, mocker: MockerFixture) -> MagicMock:
-    return mocker.patch(
-        f"{TodoChecker.__module__}.{get_comment_lines.__name__}",
-        return_value=request.param,
-    )
-
-
 @pytest.mark.parametrize(
-    "mock_get_comment_lines",
-    [COMMENT_LINES_WITHOUT_TODO],
+    "source_file",
+    [FILE_CONTENTS_WITHOUT_TODO],
     indirect=True,
 )
 def test_check_todo_pass(
-    mock_get_comment_lines: MagicMock,
+    source_file: Path,
+    mock_find_files: MagicMock,
     caplog: pytest.LogCaptureFixture,
     config: Config,
-    mock_find_files: MagicMock,
 ) -> None:
     result = TodoChecker(config).check()
     assert result == 0
@@ -42,16 +38,17 @@ def test_check_todo_pass(
 
 
 @pytest.mark.parametrize(
-    "mock_get_comment_lines",
-    [COMMENT_LINES_WITH_TODO],
+    "source_file",
+    [FILE_CONTENTS_WITH_TODO],
     indirect=True,
 )
 def test_check_todo_fail(
-    mock_get_comment_lines: MagicMock,
+    source_file: Path,
+    mock_find_files: MagicMock,
     caplog: pytest.LogCaptureFixture,
     config: Config,
-    mock_find_files: MagicMock,
 ) -> None:
     result = TodoChecker(config).check()
-    assert result == 1
-    assert ("WARNING", "Found TODO in foo/bar.hpp at line 1") in get_log_data(caplog.records)
+    assert result == 2
+    assert ("WARNING", f"Found TODO in {source_file} at line 2") in get_log_data(caplog.records)
+    assert ("WARNING", f"Found todo in {source_file} at line 4") in get_log_data(caplog.records)
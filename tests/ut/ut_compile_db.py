@@ -0,0 +1,121 @@
+import json
+from pathlib import Path
+
+from scargo.utils.compile_db import (
+    CompileDatabase,
+    DependencyDigests,
+    get_compile_database,
+    get_depfile_path,
+    parse_depfile,
+    scan_includes,
+)
+
+
+def write_compile_db(build_dir: Path, source: Path, extra_args: str = "") -> CompileDatabase:
+    build_dir.mkdir(parents=True, exist_ok=True)
+    db_path = build_dir / "compile_commands.json"
+    entry = {
+        "directory": str(build_dir),
+        "command": f"g++ -I{source.parent / 'include'} {extra_args} -o CMakeFiles/app.dir/main.cpp.o -c {source}",
+        "file": str(source),
+    }
+    db_path.write_text(json.dumps([entry]))
+    return CompileDatabase(db_path)
+
+
+def test_parse_depfile(tmp_path: Path) -> None:
+    depfile = tmp_path / "main.cpp.o.d"
+    depfile.write_text("CMakeFiles/app.dir/main.cpp.o: /src/main.cpp \\\n /src/include/a\\ b.h \\\n  include/c.h\n")
+    assert parse_depfile(depfile, Path("/build")) == [
+        Path("/src/main.cpp"),
+        Path("/src/include/a b.h"),
+        Path("/build/include/c.h"),
+    ]
+
+
+def test_get_depfile_path(tmp_path: Path) -> None:
+    entry = {"directory": "/build", "arguments": ["g++", "-MD", "-MF", "deps/x.d", "-o", "x.o", "-c", "x.cpp"]}
+    assert get_depfile_path(entry) == Path("/build/deps/x.d")
+    entry = {"directory": "/build", "command": "g++ -o obj/x.cpp.o -c x.cpp"}
+    assert get_depfile_path(entry) == Path("/build/obj/x.cpp.o.d")
+
+
+def test_scan_includes(tmp_path: Path) -> None:
+    (tmp_path / "include").mkdir()
+    (tmp_path / "main.cpp").write_text('#include "a.h"\n#include <vector>\n')
+    (tmp_path / "include" / "a.h").write_text('#pragma once\n#include "b.h"\n')
+    (tmp_path / "include" / "b.h").write_text('#include "a.h"\n')
+    assert scan_includes(tmp_path / "main.cpp", [tmp_path / "include"]) == [
+        tmp_path / "include" / "a.h",
+        tmp_path / "include" / "b.h",
+    ]
+
+
+def test_digest_follows_included_headers(tmp_path: Path) -> None:
+    source = tmp_path / "src" / "main.cpp"
+    header = tmp_path / "src" / "include" / "a.h"
+    header.parent.mkdir(parents=True)
+    source.write_text('#include "a.h"\n')
+    header.write_text("int a();\n")
+    compile_db = write_compile_db(tmp_path / "build", source)
+
+    digest = DependencyDigests(tmp_path, compile_db).get_digest(source)
+    assert DependencyDigests(tmp_path, compile_db).get_digest(source) == digest
+
+    header.write_text("int a(int);\n")
+    assert DependencyDigests(tmp_path, compile_db).get_digest(source) != digest
+
+
+def test_digest_follows_compile_flags(tmp_path: Path) -> None:
+    source = tmp_path / "main.cpp"
+    source.write_text("int main() {}\n")
+    digest = DependencyDigests(tmp_path, write_compile_db(tmp_path / "build", source)).get_digest(source)
+    other_flags_db = write_compile_db(tmp_path / "build", source, extra_args="-DNDEBUG")
+    assert DependencyDigests(tmp_path, other_flags_db).get_digest(source) != digest
+
+
+def test_digest_uses_depfile(tmp_path: Path) -> None:
+    source = tmp_path / "main.cpp"
+    generated = tmp_path / "build" / "generated.h"
+    source.write_text("int main() {}\n")
+    compile_db = write_compile_db(tmp_path / "build", source)
+    depfile = tmp_path / "build" / "CMakeFiles" / "app.dir" / "main.cpp.o.d"
+    depfile.parent.mkdir(parents=True)
+    depfile.write_text(f"CMakeFiles/app.dir/main.cpp.o: {source} generated.h\n")
+    generated.write_text("#define A 1\n")
+
+    digest = DependencyDigests(tmp_path, compile_db).get_digest(source)
+    generated.write_text("#define A 2\n")
+    assert DependencyDigests(tmp_path, compile_db).get_digest(source) != digest
+
+
+def test_digest_follows_headers_included_after_build(tmp_path: Path) -> None:
+    source = tmp_path / "main.cpp"
+    header = tmp_path / "include" / "new.h"
+    header.parent.mkdir()
+    source.write_text("int main() {}\n")
+    compile_db = write_compile_db(tmp_path / "build", source)
+    depfile = tmp_path / "build" / "CMakeFiles" / "app.dir" / "main.cpp.o.d"
+    depfile.parent.mkdir(parents=True)
+    depfile.write_text(f"CMakeFiles/app.dir/main.cpp.o: {source}\n")
+    source.write_text('#include "new.h"\nint main() {}\n')
+    header.write_text("int a();\n")
+
+    dependency_digests = DependencyDigests(tmp_path, compile_db)
+    assert dependency_digests.is_affected(source, {header})
+    digest = dependency_digests.get_digest(source)
+    header.write_text("int a(int);\n")
+    assert DependencyDigests(tmp_path, compile_db).get_digest(source) != digest
+
+
+def test_compile_database_reloaded_when_changed(tmp_path: Path) -> None:
+    source = tmp_path / "main.cpp"
+    db_path = write_compile_db(tmp_path / "build", source).path
+
+    compile_db = get_compile_database(db_path)
+    assert get_compile_database(db_path) is compile_db
+
+    write_compile_db(tmp_path / "build", source, extra_args="-DNEW_FLAG")
+    reloaded = get_compile_database(db_path)
+    assert reloaded is not compile_db
+    assert "-DNEW_FLAG" in reloaded.entries[source]["command"]
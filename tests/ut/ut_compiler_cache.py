@@ -0,0 +1,70 @@
+import json
+
+import pytest
+from pytest_subprocess import FakeProcess
+
+from scargo.config import CompilerCache, Config
+from scargo.utils.compiler_cache import (
+    CompilerCacheStats,
+    get_compiler_cache_stats,
+    log_compiler_cache_stats,
+)
+from tests.ut.utils import get_log_data
+
+CCACHE_STATS = """\
+stats_updated_timestamp\t1700000000
+direct_cache_hit\t7
+preprocessed_cache_hit\t2
+cache_miss\t3
+"""
+
+SCCACHE_STATS = {
+    "stats": {
+        "cache_hits": {"counts": {"C/C++": 4, "Assembler": 1}},
+        "cache_misses": {"counts": {"C/C++": 2}},
+    }
+}
+
+
+def test_get_compiler_cache_stats_disabled(config: Config, fp: FakeProcess) -> None:
+    assert get_compiler_cache_stats(config) is None
+    assert not fp.calls
+
+
+def test_get_ccache_stats(config: Config, fp: FakeProcess) -> None:
+    config.project.compiler_cache = CompilerCache.CCACHE
+    fp.register(["ccache", "--print-stats"], stdout=CCACHE_STATS)
+
+    assert get_compiler_cache_stats(config) == CompilerCacheStats(hits=9, misses=3)
+
+
+def test_get_sccache_stats(config: Config, fp: FakeProcess) -> None:
+    config.project.compiler_cache = CompilerCache.SCCACHE
+    fp.register(["sccache", "--show-stats", "--stats-format=json"], stdout=json.dumps(SCCACHE_STATS))
+
+    assert get_compiler_cache_stats(config) == CompilerCacheStats(hits=5, misses=2)
+
+
+def test_get_compiler_cache_stats_tool_missing(config: Config, fp: FakeProcess) -> None:
+    config.project.compiler_cache = CompilerCache.CCACHE
+    fp.register(["ccache", "--print-stats"], returncode=1)
+
+    assert get_compiler_cache_stats(config) is None
+
+
+@pytest.mark.parametrize(
+    ["before", "expected_message"],
+    [
+        (CompilerCacheStats(5, 2), "Compiler cache (ccache): 4 hits, 1 misses, 80.0% hit rate"),
+        (None, "Compiler cache (ccache): 9 hits, 3 misses, 75.0% hit rate"),
+        # Counters were reset during the build
+        (CompilerCacheStats(20, 20), "Compiler cache (ccache): 9 hits, 3 misses, 75.0% hit rate"),
+        (CompilerCacheStats(9, 3), "Compiler cache (ccache): 0 hits, 0 misses"),
+    ],
+)
+def test_log_compiler_cache_stats(
+    before: CompilerCacheStats, expected_message: str, config: Config, caplog: pytest.LogCaptureFixture
+) -> None:
+    config.project.compiler_cache = CompilerCache.CCACHE
+    log_compiler_cache_stats(config, before, CompilerCacheStats(9, 3))
+    assert ("INFO", expected_message) in get_log_data(caplog.records)
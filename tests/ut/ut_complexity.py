@@ -0,0 +1,28 @@
+from scargo.utils.complexity import analyze_source, analyze_sources
+
+SOURCE = """
+int branches(int a, int b) {
+    if (a && b) {
+        return 1;
+    }
+    return 0;
+}
+"""
+
+
+def test_analyze_source() -> None:
+    (function,) = analyze_source("foo.cpp", SOURCE)
+
+    assert function.name == "branches"
+    assert function.cyclomatic_complexity == 3
+    assert function.parameter_count == 2
+    assert (function.start_line, function.end_line) == (2, 7)
+
+
+def test_analyze_sources_in_process_pool() -> None:
+    sources = [(f"file{index}.cpp", SOURCE * index) for index in range(4)]
+
+    results = analyze_sources(sources, jobs=2)
+
+    assert [len(functions) for functions in results] == [0, 1, 2, 3]
+    assert results[1] == analyze_source("file1.cpp", SOURCE)
@@ -8,7 +8,16 @@ from pytest_subprocess import FakeProcess
 from pytest_subprocess.fake_popen import FakePopen
 
 from scargo.config import Config
-from scargo.utils.conan_utils import conan_add_remote, conan_remote_login, conan_source
+from scargo.utils.conan_utils import (
+    CONAN_BOOTSTRAP_STAMP,
+    conan_add_remote,
+    conan_bootstrap,
+    conan_remote_login,
+    conan_source,
+    get_conan_install_fingerprint,
+    is_conan_install_current,
+    save_conan_install_fingerprint,
+)
 from tests.ut.ut_scargo_publish import (
     ENV_CONAN_PASSWORD,
     ENV_CONAN_USER,
@@ -157,3 +166,92 @@ def test_conan_source_fails(config: Config, caplog: pytest.LogCaptureFixture, fp
 
     # ASSERT
     assert "Unable to source" in caplog.text
+
+
+def test_conan_install_fingerprint(config: Config, tmp_path: Path) -> None:
+    install_cmd = ["conan", "install", ".", "-of", "build"]
+    profile_path = tmp_path / "profile"
+    profile_path.write_text("[settings]\nos=Linux\n")
+    (tmp_path / "conanfile.py").write_text("requires = []\n")
+
+    fingerprint = get_conan_install_fingerprint(config, tmp_path, install_cmd, profile_path)
+    assert not is_conan_install_current(tmp_path, fingerprint)
+    save_conan_install_fingerprint(tmp_path, fingerprint)
+    assert is_conan_install_current(tmp_path, fingerprint)
+    assert get_conan_install_fingerprint(config, tmp_path, install_cmd, profile_path) == fingerprint
+
+    (tmp_path / "conan.lock").write_text("{}")
+    assert get_conan_install_fingerprint(config, tmp_path, install_cmd, profile_path) != fingerprint
+    (tmp_path / "conan.lock").unlink()
+    profile_path.write_text("[settings]\nos=Windows\n")
+    assert get_conan_install_fingerprint(config, tmp_path, install_cmd, profile_path) != fingerprint
+    profile_path.write_text("[settings]\nos=Linux\n")
+    config.dependencies.general.append("fmt/10.0.0")
+    assert get_conan_install_fingerprint(config, tmp_path, install_cmd, profile_path) != fingerprint
+
+
+def test_conan_bootstrap_runs_once(
+    config: Config, fp: FakeProcess, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setenv("CONAN_HOME", str(tmp_path / "conan_home"))
+    fp.keep_last_process(True)
+    for command in [
+        ["conan", "profile", "list"],
+        ["conan", "profile", "detect"],
+        ["conan", "remote", "list-users"],
+        ["conan", "remote", "add", fp.any()],
+        ["conan", "source", "."],
+    ]:
+        fp.register(command)
+
+    conan_bootstrap(tmp_path, config)
+    setup_calls = len(fp.calls)
+    assert ["conan", "source", "."] in fp.calls
+    assert (tmp_path / CONAN_BOOTSTRAP_STAMP).is_file()
+
+    conan_bootstrap(tmp_path, config)
+    assert len(fp.calls) == setup_calls
+
+    conan_bootstrap(tmp_path, config, force=True)
+    assert len(fp.calls) == 2 * setup_calls
+
+    config.conan.repo["new_remote"] = EXAMPLE_URL
+    conan_bootstrap(tmp_path, config)
+    assert fp.call_count(["conan", "remote", "add", "new_remote", EXAMPLE_URL]) == 1
+
+
+def test_conan_bootstrap_failure_not_stamped(
+    config: Config, fp: FakeProcess, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setenv("CONAN_HOME", str(tmp_path / "conan_home"))
+    fp.keep_last_process(True)
+    fp.register(["conan", "profile", "list"], stdout="default\n")
+    fp.register(["conan", "remote", "list-users"])
+    fp.register(["conan", "remote", "add", fp.any()])
+    fp.register(["conan", "source", "."], returncode=1)
+
+    conan_bootstrap(tmp_path, config)
+    conan_bootstrap(tmp_path, config)
+
+    assert fp.call_count(["conan", "source", "."]) == 2
+    assert not (tmp_path / CONAN_BOOTSTRAP_STAMP).exists()
+
+
+def test_conan_bootstrap_missing_sources(fp: FakeProcess, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("CONAN_HOME", str(tmp_path / "conan_home"))
+    config = get_test_project_config("stm32")
+    fp.keep_last_process(True)
+    fp.register(["conan", "profile", "list"], stdout="default\n")
+    fp.register(["conan", "remote", "list-users"])
+    fp.register(["conan", "remote", "add", fp.any()])
+    fp.register(["conan", "source", "."])
+    source_dir = tmp_path / "third-party" / "stm32-cmake"
+
+    conan_bootstrap(tmp_path, config)
+    source_dir.mkdir(parents=True)
+    conan_bootstrap(tmp_path, config)
+    assert fp.call_count(["conan", "source", "."]) == 1
+
+    source_dir.rmdir()
+    conan_bootstrap(tmp_path, config)
+    assert fp.call_count(["conan", "source", "."]) == 2
@@ -0,0 +1,75 @@
+import os
+from pathlib import Path
+
+import pytest
+from pytest_mock import MockerFixture
+
+from scargo.utils.file_utils import SyncStats, sync_tree, write_atomically
+
+
+def test_write_atomically(tmp_path: Path) -> None:
+    file_path = tmp_path / "script.sh"
+    file_path.write_bytes(b"old\n")
+    file_path.chmod(0o755)
+
+    write_atomically(file_path, b"new\n")
+
+    assert file_path.read_bytes() == b"new\n"
+    assert file_path.stat().st_mode & 0o777 == 0o755
+    assert list(tmp_path.iterdir()) == [file_path]
+
+
+def test_write_atomically_failure_keeps_file(tmp_path: Path, mocker: MockerFixture) -> None:
+    file_path = tmp_path / "main.cpp"
+    file_path.write_bytes(b"old\n")
+    mocker.patch.object(os, "replace", side_effect=OSError("disk full"))
+
+    with pytest.raises(OSError):
+        write_atomically(file_path, b"new\n")
+
+    assert file_path.read_bytes() == b"old\n"
+    assert list(tmp_path.iterdir()) == [file_path]
+
+
+def test_sync_tree(tmp_path: Path) -> None:
+    source_dir = tmp_path / "build" / "Debug"
+    (source_dir / "bin").mkdir(parents=True)
+    (source_dir / "bin" / "app").write_bytes(b"app")
+    (source_dir / "main.o").write_bytes(b"object")
+    (source_dir / "rebuilt").write_bytes(b"same")
+
+    assert sync_tree(source_dir, tmp_path) == SyncStats(copied_files=2, copied_bytes=7, unchanged_files=0)
+    assert (tmp_path / "bin" / "app").read_bytes() == b"app"
+    assert not (tmp_path / "main.o").exists()
+
+    os.utime(source_dir / "rebuilt", ns=(0, 0))
+    (source_dir / "bin" / "app").write_bytes(b"app v2")
+    assert sync_tree(source_dir, tmp_path) == SyncStats(copied_files=1, copied_bytes=6, unchanged_files=1)
+    assert (tmp_path / "bin" / "app").read_bytes() == b"app v2"
+    assert (tmp_path / "rebuilt").stat().st_mtime_ns == 0
+
+    assert sync_tree(source_dir, tmp_path, skip_suffixes=()) == SyncStats(1, 6, 2)
+    assert (tmp_path / "main.o").read_bytes() == b"object"
+
+
+def test_sync_tree_copies_symlinks(tmp_path: Path) -> None:
+    source_dir = tmp_path / "build" / "Debug"
+    (source_dir / "lib" / "v1").mkdir(parents=True)
+    (source_dir / "lib" / "v1" / "libfoo.so").write_bytes(b"lib")
+    (source_dir / "lib" / "current").symlink_to("v1")
+    (source_dir / "libfoo.so").symlink_to("lib/v1/libfoo.so")
+
+    assert sync_tree(source_dir, tmp_path) == SyncStats(copied_files=3, copied_bytes=3, unchanged_files=0)
+    assert os.readlink(tmp_path / "lib" / "current") == "v1"
+    assert os.readlink(tmp_path / "libfoo.so") == "lib/v1/libfoo.so"
+    assert (tmp_path / "lib" / "current" / "libfoo.so").read_bytes() == b"lib"
+
+    (source_dir / "libfoo.so").unlink()
+    (source_dir / "libfoo.so").symlink_to("lib/current/libfoo.so")
+    assert sync_tree(source_dir, tmp_path) == SyncStats(copied_files=1, copied_bytes=0, unchanged_files=2)
+    assert os.readlink(tmp_path / "libfoo.so") == "lib/current/libfoo.so"
+
+
+def test_sync_tree_missing_source(tmp_path: Path) -> None:
+    with pytest.raises(FileNotFoundError):
+        sync_tree(tmp_path / "build" / "Debug", tmp_path)
@@ -0,0 +1,58 @@
+from pathlib import Path
+
+import pytest
+from pytest_mock import MockerFixture
+
+from scargo.utils import file_watcher
+from scargo.utils.file_watcher import FileWatcher
+
+
+@pytest.fixture
+def tree(tmp_path: Path) -> Path:
+    (tmp_path / "src" / "lib").mkdir(parents=True)
+    (tmp_path / "src" / "main.cpp").write_text("int main() {}\n")
+    (tmp_path / "src" / "lib" / "lib.hpp").write_text("#pragma once\n")
+    return tmp_path / "src"
+
+
+@pytest.fixture(params=["inotify", "polling"])
+def watcher(request: pytest.FixtureRequest, tree: Path, mocker: MockerFixture) -> FileWatcher:
+    if request.param == "polling":
+        mocker.patch.object(file_watcher, "_Inotify", side_effect=OSError("not supported"))
+    watcher = FileWatcher(tree, poll_interval=0.01, settle_time=0.01)
+    request.addfinalizer(watcher.close)
+    return watcher
+
+
+def test_modified_file(watcher: FileWatcher, tree: Path) -> None:
+    (tree / "lib" / "lib.hpp").write_text("#pragma once\nint lib();\n")
+    changes = watcher.wait_for_changes()
+    assert changes.files == {tree / "lib" / "lib.hpp"}
+    assert not changes.tree_changed
+
+
+def test_created_and_removed_files(watcher: FileWatcher, tree: Path) -> None:
+    (tree / "new").mkdir()
+    (tree / "new" / "new.cpp").write_text("int x;\n")
+    (tree / "main.cpp").unlink()
+    changes = watcher.wait_for_changes()
+    assert changes.files == {tree / "new" / "new.cpp", tree / "main.cpp"}
+    assert changes.tree_changed
+
+
+def test_file_in_new_directory_is_watched(watcher: FileWatcher, tree: Path) -> None:
+    (tree / "new").mkdir()
+    (tree / "new" / "new.cpp").write_text("int x;\n")
+    watcher.wait_for_changes()
+
+    (tree / "new" / "new.cpp").write_text("int y;\n")
+    assert watcher.wait_for_changes().files == {tree / "new" / "new.cpp"}
+
+
+def test_directory_moved_away(watcher: FileWatcher, tree: Path) -> None:
+    header = tree / "lib" / "lib.hpp"
+    (tree / "lib").rename(tree.parent / "lib")
+    changes = watcher.wait_for_changes()
+    # Inotify reports only the directory, polling the files inside
+    assert any(path == header or path in header.parents for path in changes.files)
+    assert changes.tree_changed
@@ -0,0 +1,78 @@
+import subprocess
+from pathlib import Path
+from typing import Tuple
+
+import pytest
+
+from scargo.utils.git_utils import get_changed_files, get_changed_lines
+
+
+def git(cwd: Path, *args: str) -> None:
+    subprocess.run(["git", *args], cwd=cwd, check=True, capture_output=True)
+
+
+@pytest.fixture
+def repo(tmp_path: Path) -> Path:
+    git(tmp_path, "init", "-q", "-b", "main")
+    git(tmp_path, "config", "user.email", "test@example.com")
+    git(tmp_path, "config", "user.name", "test")
+    (tmp_path / "project" / "src").mkdir(parents=True)
+    (tmp_path / "project" / "src" / "a.cpp").write_text("int a;\n")
+    (tmp_path / "project" / "src" / "b.cpp").write_text("int b;\n")
+    (tmp_path / "other.txt").write_text("other\n")
+    git(tmp_path, "add", ".")
+    git(tmp_path, "commit", "-q", "-m", "initial")
+    return tmp_path
+
+
+def test_get_changed_files(repo: Path) -> None:
+    project = repo / "project"
+    git(repo, "checkout", "-q", "-b", "feature")
+    (project / "src" / "a.cpp").write_text("int a = 1;\n")
+    git(repo, "commit", "-q", "-am", "change a")
+    (project / "src" / "b.cpp").unlink()
+    (project / "src" / "c.cpp").write_text("int c;\n")
+    (repo / "other.txt").write_text("changed\n")
+
+    assert get_changed_files(project, "main") == {project / "src" / "a.cpp", project / "src" / "c.cpp"}
+
+
+def test_get_changed_files_invalid_ref(repo: Path) -> None:
+    with pytest.raises(SystemExit):
+        get_changed_files(repo, "no-such-ref")
+
+
+def test_get_changed_lines(repo: Path) -> None:
+    project = repo / "project"
+    git(repo, "checkout", "-q", "-b", "feature")
+    (project / "src" / "a.cpp").write_text("int x;\nint a = 1;\nint y;\nint z;\n")
+    git(repo, "commit", "-q", "-am", "change a")
+    (project / "src" / "b.cpp").write_text("")
+    (project / "src" / "c.cpp").write_text("int c;\n")
+
+    assert get_changed_lines(project, "main") == {
+        project / "src" / "a.cpp": [(1, 4)],
+        project / "src" / "c.cpp": None,
+    }
+
+
+def test_get_changed_lines_invalid_ref(repo: Path) -> None:
+    with pytest.raises(SystemExit):
+        get_changed_lines(repo, "no-such-ref")
+
+
+@pytest.mark.parametrize("diff_config", [("diff.noprefix", "true"), ("diff.mnemonicPrefix", "true")])
+def test_get_changed_lines_diff_config_and_quoted_paths(repo: Path, diff_config: Tuple[str, str]) -> None:
+    project = repo / "project"
+    names = ['sp ace "q".cpp', "zażółć.cpp"]
+    for name in names:
+        (project / "src" / name).write_text("int a;\n")
+    git(repo, "add", ".")
+    git(repo, "commit", "-q", "-m", "add quoted")
+    git(repo, "config", *diff_config)
+    git(repo, "config", "core.quotePath", "true")
+    git(repo, "checkout", "-q", "-b", "feature")
+    for name in names:
+        (project / "src" / name).write_text("int a;\nint b;\n")
+
+    assert get_changed_lines(project, "main") == {project / "src" / name: [(2, 2)] for name in names}
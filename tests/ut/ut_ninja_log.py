@@ -0,0 +1,83 @@
+import json
+from pathlib import Path
+
+from scargo.utils.ninja_log import (
+    NinjaStep,
+    analyze_steps,
+    format_build_analysis,
+    read_ninja_log,
+    write_chrome_trace,
+)
+
+NINJA_LOG = """\
+# ninja log v5
+0\t8000\t0\told.o\t11
+0\t1000\t0\ta.o\taa
+0\t1200\t0\tb.o\tbb
+1200\t1400\t0\tlib.a\tcc
+1200\t1400\t0\tlib.stamp\tcc
+1400\t6000\t0\tapp\tdd
+"""
+
+
+def test_read_ninja_log_last_build(tmp_path: Path) -> None:
+    log_path = tmp_path / ".ninja_log"
+    log_path.write_text(NINJA_LOG)
+
+    steps = read_ninja_log(log_path)
+
+    assert steps == [
+        NinjaStep(0.0, 1.0, ("a.o",)),
+        NinjaStep(0.0, 1.2, ("b.o",)),
+        NinjaStep(1.2, 1.4, ("lib.a", "lib.stamp")),
+        NinjaStep(1.4, 6.0, ("app",)),
+    ]
+
+
+def test_analyze_steps(tmp_path: Path) -> None:
+    log_path = tmp_path / ".ninja_log"
+    log_path.write_text(NINJA_LOG)
+
+    analysis = analyze_steps(read_ninja_log(log_path), segments=2)
+
+    assert analysis.wall_time == 6.0
+    assert [step.name for step in analysis.critical_path] == ["b.o", "lib.a", "app"]
+    assert analysis.parallelism == [(1.0 + 1.2 + 0.2 + 1.6) / 3, 1.0]
+    assert [(step.name, round(alone, 3)) for step, alone in analysis.bottlenecks] == [("app", 4.6)]
+    report = format_build_analysis(analysis)
+    assert "average parallelism 1.2" in report
+    assert "app ran alone for 77% of the build" in report
+
+
+def test_analyze_steps_taking_no_time() -> None:
+    steps = [
+        NinjaStep(0.0, 2.0, ("a.o",)),
+        NinjaStep(2.0, 2.0, ("phony",)),
+        NinjaStep(2.0, 2.0, ("stamp",)),
+        NinjaStep(1.0, 10.0, ("b.o",)),
+        NinjaStep(10.0, 20.0, ("app",)),
+    ]
+
+    analysis = analyze_steps(steps)
+
+    assert [step.name for step in analysis.critical_path] == ["b.o", "app"]
+    assert [(step.name, alone) for step, alone in analysis.bottlenecks] == [("app", 10.0), ("b.o", 8.0)]
+    assert "Critical path (estimated from step times, 19.0 s):" in format_build_analysis(analysis)
+
+
+def test_analyze_no_steps() -> None:
+    assert format_build_analysis(analyze_steps([])) == "No build steps found."
+
+
+def test_write_chrome_trace(tmp_path: Path) -> None:
+    trace_path = tmp_path / "trace.json"
+    steps = [NinjaStep(0.0, 1.0, ("a.o",)), NinjaStep(0.5, 1.5, ("b.o",)), NinjaStep(1.0, 2.0, ("app",))]
+
+    write_chrome_trace(steps, trace_path)
+
+    events = json.loads(trace_path.read_text())["traceEvents"]
+    assert [(event["name"], event["tid"], event["ts"], event["dur"]) for event in events] == [
+        ("a.o", 0, 0, 1000000),
+        ("b.o", 1, 500000, 1000000),
+        ("app", 0, 1000000, 1000000),
+    ]
@@ -0,0 +1,73 @@
+import threading
+import time
+from typing import List
+
+from scargo.utils.parallel_utils import JobBudget, run_grouped
+
+
+def test_job_budget_limits_concurrency() -> None:
+    budget = JobBudget(2)
+    lock = threading.Lock()
+    running: List[int] = [0]
+    peak: List[int] = [0]
+
+    def work(_: int) -> None:
+        with lock:
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+        time.sleep(0.01)
+        with lock:
+            running[0] -= 1
+
+    run_grouped(work, range(10), 8, budget)
+    assert peak[0] <= 2
+
+
+def test_job_budget_grants_available_slots() -> None:
+    budget = JobBudget(4)
+    with budget.reserve() as first:
+        with budget.reserve(8) as second:
+            assert first == 1
+            assert second == 3
+
+
+def test_job_budget_large_reservation_waits_for_minimum() -> None:
+    budget = JobBudget(4)
+    granted: List[int] = []
+    small_released = threading.Event()
+
+    def reserve_all() -> None:
+        with budget.reserve(4, minimum=4) as jobs:
+            granted.append(jobs)
+
+    with budget.reserve() as first:
+        assert first == 1
+        large = threading.Thread(target=reserve_all)
+        large.start()
+        time.sleep(0.05)
+        # Free slots are kept for the waiting large reservation
+        assert not granted
+
+        def reserve_small() -> None:
+            small_released.wait()
+            with budget.reserve() as jobs:
+                granted.append(jobs)
+
+        small = threading.Thread(target=reserve_small)
+        small.start()
+        small_released.set()
+        time.sleep(0.05)
+        assert not granted
+    large.join()
+    small.join()
+    assert granted == [4, 1]
+
+
+def test_run_grouped_keeps_order() -> None:
+    items = [5, 1, 4, 2, 3]
+
+    def work(item: int) -> int:
+        time.sleep(item * 0.005)
+        return item * 10
+
+    assert run_grouped(work, items, 5) == [50, 10, 40, 20, 30]
@@ -1,15 +1,21 @@
+import json
 import os
+import shutil
+import time
 from pathlib import Path
+from typing import Any, Callable, List, Optional, Sequence
 from unittest.mock import MagicMock
 
 import pytest
 from pyfakefs.fake_filesystem import FakeFilesystem
 from pytest_mock import MockerFixture
 from pytest_subprocess import FakeProcess
+from pytest_subprocess.fake_popen import FakePopen
 
-from scargo.commands.build import scargo_build
+from scargo.commands.build import BuildOptions, _PrefixedOutput, scargo_build
 from scargo.config import Config, Target
 from scargo.utils.conan_utils import DEFAULT_PROFILES
+from scargo.utils.time_trace import get_time_trace_conf
 from tests.ut.utils import get_log_data, get_test_project_config
 
 
@@ -26,10 +32,13 @@ def register_build_cmds(
     profile: str,
     build_dir: Path,
     build_fails: bool = False,
+    jobs: Optional[int] = None,
+    stdout: Optional[str] = None,
+    conf_args: Sequence[str] = (),
+    build_callback: Optional[Callable[..., None]] = None,
 ) -> None:
     profile_name = f"{target.id}_{profile}"
     profile_path = f"./config/conan/profiles/{profile_name}"
-    copy_dir_path = Path(build_dir, "build", profile)
     fp.register(
         [
             "conan",
@@ -39,15 +48,34 @@ def register_build_cmds(
             profile_path,
             "-of",
             build_dir,
+            *conf_args,
             "-b",
             "missing",
         ]
     )
-    fp.register(
-        ["conan", "build", ".", "-pr", profile_path, "-of", build_dir],
-        returncode=int(build_fails),
-    )
-    fp.register(["cp", "-r", "-f", f"{copy_dir_path}/*", "."])
+    cmake_build_dir = build_dir / "build" / profile
+
+    def configure(_: FakePopen) -> None:
+        # Artifacts are copied from here after the build
+        cmake_build_dir.mkdir(parents=True, exist_ok=True)
+
+    def configure_and_build(process: FakePopen) -> None:
+        configure(process)
+        if build_callback:
+            build_callback(process)
+
+    build_cmd = ["conan", "build", ".", "-pr", profile_path, "-of", build_dir, *conf_args]
+    if jobs is None:
+        fp.register(build_cmd, returncode=int(build_fails), stdout=stdout, callback=configure_and_build)
+    else:
+        # Parallel builds configure with conan and build with CMake
+        fp.register([*build_cmd, "-c", "user.scargo:configure_only=True"], callback=configure)
+        fp.register(
+            ["cmake", "--build", str(cmake_build_dir), "--config", profile, "--parallel", str(jobs)],
+            returncode=int(build_fails),
+            stdout=stdout,
+            callback=build_callback,
+        )
 
 
 @pytest.mark.parametrize("profile", DEFAULT_PROFILES)
@@ -62,10 +90,191 @@ def test_scargo_build_dir_exist(
     register_common_commands(fp)
     register_build_cmds(fp, target, profile, build_dir)
 
-    scargo_build(profile, None)
+    scargo_build([profile], None)
     assert build_dir.is_dir()
 
 
+@pytest.mark.parametrize("force_install", [False, True])
+def test_scargo_build_skips_unchanged_install(
+    force_install: bool, fp: FakeProcess, fs: FakeFilesystem, mock_prepare_config: MagicMock
+) -> None:
+    profile = "Debug"
+    config = mock_prepare_config.return_value
+    target = config.project.default_target
+    build_dir = Path(target.get_profile_build_dir(profile))
+    Path("CMakeLists.txt").touch()
+    fp.keep_last_process(True)
+    register_common_commands(fp)
+    register_build_cmds(fp, target, profile, build_dir)
+
+    scargo_build([profile], None)
+    scargo_build([profile], None, options=BuildOptions(force_install=force_install))
+    assert fp.call_count(["conan", "install", fp.any()]) == (2 if force_install else 1)
+
+    Path("conanfile.py").write_text("changed")
+    scargo_build([profile], None)
+    assert fp.call_count(["conan", "install", fp.any()]) == (3 if force_install else 2)
+
+
+def test_scargo_build_fast(fp: FakeProcess, fs: FakeFilesystem, mock_prepare_config: MagicMock) -> None:
+    profile = "Debug"
+    config = mock_prepare_config.return_value
+    config.project.max_build_jobs = 3
+    target = config.project.default_target
+    build_dir = Path(target.get_profile_build_dir(profile))
+    Path("CMakeLists.txt").touch()
+    fp.keep_last_process(True)
+    register_common_commands(fp)
+    register_build_cmds(fp, target, profile, build_dir)
+    cmake_build_dir = build_dir / "build" / profile
+    cmake_cmd = ["cmake", "--build", str(cmake_build_dir), "--config", profile, "--parallel", "3", "--target", "app"]
+    fp.register(cmake_cmd)
+    options = BuildOptions(fast=True, cmake_target="app")
+
+    # Not configured yet
+    scargo_build([profile], None, options=options)
+    assert fp.call_count(["conan", "build", fp.any()]) == 1
+    fs.create_file(cmake_build_dir / "CMakeCache.txt")
+
+    scargo_build([profile], None, options=options)
+    assert fp.call_count(["conan", "build", fp.any()]) == 1
+    assert fp.call_count(cmake_cmd) == 1
+
+    # Configuration inputs changed
+    Path("conanfile.py").write_text("changed")
+    scargo_build([profile], None, options=options)
+    assert fp.call_count(["conan", "install", fp.any()]) == 2
+    assert fp.call_count(["conan", "build", fp.any()]) == 2
+    assert fp.call_count(cmake_cmd) == 1
+
+
+def test_scargo_build_copies_artifacts(
+    fp: FakeProcess, fs: FakeFilesystem, mock_prepare_config: MagicMock, caplog: pytest.LogCaptureFixture
+) -> None:
+    profile = "Debug"
+    config = mock_prepare_config.return_value
+    target = config.project.default_target
+    build_dir = Path(target.get_profile_build_dir(profile))
+    cmake_build_dir = build_dir / "build" / profile
+    fs.create_file(cmake_build_dir / "bin" / "app", contents="binary")
+    fs.create_file(cmake_build_dir / "CMakeFiles" / "app.dir" / "main.cpp.o", contents="object")
+    Path("CMakeLists.txt").touch()
+    fp.keep_last_process(True)
+    register_common_commands(fp)
+    register_build_cmds(fp, target, profile, build_dir)
+
+    scargo_build([profile], None)
+    assert (build_dir / "bin" / "app").read_text() == "binary"
+    assert not (build_dir / "CMakeFiles").exists()
+    assert ("INFO", "Artifacts copied: 1 files, 6 bytes, 0 files unchanged") in get_log_data(caplog.records)
+
+    scargo_build([profile], None, options=BuildOptions(copy_objects=True))
+    assert (build_dir / "CMakeFiles" / "app.dir" / "main.cpp.o").read_text() == "object"
+    assert ("INFO", "Artifacts copied: 1 files, 6 bytes, 1 files unchanged") in get_log_data(caplog.records)
+
+
+def test_scargo_build_no_artifacts(
+    fp: FakeProcess, fs: FakeFilesystem, mock_prepare_config: MagicMock, caplog: pytest.LogCaptureFixture
+) -> None:
+    profile = "Debug"
+    target = mock_prepare_config.return_value.project.default_target
+    build_dir = Path(target.get_profile_build_dir(profile))
+    Path("CMakeLists.txt").touch()
+    register_common_commands(fp)
+    register_build_cmds(fp, target, profile, build_dir, build_callback=lambda _: shutil.rmtree(build_dir / "build"))
+
+    with pytest.raises(SystemExit):
+        scargo_build([profile], None)
+    assert (
+        "ERROR",
+        f"Scargo build target {target.id} failed: Directory to copy {build_dir / 'build' / profile} does not exist",
+    ) in get_log_data(caplog.records)
+
+
+def test_scargo_build_time_trace_esp32(
+    fp: FakeProcess, mock_prepare_multitarget_config: MagicMock, caplog: pytest.LogCaptureFixture
+) -> None:
+    Path("CMakeLists.txt").touch()
+    register_common_commands(fp)
+
+    with pytest.raises(SystemExit):
+        scargo_build(["Debug"], None, all_targets=True, options=BuildOptions(time_trace=True))
+
+    assert ("ERROR", "Time trace is not supported for the esp32 target") in get_log_data(caplog.records)
+    assert fp.call_count(["conan", "build", fp.any()]) == 0
+
+
+def test_scargo_build_time_trace(
+    fp: FakeProcess, fs: FakeFilesystem, mock_prepare_config: MagicMock, caplog: pytest.LogCaptureFixture
+) -> None:
+    profile = "Debug"
+    config = mock_prepare_config.return_value
+    target = config.project.default_target
+    build_dir = Path(target.get_profile_build_dir(profile))
+    cmake_build_dir = build_dir / "build" / profile
+    object_dir = cmake_build_dir / "CMakeFiles" / "app.dir"
+    # Left by an earlier build, the unit was not compiled again
+    stale_report = fs.create_file(object_dir / "old.cpp.time-report", contents=" TOTAL : 0.90 0.10 7.00 200 kB\n")
+    os.utime(stale_report.path, (0, 0))
+
+    def compile_unit(_: Any) -> None:
+        (object_dir / "main.cpp.time-report").write_text(
+            " phase parsing : 0.50 ( 50%) 0.10 ( 10%) 0.60 ( 60%) 100 kB\n TOTAL : 0.90 0.10 1.00 200 kB\n"
+        )
+
+    Path("CMakeLists.txt").touch()
+    register_common_commands(fp)
+    register_build_cmds(
+        fp, target, profile, build_dir, conf_args=get_time_trace_conf(clang=False), build_callback=compile_unit
+    )
+
+    scargo_build([profile], None, options=BuildOptions(time_trace=True))
+
+    report = (build_dir / "time_trace_report.txt").read_text()
+    assert "1.000 s  CMakeFiles/app.dir/main.cpp" in report
+    assert "old.cpp" not in report
+    assert (build_dir / "time_trace_report.json").is_file()
+    assert "Time trace report written to" in caplog.text
+
+
+def test_scargo_build_analyze(
+    fp: FakeProcess, fs: FakeFilesystem, mock_prepare_config: MagicMock, caplog: pytest.LogCaptureFixture
+) -> None:
+    profile = "Debug"
+    config = mock_prepare_config.return_value
+    target = config.project.default_target
+    build_dir = Path(target.get_profile_build_dir(profile))
+    fs.create_file(
+        build_dir / "build" / profile / ".ninja_log",
+        contents="# ninja log v5\n0\t200\t0\tutil.o\tbb\n0\t1000\t0\tmain.o\taa\n1000\t3000\t0\tapp\tcc\n",
+    )
+    Path("CMakeLists.txt").touch()
+    register_common_commands(fp)
+    register_build_cmds(fp, target, profile, build_dir)
+
+    scargo_build([profile], None, options=BuildOptions(analyze=True))
+
+    assert "2.000 s  app ran alone for 67% of the build" in caplog.text
+    assert len(json.loads((build_dir / "build_trace.json").read_text())["traceEvents"]) == 3
+
+
+def test_scargo_build_analyze_no_ninja_log(
+    fp: FakeProcess, fs: FakeFilesystem, mock_prepare_config: MagicMock, caplog: pytest.LogCaptureFixture
+) -> None:
+    profile = "Debug"
+    config = mock_prepare_config.return_value
+    target = config.project.default_target
+    build_dir = Path(target.get_profile_build_dir(profile))
+    Path("CMakeLists.txt").touch()
+    register_common_commands(fp)
+    register_build_cmds(fp, target, profile, build_dir)
+
+    scargo_build([profile], None, options=BuildOptions(analyze=True))
+
+    assert "build analysis needs the Ninja generator" in caplog.text
+    assert not (build_dir / "build_trace.json").exists()
+
+
 def test_scargo_build_no_cmake(
     fp: FakeProcess,
     fs: FakeFilesystem,
@@ -74,7 +283,7 @@ def test_scargo_build_no_cmake(
 ) -> None:
     profile = "Debug"
     with pytest.raises(SystemExit):
-        scargo_build(profile, None)
+        scargo_build([profile], None)
     log_data = get_log_data(caplog.records)
     assert ("ERROR", "File `CMakeLists.txt` does not exist.") in log_data
     assert ("INFO", "Did you run `scargo update`?") in log_data
@@ -96,7 +305,7 @@ def test_scargo_build_fails(
     register_build_cmds(fp, target, profile, build_dir, build_fails=True)
 
     with pytest.raises(SystemExit):
-        scargo_build(profile, None)
+        scargo_build([profile], None)
     log_data = get_log_data(caplog.records)
     assert ("ERROR", "Scargo build target x86 failed") in log_data
 
@@ -117,11 +326,197 @@ def test_scargo_build_all_targets(
         build_dirs.append(build_dir)
         register_build_cmds(fp, target, profile, build_dir)
 
-    scargo_build(profile, None, all_targets=True)
+    scargo_build([profile], None, all_targets=True)
     for build_dir in build_dirs:
         assert build_dir.is_dir()
 
 
+def test_scargo_build_all_targets_parallel(
+    fp: FakeProcess,
+    mock_prepare_multitarget_config: MagicMock,
+    capfd: pytest.CaptureFixture[str],
+) -> None:
+    profile = "Debug"
+    config = mock_prepare_multitarget_config.return_value
+    config.project.max_build_jobs = 8
+    targets = config.project.target
+    Path("CMakeLists.txt").touch()
+
+    register_common_commands(fp)
+    for target in targets:
+        build_dir = Path.cwd() / target.get_profile_build_dir(profile)
+        register_build_cmds(fp, target, profile, build_dir, jobs=8 // len(targets), stdout=f"built {target.id}")
+
+    scargo_build([profile], None, all_targets=True, parallel=True)
+    output = capfd.readouterr().out
+    for target in targets:
+        assert f"[{target.id}] built {target.id}" in output
+
+
+def test_scargo_build_parallel_runs_conan_one_at_a_time(
+    fp: FakeProcess, mock_prepare_multitarget_config: MagicMock, mocker: MockerFixture
+) -> None:
+    config = mock_prepare_multitarget_config.return_value
+    config.project.max_build_jobs = 4
+    targets = config.project.target
+    Path("CMakeLists.txt").touch()
+    run_cmd = _PrefixedOutput.run
+    running = []
+    overlaps = []
+
+    def run_conan(output: _PrefixedOutput, cmd: List[str], cwd: Path, prefix: str) -> None:
+        if cmd[0] != "conan":
+            run_cmd(output, cmd, cwd, prefix)
+            return
+        running.append(cmd)
+        overlaps.append(len(running) > 1)
+        time.sleep(0.01)
+        run_cmd(output, cmd, cwd, prefix)
+        running.remove(cmd)
+
+    mocker.patch.object(_PrefixedOutput, "run", run_conan)
+    register_common_commands(fp)
+    for target in targets:
+        for profile in config.profiles:
+            build_dir = Path.cwd() / target.get_profile_build_dir(profile)
+            register_build_cmds(fp, target, profile, build_dir, jobs=1)
+
+    scargo_build([], None, all_targets=True, all_profiles=True, parallel=True)
+
+    # Install and configure of every configuration, shared conan cache and presets are not modified concurrently
+    assert len(overlaps) == 2 * len(targets) * len(config.profiles)
+    assert not any(overlaps)
+
+
+def test_scargo_build_parallel_keeps_install_fingerprint(
+    fp: FakeProcess, mock_prepare_multitarget_config: MagicMock
+) -> None:
+    profile = "Debug"
+    config = mock_prepare_multitarget_config.return_value
+    config.project.max_build_jobs = 8
+    targets = config.project.target
+    Path("CMakeLists.txt").touch()
+    fp.keep_last_process(True)
+    register_common_commands(fp)
+    for target in targets:
+        build_dir = Path.cwd() / target.get_profile_build_dir(profile)
+        register_build_cmds(fp, target, profile, build_dir, jobs=8 // len(targets))
+        register_build_cmds(fp, target, profile, build_dir)
+
+    scargo_build([profile], None, all_targets=True, parallel=True)
+    scargo_build([profile], None, all_targets=True)
+
+    # Build jobs of parallel builds do not change inputs of conan install
+    assert fp.call_count(["conan", "install", fp.any()]) == len(targets)
+
+
+def test_scargo_build_all_targets_parallel_fails(
+    fp: FakeProcess,
+    mock_prepare_multitarget_config: MagicMock,
+    caplog: pytest.LogCaptureFixture,
+) -> None:
+    profile = "Debug"
+    config = mock_prepare_multitarget_config.return_value
+    config.project.max_build_jobs = 1
+    targets = config.project.target
+    Path("CMakeLists.txt").touch()
+
+    register_common_commands(fp)
+    for target in targets:
+        build_dir = Path.cwd() / target.get_profile_build_dir(profile)
+        register_build_cmds(fp, target, profile, build_dir, build_fails=target == targets[0], jobs=1)
+
+    with pytest.raises(SystemExit):
+        scargo_build([profile], None, all_targets=True, parallel=True)
+    log_data = get_log_data(caplog.records)
+    assert ("ERROR", f"Scargo build target {targets[0].id} failed") in log_data
+    assert ("ERROR", f"Built {len(targets) - 1} of {len(targets)} configurations, failed: {targets[0].id}") in log_data
+    for target in targets[1:]:
+        assert Path(target.get_profile_build_dir(profile)).is_dir()
+
+
+def test_scargo_build_all_targets_parallel_os_error(
+    fp: FakeProcess,
+    mock_prepare_multitarget_config: MagicMock,
+    caplog: pytest.LogCaptureFixture,
+) -> None:
+    profile = "Debug"
+    config = mock_prepare_multitarget_config.return_value
+    config.project.max_build_jobs = 1
+    targets = config.project.target
+    Path("CMakeLists.txt").touch()
+
+    def cmake_missing(_: Any) -> None:
+        raise FileNotFoundError("No such file or directory: 'cmake'")
+
+    register_common_commands(fp)
+    for target in targets:
+        build_dir = Path.cwd() / target.get_profile_build_dir(profile)
+        callback = cmake_missing if target == targets[0] else None
+        register_build_cmds(fp, target, profile, build_dir, jobs=1, build_callback=callback)
+
+    with pytest.raises(SystemExit):
+        scargo_build([profile], None, all_targets=True, parallel=True)
+    log_data = get_log_data(caplog.records)
+    assert (
+        "ERROR",
+        f"Scargo build target {targets[0].id} failed: No such file or directory: 'cmake'",
+    ) in log_data
+    assert ("ERROR", f"Built {len(targets) - 1} of {len(targets)} configurations, failed: {targets[0].id}") in log_data
+
+
+def test_scargo_build_profiles(fp: FakeProcess, fs: FakeFilesystem, mock_prepare_config: MagicMock) -> None:
+    profiles = ["Debug", "Release"]
+    target = mock_prepare_config.return_value.project.default_target
+    Path("CMakeLists.txt").touch()
+
+    register_common_commands(fp)
+    for profile in profiles:
+        register_build_cmds(fp, target, profile, Path(target.get_profile_build_dir(profile)))
+
+    scargo_build([*profiles, "Debug"], None)
+
+    for profile in profiles:
+        assert Path(target.get_profile_build_dir(profile)).is_dir()
+    # Conan is set up once for all profiles
+    assert fp.call_count(["conan", "source", "."]) == 1
+
+
+def test_scargo_build_all_profiles_parallel(
+    fp: FakeProcess,
+    mock_prepare_multitarget_config: MagicMock,
+    capfd: pytest.CaptureFixture[str],
+) -> None:
+    config = mock_prepare_multitarget_config.return_value
+    config.project.max_build_jobs = 4
+    targets = config.project.target
+    Path("CMakeLists.txt").touch()
+
+    register_common_commands(fp)
+    for target in targets:
+        for profile in config.profiles:
+            build_dir = Path.cwd() / target.get_profile_build_dir(profile)
+            register_build_cmds(fp, target, profile, build_dir, jobs=1, stdout=f"built {target.id} {profile}")
+
+    scargo_build([], None, all_targets=True, all_profiles=True, parallel=True)
+
+    output = capfd.readouterr().out
+    for target in targets:
+        for profile in config.profiles:
+            assert f"[{target.id}/{profile}] built {target.id} {profile}" in output
+
+
+def test_scargo_build_unknown_profile(
+    fp: FakeProcess, fs: FakeFilesystem, mock_prepare_config: MagicMock, caplog: pytest.LogCaptureFixture
+) -> None:
+    Path("CMakeLists.txt").touch()
+
+    with pytest.raises(SystemExit):
+        scargo_build(["Debug", "Fast"], None)
+
+    assert ("ERROR", "Profiles not defined in scargo.toml: Fast") in get_log_data(caplog.records)
+
+
 @pytest.fixture
 def mock_prepare_multitarget_config(tmpdir: Path, mocker: MockerFixture) -> MagicMock:
     os.chdir(tmpdir)
@@ -20,7 +20,10 @@ CONAN_REMOTE_CALLS = [
     ["conan", "remote", "add", REMOTE_REPO_NAME_1, EXAMPLE_URL],
     ["conan", "remote", "add", REMOTE_REPO_NAME_2, EXAMPLE_URL],
 ]
-CONAN_SETUP_CALLS = CONAN_REMOTE_CALLS + [
+CONAN_SETUP_CALLS = [
+    ["conan", "profile", "list"],
+    ["conan", "profile", "detect"],
+    *CONAN_REMOTE_CALLS,
     ["conan", "source", "."],
 ]
 
@@ -123,6 +126,7 @@ def test_upload_package_fail(
     config: Config,
     caplog: LogCaptureFixture,
     fp: FakeProcess,
+    fs: FakeFilesystem,
 ) -> None:
     # ARRANGE
     project_name = config.project.name
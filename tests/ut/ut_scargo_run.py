@@ -62,8 +62,10 @@ def test_scargo_run_with_build(
             "missing",
         ]
     )
-    fp.register(["conan", "build", ".", "-pr", profile_path, "-of", build_path])
-    fp.register(["cp", "-r", "-f", "build/x86/Debug/build/Debug/*", "."])
+    fp.register(
+        ["conan", "build", ".", "-pr", profile_path, "-of", build_path],
+        callback=lambda _: Path(build_path, "build", "Debug").mkdir(parents=True),
+    )
     scargo_run(bin_path, profile="Debug", params=[], skip_build=False)
 
     assert fp_bin.calls[0].returncode == 0
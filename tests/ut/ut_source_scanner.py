@@ -0,0 +1,77 @@
+from pathlib import Path
+
+import pytest
+from pytest_mock import MockerFixture
+
+from scargo.utils import source_scanner
+from scargo.utils.source_scanner import SourceScanner
+
+SOURCE = """\
+#pragma once
+// Copyright 2024
+// Company
+
+/* Block
+   comment */
+#include "path//with/slashes.h"
+
+int x; // trailing comment
+const char* text = "/* not a comment */";
+char quote = '"'; // after a char literal
+"""
+
+
+@pytest.fixture
+def source_file(tmp_path: Path) -> Path:
+    file_path = tmp_path / "source.hpp"
+    file_path.write_text(SOURCE)
+    return file_path
+
+
+def test_comment_lines(source_file: Path) -> None:
+    scanned = SourceScanner().scan(source_file)
+    assert scanned.get_comment_lines() == [
+        (2, "// Copyright 2024"),
+        (3, "// Company"),
+        (5, "/* Block"),
+        (6, "   comment */"),
+        (9, "// trailing comment"),
+        (11, "// after a char literal"),
+    ]
+    assert scanned.has_pragma_once
+
+
+def test_comment_sections(source_file: Path) -> None:
+    scanned = SourceScanner().scan(source_file)
+    assert scanned.get_comment_sections() == [
+        "// Copyright 2024\n// Company",
+        "/* Block\n   comment */",
+        "// trailing comment",
+        "// after a char literal",
+    ]
+    assert scanned.header_end_line == 9
+    assert scanned.get_comment_sections(header_only=True) == [
+        "// Copyright 2024\n// Company",
+        "/* Block\n   comment */",
+        "// trailing comment",
+    ]
+
+
+def test_empty_file(tmp_path: Path) -> None:
+    file_path = tmp_path / "empty.h"
+    file_path.touch()
+    scanned = SourceScanner().scan(file_path)
+    assert scanned.comments == []
+    assert not scanned.has_pragma_once
+
+
+def test_scan_is_memoized_until_file_changes(source_file: Path, mocker: MockerFixture) -> None:
+    scanner = SourceScanner()
+    scan_file = mocker.spy(source_scanner, "_scan_file")
+    first = scanner.scan(source_file)
+    assert scanner.scan(source_file) is first
+    assert scan_file.call_count == 1
+
+    source_file.write_text("#pragma once\n")
+    assert scanner.scan(source_file).comments == []
+    assert scan_file.call_count == 2
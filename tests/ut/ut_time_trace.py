@@ -0,0 +1,123 @@
+import json
+import os
+import sys
+from pathlib import Path
+from typing import Dict
+
+import pytest
+from pytest_subprocess import FakeProcess
+
+from scargo.utils import time_report_launcher
+from scargo.utils.time_trace import (
+    TimeEntry,
+    TimeTraceReport,
+    collect_time_trace,
+    format_time_trace_report,
+    get_time_trace_conf,
+    is_clang,
+    write_time_trace_report,
+)
+
+GCC_TIME_REPORT = """\
+Time variable                                   usr           sys          wall               GGC
+ phase setup                        :   0.00 (  0%)   0.00 (  0%)   0.01 (  3%)    1242 kB ( 10%)
+ phase parsing                      :   0.14 ( 58%)   0.07 ( 78%)   0.21 ( 64%)   10234 kB ( 81%)
+ template instantiation             :   0.03 ( 12%)   0.01 ( 11%)   0.04 ( 12%)    2048 kB ( 16%)
+ TOTAL                              :   0.24          0.09          0.33          12612 kB
+"""
+
+
+def clang_trace(total_us: int, headers: Dict[str, int], templates: Dict[str, int]) -> str:
+    events = [{"ph": "X", "name": "Total ExecuteCompiler", "dur": total_us}]
+    events += [{"ph": "X", "name": "Source", "dur": dur, "args": {"detail": name}} for name, dur in headers.items()]
+    events += [
+        {"ph": "X", "name": "InstantiateClass", "dur": dur, "args": {"detail": name}} for name, dur in templates.items()
+    ]
+    return json.dumps({"traceEvents": events})
+
+
+def test_is_clang() -> None:
+    assert is_clang("/usr/bin/clang++-15")
+    assert not is_clang("arm-none-eabi-gcc")
+
+
+def test_get_time_trace_conf() -> None:
+    assert 'tools.build:cxxflags+=["-ftime-trace"]' in get_time_trace_conf(clang=True)
+    gcc_conf = get_time_trace_conf(clang=False)
+    assert 'tools.build:cxxflags+=["-ftime-report"]' in gcc_conf
+    assert f"{sys.executable};-m;scargo.utils.time_report_launcher" in gcc_conf[-1]
+
+
+def test_collect_clang_time_trace(tmp_path: Path) -> None:
+    object_dir = tmp_path / "src" / "CMakeFiles" / "app.dir"
+    object_dir.mkdir(parents=True)
+    (object_dir / "a.cpp.json").write_text(clang_trace(3_000_000, {"vector": 1_000_000}, {"Foo<int>": 500_000}))
+    (object_dir / "b.cpp.json").write_text(clang_trace(1_000_000, {"vector": 2_000_000, "map": 100_000}, {}))
+    (object_dir / "other.json").write_text("{}")
+    (tmp_path / "compile_commands.json").write_text("[]")
+
+    report = collect_time_trace(tmp_path)
+
+    assert report == TimeTraceReport(
+        units=[
+            TimeEntry("src/CMakeFiles/app.dir/a.cpp", 3.0),
+            TimeEntry("src/CMakeFiles/app.dir/b.cpp", 1.0),
+        ],
+        headers=[TimeEntry("vector", 3.0, 2), TimeEntry("map", 0.1)],
+        templates=[TimeEntry("Foo<int>", 0.5)],
+        phases=[],
+    )
+
+
+def test_collect_gcc_time_report(tmp_path: Path) -> None:
+    object_dir = tmp_path / "CMakeFiles" / "app.dir"
+    object_dir.mkdir(parents=True)
+    (object_dir / "main.cpp.time-report").write_text(GCC_TIME_REPORT)
+
+    report = collect_time_trace(tmp_path)
+
+    assert report.units == [TimeEntry("CMakeFiles/app.dir/main.cpp", 0.33)]
+    assert report.phases[0] == TimeEntry("phase parsing", 0.21)
+    assert TimeEntry("template instantiation", 0.04) in report.phases
+
+
+def test_collect_time_trace_skips_earlier_builds(tmp_path: Path) -> None:
+    object_dir = tmp_path / "CMakeFiles" / "app.dir"
+    object_dir.mkdir(parents=True)
+    (object_dir / "old.cpp.json").write_text(clang_trace(2_000_000, {}, {}))
+    (object_dir / "old.cpp.time-report").write_text(GCC_TIME_REPORT)
+    for old_path in object_dir.iterdir():
+        os.utime(old_path, (1000, 1000))
+    (object_dir / "new.cpp.json").write_text(clang_trace(1_000_000, {}, {}))
+
+    report = collect_time_trace(tmp_path, since=2000)
+
+    assert report.units == [TimeEntry("CMakeFiles/app.dir/new.cpp", 1.0)]
+    assert not report.phases
+
+
+def test_write_time_trace_report(tmp_path: Path) -> None:
+    report = TimeTraceReport([TimeEntry("main.cpp", 1.5)], [TimeEntry("vector", 2.25, 3)], [], [])
+
+    text_path = write_time_trace_report(report, tmp_path)
+
+    assert text_path.read_text() == format_time_trace_report(report) + "\n"
+    assert "      2.250 s  vector  (3 units)" in text_path.read_text()
+    assert json.loads((tmp_path / "time_trace_report.json").read_text())["headers"] == [
+        {"name": "vector", "seconds": 2.25, "occurrences": 3}
+    ]
+
+
+def test_format_empty_time_trace_report() -> None:
+    assert format_time_trace_report(TimeTraceReport([], [], [], [])).startswith("No time trace files found")
+
+
+def test_time_report_launcher(tmp_path: Path, fp: FakeProcess, capsys: pytest.CaptureFixture[str]) -> None:
+    object_path = tmp_path / "main.cpp.o"
+    compile_cmd = ["g++", "-ftime-report", "-c", "main.cpp", "-o", str(object_path)]
+    fp.register(compile_cmd, stderr="main.cpp:1:1: warning: unused\n\n" + GCC_TIME_REPORT, returncode=0)
+
+    assert time_report_launcher.main(compile_cmd) == 0
+
+    assert (tmp_path / "main.cpp.time-report").read_text() == GCC_TIME_REPORT
+    assert capsys.readouterr().err == "main.cpp:1:1: warning: unused\n\n"